@@ -0,0 +1,221 @@
+"""Reuse the code rendered by a previous generation when its inputs did not change."""
+
+import hashlib
+import json
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterator, List, Union, TYPE_CHECKING
+
+from .fhirclass import FHIRClass
+from .generators import get_generator_path
+from .logger import logger
+
+if TYPE_CHECKING:
+    from .fhirspec import FHIRCodeSystem, FHIRSpec
+
+MANIFEST_FILENAME = ".fhirzeug-manifest.json"
+MANIFEST_VERSION = 1
+
+
+class BuildManifest:
+    """Rendered fragments of code with the content hashes of their inputs.
+
+    Each class or CodeSystem is rendered to a fragment. The digest of a fragment
+    combines the digests of the inputs it is rendered from:
+
+    - for every fragment: the generator config, the templates, the code of
+      fhirzeug and the version of the specification,
+    - for a class: the StructureDefinitions defining it, and the ValueSets and
+      CodeSystems of the enums of its properties,
+    - for a CodeSystem: its definition.
+
+    A fragment of the previous generation is reused if its digest is unchanged,
+    otherwise it is rendered again. Only fragments used by the current generation
+    are saved.
+    """
+
+    def __init__(self, spec: "FHIRSpec", path: Path):
+        self.spec = spec
+        self.path = path
+        self.reused = 0
+        self.rendered = 0
+        self._base_digest = self._compute_base_digest()
+        self._previous = self._load()
+        self._fragments: Dict[str, Dict[str, str]] = {}
+        self._digests: Dict[str, str] = {}
+        self._profiles = {
+            profile.url: profile
+            for profile in spec.profiles.values()
+            if profile.url is not None
+        }
+        self._codesystems = {
+            codesystem.name: codesystem for codesystem in spec.codesystems.values()
+        }
+
+    @classmethod
+    def for_spec(cls, spec: "FHIRSpec") -> "BuildManifest":
+        """Return the manifest stored in the output directory of the generator."""
+        output_directory = spec.generator_config.output_directory.destination
+        return cls(spec, output_directory / MANIFEST_FILENAME)
+
+    def fragment(
+        self, item: Union[FHIRClass, "FHIRCodeSystem"], render: Callable[[], str]
+    ) -> str:
+        """Return the fragment rendered for the class or CodeSystem `item`.
+
+        `render` is only called if the inputs of the fragment changed since the
+        previous generation.
+        """
+        if isinstance(item, FHIRClass):
+            key = f"class:{item.name}"
+            inputs = self._class_inputs(item)
+        else:
+            key = f"codesystem:{item.url}"
+            inputs = [self._digest(f"codesystem:{item.url}", item.definition)]
+
+        digest = sha256_digest(self._base_digest, *inputs)
+        previous = self._previous.get(key)
+        if previous is not None and previous["digest"] == digest:
+            text = previous["text"]
+            self.reused += 1
+        else:
+            text = render()
+            self.rendered += 1
+        self._fragments[key] = {"digest": digest, "text": text}
+        return text
+
+    def save(self) -> None:
+        """Write the fragments of the current generation to the manifest file."""
+        manifest = {
+            "version": MANIFEST_VERSION,
+            "base": self._base_digest,
+            "fragments": self._fragments,
+        }
+        with self.path.open("w", encoding="utf-8") as handle:
+            json.dump(manifest, handle)
+        logger.info(
+            f"Rendered {self.rendered} fragments, reused {self.reused} from {self.path}"
+        )
+
+    def _load(self) -> Dict[str, Dict[str, str]]:
+        """Load the fragments of the previous generation, if they can be reused."""
+        if not self.path.exists():
+            return {}
+        try:
+            with self.path.open("r", encoding="utf-8") as handle:
+                manifest = json.load(handle)
+        except ValueError:
+            logger.warning(f"Ignoring invalid build manifest {self.path}")
+            return {}
+        if (
+            manifest.get("version") != MANIFEST_VERSION
+            or manifest.get("base") != self._base_digest
+        ):
+            logger.info("Generator or specification changed, rendering everything")
+            return {}
+        return manifest["fragments"]
+
+    def _compute_base_digest(self) -> str:
+        """Digest of the inputs shared by all fragments."""
+        config = self.spec.generator_config.dict(
+            exclude={
+                "copy_examples",
+                "output_directory",
+                "download_directory",
+                "incremental",
+                "split_modules",
+            }
+        )
+        templates = get_generator_path(self.spec.generator_config).joinpath(
+            self.spec.generator_config.template.source
+        )
+        return sha256_digest(
+            str(MANIFEST_VERSION),
+            json.dumps(config, sort_keys=True, default=str),
+            self.spec.info.version or "",
+            sources_digest(),
+            *(
+                f"{path.name}:{file_digest(path)}"
+                for path in sorted(templates.iterdir())
+                if path.is_file()
+            ),
+        )
+
+    def _class_inputs(self, clazz: FHIRClass) -> List[str]:
+        """Digests of the definitions a class is rendered from."""
+        inputs = []
+        for url in clazz.urls:
+            profile = self._profiles.get(url)
+            if profile is None:
+                inputs.append(url)
+                continue
+            structure = profile.structure
+            inputs.append(
+                self._digest(
+                    f"profile:{url}",
+                    [
+                        url,
+                        structure.name,
+                        structure.base,
+                        structure.kind,
+                        structure.differential,
+                    ],
+                )
+            )
+        for prop in clazz.properties:
+            if prop.enum is None:
+                continue
+            valueset = prop.enum.value_set
+            inputs.append(self._digest(f"valueset:{valueset.url}", valueset.definition))
+            codesystem = self._codesystems.get(prop.enum.name)
+            if codesystem is not None:
+                inputs.append(
+                    self._digest(f"codesystem:{codesystem.url}", codesystem.definition)
+                )
+        return inputs
+
+    def _digest(self, key: str, content: Any) -> str:
+        """Digest of the JSON content of a definition, computed once per key."""
+        digest = self._digests.get(key)
+        if digest is None:
+            digest = sha256_digest(json.dumps(content, sort_keys=True))
+            self._digests[key] = digest
+        return digest
+
+
+def sha256_digest(*parts: str) -> str:
+    """Return the SHA-256 hex digest of a sequence of strings."""
+    digest = hashlib.sha256()
+    for part in parts:
+        digest.update(part.encode("utf-8"))
+        digest.update(b"\0")
+    return digest.hexdigest()
+
+
+def file_digest(path: Path) -> str:
+    """Return the SHA-256 hex digest of the content of a file."""
+    return hashlib.sha256(path.read_bytes()).hexdigest()
+
+
+def sources_digest() -> str:
+    """Return the digest of the Python sources of fhirzeug, including its
+    generators.
+
+    Only the modules of packages are included: templates and static files of the
+    generators are not, as they are not imported.
+    """
+    root = Path(__file__).parent
+    return sha256_digest(
+        *(
+            f"{path.relative_to(root).as_posix()}:{file_digest(path)}"
+            for path in sorted(_package_modules(root))
+        )
+    )
+
+
+def _package_modules(package: Path) -> Iterator[Path]:
+    """Yield the Python modules of a package and of its subpackages."""
+    for path in package.iterdir():
+        if path.suffix == ".py" and path.is_file():
+            yield path
+        elif path.joinpath("__init__.py").is_file():
+            yield from _package_modules(path)
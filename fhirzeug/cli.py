@@ -1,10 +1,12 @@
 import typer
 from pathlib import Path
+from typing import Optional, Union
 
 from . import fhirspec, logger
-from .specificationcache import SpecificationCache
+from .specificationcache import SpecificationCache, SpecificationPackage
 from .generator import generate
 from .generators import load_config
+from .generators.yaml_model import ExamplesMode
 
 app = typer.Typer()
 
@@ -14,6 +16,12 @@ def main(
     force_download: bool = False,
     dry_run: bool = False,
     load_only: bool = False,
+    split_modules: bool = False,
+    incremental: bool = False,
+    spec_cache: bool = True,
+    extract: bool = True,
+    examples: Optional[ExamplesMode] = None,
+    package: Optional[Path] = None,
     generator: str = "python_pydantic",
     output_directory: Path = Path("output"),  # noqa: B008
     download_directory: Path = Path("./downloads"),  # noqa: B008
@@ -25,17 +33,34 @@ def main(
     generator_config = load_config(generator)
     generator_config.output_directory.destination = output_directory
     generator_config.download_directory.destination = download_directory
+    if split_modules:
+        generator_config.split_modules = True
+    if incremental:
+        generator_config.incremental = True
+    if examples is not None:
+        generator_config.copy_examples.mode = examples
 
     # assure we have all files
-    loader = SpecificationCache(
-        generator_config.specification_url,
-        generator_config.download_directory.destination,
-    )
+    loader: Union[SpecificationCache, SpecificationPackage]
+    if package is not None:
+        # Read the specification from a local package instead of downloading it
+        loader = SpecificationPackage(
+            package, generator_config.download_directory.destination
+        )
+    else:
+        loader = SpecificationCache(
+            generator_config.specification_url,
+            generator_config.download_directory.destination,
+            extract=extract,
+        )
     loader.sync(force_download=force_download)
 
     # parse
     if not load_only:
-        spec = fhirspec.FHIRSpec(loader.cache_dir, generator_config)
+        if spec_cache:
+            spec = fhirspec.FHIRSpec.load(loader.source(), generator_config)
+        else:
+            spec = fhirspec.FHIRSpec(loader.source(), generator_config)
         if not dry_run:
             generate(spec)
 
@@ -1,7 +1,20 @@
 """Define representation of FHIRClasses e.g. FHIR Resources."""
 
+import functools
+import threading
 from .logger import logger
-from typing import List, Dict, Optional, Set, TYPE_CHECKING
+from typing import (
+    Any,
+    Callable,
+    Iterator,
+    List,
+    Dict,
+    Optional,
+    Set,
+    Tuple,
+    TypeVar,
+    TYPE_CHECKING,
+)
 
 if TYPE_CHECKING:
     from .fhirspec import FHIRStructureDefinitionElement, FHIRElementType
@@ -13,31 +26,91 @@ JSON_PRIMITIVE_FIELDS: Set[str] = {
     "str",
 }
 
+_T = TypeVar("_T")
 
-class FHIRClass:
-    """An element/resource that should become its own class."""
 
-    known: Dict[str, "FHIRClass"] = {}
+class FHIRClassRegistry:
+    """The classes of one specification, by name and by URL of their profiles.
+
+    Each `FHIRSpec` owns a registry, so that several specifications can be parsed
+    and generated in the same process, in different threads.
+    """
+
+    def __init__(self) -> None:
+        self._by_name: Dict[str, "FHIRClass"] = {}
+        self._by_url: Dict[str, List["FHIRClass"]] = {}
+        self._lock = threading.Lock()
+
+    def __getstate__(self):
+        state = self.__dict__.copy()
+        del state["_lock"]
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self._lock = threading.Lock()
 
-    @classmethod
-    def for_element(cls, element):
+    def __iter__(self) -> Iterator["FHIRClass"]:
+        return iter(list(self._by_name.values()))
+
+    def __len__(self) -> int:
+        return len(self._by_name)
+
+    def __contains__(self, class_name: str) -> bool:
+        return class_name in self._by_name
+
+    def for_element(self, element) -> Tuple["FHIRClass", bool]:
         """Return an existing class or creates one for the given element.
 
         Return a tuple with the class and a bool indicating creation.
         """
         assert element.represents_class
         class_name = element.name_if_class
-        if class_name in cls.known:
-            cls.known[class_name].add_url(element.profile.url)
-            return cls.known[class_name], False
+        url = element.profile.url
+        with self._lock:
+            klass = self._by_name.get(class_name)
+            created = klass is None
+            if klass is None:
+                klass = FHIRClass(element, class_name)
+                self._by_name[class_name] = klass
+            elif url in klass.urls:
+                return klass, False
+            else:
+                klass.add_url(url)
+            if url is not None:
+                self._by_url.setdefault(url, []).append(klass)
+        return klass, created
+
+    def with_name(self, class_name) -> Optional["FHIRClass"]:
+        return self._by_name.get(class_name)
+
+    def with_url(self, url: str) -> List["FHIRClass"]:
+        """Return the classes defined by the profile with the given URL."""
+        return list(self._by_url.get(url, []))
 
-        klass = cls(element, class_name)
-        cls.known[class_name] = klass
-        return klass, True
 
-    @classmethod
-    def with_name(cls, class_name) -> Optional["FHIRClass"]:
-        return cls.known.get(class_name)
+def cached_view(method: Callable[["FHIRClass"], _T]) -> _T:
+    """Make a method of `FHIRClass` a property that is computed once.
+
+    The value is kept until a property is added to the class or one of its
+    superclasses, or the superclass changes. The values are shared between all the
+    accesses and must not be modified.
+    """
+    name = method.__name__
+
+    @functools.wraps(method)
+    def view(self: "FHIRClass") -> _T:
+        try:
+            return self._views[name]
+        except KeyError:
+            value = self._views[name] = method(self)
+            return value
+
+    return property(view)  # type: ignore
+
+
+class FHIRClass:
+    """An element/resource that should become its own class."""
 
     def __init__(self, element, class_name):
         assert element.represents_class
@@ -45,15 +118,43 @@ class FHIRClass:
         self.name: str = class_name
         self.module = None
         self.resource_type = element.name_of_resource()
-        self.superclass = None
+        self._superclass: Optional["FHIRClass"] = None
+        self._subclasses: List["FHIRClass"] = []
         self.superclass_name: str = element.superclass_name
         self.short: str = element.definition.short
         self.formal: str = element.definition.formal
         self.properties: List["FHIRClassProperty"] = []
+        self._properties_by_name: Dict[str, "FHIRClassProperty"] = {}
         self.expanded_nonoptionals: Dict[str, List["FHIRClassProperty"]] = {}
-        self.__urls: Set[str] = set()
+        # values of the `cached_view` properties, by name
+        self._views: Dict[str, Any] = {}
+        # dict keys keep the profiles in the order they were read
+        self.__urls: Dict[str, None] = {}
         self.add_url(element.profile.url)
 
+    def __getstate__(self):
+        state = self.__dict__.copy()
+        state["_views"] = {}
+        return state
+
+    @property
+    def superclass(self) -> Optional["FHIRClass"]:
+        return self._superclass
+
+    @superclass.setter
+    def superclass(self, superclass: Optional["FHIRClass"]) -> None:
+        if self._superclass is not None:
+            self._superclass._subclasses.remove(self)
+        self._superclass = superclass
+        if superclass is not None:
+            superclass._subclasses.append(self)
+        self._invalidate_views()
+
+    def _invalidate_views(self) -> None:
+        self._views.clear()
+        for subclass in self._subclasses:
+            subclass._invalidate_views()
+
     def add_property(self, prop: "FHIRClassProperty") -> None:
         """Add a property to the receiver.
 
@@ -64,17 +165,19 @@ class FHIRClass:
         # do we already have a property with this name?
         # if we do and it's a specific reference, make it a reference to a
         # generic resource
-        for existing in self.properties:
-            if existing.name == prop.name:
-                if len(existing.reference_to_names) == 0:
-                    logger.warning(
-                        f'Already have property "{prop.name}" on "{self.name}", which is only allowed for references'
-                    )
-                else:
-                    existing.reference_to_names.extend(prop.reference_to_names)
-                return
+        existing = self._properties_by_name.get(prop.name)
+        if existing is not None:
+            if len(existing.reference_to_names) == 0:
+                logger.warning(
+                    f'Already have property "{prop.name}" on "{self.name}", which is only allowed for references'
+                )
+            else:
+                existing.reference_to_names.extend(prop.reference_to_names)
+            return
 
         self.properties.append(prop)
+        self._properties_by_name[prop.name] = prop
+        self._invalidate_views()
 
         if prop.nonoptional:
             if prop.choice_of_type is not None:
@@ -92,13 +195,13 @@ class FHIRClass:
 
     def add_url(self, url: Optional[str]) -> None:
         if url is not None:
-            self.__urls.add(url)
+            self.__urls[url] = None
 
     @property
     def urls(self) -> List[str]:
         return list(self.__urls)
 
-    @property
+    @cached_view
     def nonexpanded_properties(self) -> List["FHIRClassProperty"]:
         nonexpanded = []
         included = set()
@@ -110,14 +213,14 @@ class FHIRClass:
             nonexpanded.append(prop)
         return nonexpanded
 
-    @property
+    @cached_view
     def nonexpanded_properties_all(self):
         nonexpanded = self.nonexpanded_properties.copy()
         if self.superclass is not None:
             nonexpanded.extend(self.superclass.nonexpanded_properties_all)
         return nonexpanded
 
-    @property
+    @cached_view
     def nonexpanded_nonoptionals(self):
         nonexpanded = []
         included = set()
@@ -131,17 +234,24 @@ class FHIRClass:
             nonexpanded.append(prop)
         return nonexpanded
 
-    @property
+    @cached_view
     def nonexpanded_nonoptionals_all(self):
         nonexpanded = self.nonexpanded_nonoptionals.copy()
         if self.superclass is not None:
             nonexpanded.extend(self.superclass.nonexpanded_nonoptionals_all)
         return nonexpanded
 
-    def property_for(self, prop_name):
+    @cached_view
+    def _properties_by_orig_name(self) -> Dict[str, "FHIRClassProperty"]:
+        by_orig_name: Dict[str, "FHIRClassProperty"] = {}
         for prop in self.properties:
-            if prop.orig_name == prop_name:
-                return prop
+            by_orig_name.setdefault(prop.orig_name, prop)
+        return by_orig_name
+
+    def property_for(self, prop_name):
+        prop = self._properties_by_orig_name.get(prop_name)
+        if prop is not None:
+            return prop
         if self.superclass:
             return self.superclass.property_for(prop_name)
         return None
@@ -151,58 +261,58 @@ class FHIRClass:
             return True
         return True if len(self.properties) > 0 else False
 
-    @property
+    @cached_view
     def has_nonoptional(self):
         for prop in self.properties:
             if prop.nonoptional:
                 return True
         return False
 
-    @property
+    @cached_view
     def has_choice_of_type(self):
         for prop in self.properties:
             if prop.choice_of_type is not None:
                 return True
         return False
 
-    @property
+    @cached_view
     def sorted_properties(self):
         return sorted(self.properties, key=lambda x: x.name)
 
-    @property
+    @cached_view
     def sorted_properties_all(self):
         properties = self.properties.copy()
         if self.superclass is not None:
             properties.extend(self.superclass.sorted_properties_all)
         return sorted(properties, key=lambda x: x.name)
 
-    @property
+    @cached_view
     def sorted_nonexpanded_properties(self):
         return sorted(self.nonexpanded_properties, key=lambda x: x.name)
 
-    @property
+    @cached_view
     def sorted_nonexpanded_properties_all(self):
         return sorted(self.nonexpanded_properties_all, key=lambda x: x.name)
 
-    @property
+    @cached_view
     def sorted_nonoptionals(self):
         return sorted(self.expanded_nonoptionals.items())
 
-    @property
+    @cached_view
     def sorted_nonexpanded_nonoptionals(self):
         return sorted(self.nonexpanded_nonoptionals, key=lambda x: x.name)
 
-    @property
+    @cached_view
     def sorted_nonexpanded_nonoptionals_all(self):
         return sorted(self.nonexpanded_nonoptionals_all, key=lambda x: x.name)
 
-    @property
+    @cached_view
     def has_expanded_nonoptionals(self):
         return (
             len([p for p in self.properties if p.choice_of_type and p.nonoptional]) > 0
         )
 
-    @property
+    @cached_view
     def has_only_expandable_properties(self):
         return len([p for p in self.properties if not p.choice_of_type]) < 1
 
@@ -210,7 +320,7 @@ class FHIRClass:
     def resource_type_enum(self):
         return self.resource_type[:1].lower() + self.resource_type[1:]
 
-    @property
+    @cached_view
     def choice_properties(self) -> Dict[str, list]:
         result: Dict[str, list] = {}
         for p in self.properties:
@@ -218,12 +328,9 @@ class FHIRClass:
                 result.setdefault(p.choice_of_type, []).append(p.name)
         return result
 
-    @property
+    @cached_view
     def properties_map(self) -> Dict[str, "FHIRClassProperty"]:
-        result: Dict[str, "FHIRClassProperty"] = {}
-        for p in self.properties:
-            result[p.name] = p
-        return result
+        return dict(self._properties_by_name)
 
     def __repr__(self):
         return f"<{self.__class__.__name__}> path: {self.path}, name: {self.name}, resourceType: {self.resource_type}"
@@ -1,33 +1,92 @@
+import contextlib
+import functools
+import io
 import os
 import re
 import shutil
 import textwrap
-from typing import Optional, TextIO, TYPE_CHECKING
+from typing import Dict, List, Optional, TextIO, Tuple, TYPE_CHECKING
 from pathlib import Path
 from stringcase import snakecase  # type: ignore
 
-from jinja2 import Environment, PackageLoader, TemplateNotFound
+from jinja2 import (
+    Environment,
+    FileSystemBytecodeCache,
+    PackageLoader,
+    Template,
+    TemplateNotFound,
+)
+from jinja2.bccache import Bucket
 from jinja2.filters import environmentfilter
 from .logger import logger
 
 if TYPE_CHECKING:
+    from .buildmanifest import BuildManifest
+    from .fhirclass import FHIRClass
     from .fhirspec import FHIRSpec
+    from .generators.yaml_model import GeneratorConfig
 
+# Jinja environments by template package and bytecode cache directory, shared by all
+# renderers so that each template is loaded and compiled once per process.
+_environments: Dict[Tuple[str, str, str], Environment] = {}
 
-class FHIRRenderer:
-    """Superclass for all renderer implementations."""
 
-    def __init__(self, spec: "FHIRSpec"):
-        self.spec = spec
-        self.generator_config = spec.generator_config
-        self.jinjaenv = Environment(
+def get_environment(generator_config: "GeneratorConfig") -> Environment:
+    """Return the Jinja environment of the templates of a generator.
+
+    Compiled templates are cached in the `jinja` directory of the download
+    directory, so that later runs do not compile them again. Templates edited while
+    the environment is in use are reloaded the next time they are looked up.
+    """
+    cache_dir = generator_config.download_directory.destination / "jinja"
+    key = (generator_config.module, generator_config.template.source, str(cache_dir))
+    environment = _environments.get(key)
+    if environment is None:
+        bytecode_cache: Optional[_BytecodeCache] = None
+        try:
+            cache_dir.mkdir(parents=True, exist_ok=True)
+            bytecode_cache = _BytecodeCache(str(cache_dir))
+        except OSError as e:
+            logger.warning(f"Not caching compiled templates in {cache_dir}: {e}")
+        environment = Environment(
             loader=PackageLoader(
-                self.generator_config.module, self.generator_config.template.source,
+                generator_config.module, generator_config.template.source
             ),
             extensions=["jinja2.ext.do"],  # Allow the "do" statement in Jinja
+            bytecode_cache=bytecode_cache,
         )
-        self.jinjaenv.filters["wordwrap"] = do_wordwrap
-        self.jinjaenv.filters["snake_case"] = snakecase
+        environment.filters["wordwrap"] = do_wordwrap
+        environment.filters["snake_case"] = snakecase
+        _environments[key] = environment
+    return environment
+
+
+class _BytecodeCache(FileSystemBytecodeCache):
+    """Cache of compiled templates written atomically, and skipped if it cannot be
+    written, so that concurrent or read-only runs still render the templates."""
+
+    def dump_bytecode(self, bucket: Bucket) -> None:
+        path = Path(self.directory, self.pattern % bucket.key)
+        tmp_path = path.with_name(f".{path.name}.{os.getpid()}.tmp")
+        try:
+            with tmp_path.open("wb") as handle:
+                bucket.write_bytecode(handle)
+            os.replace(tmp_path, path)
+        except OSError as e:
+            logger.debug(f"Not caching compiled template {bucket.key}: {e}")
+            with contextlib.suppress(OSError):
+                tmp_path.unlink()
+
+
+class FHIRRenderer:
+    """Superclass for all renderer implementations."""
+
+    def __init__(self, spec: "FHIRSpec", manifest: Optional["BuildManifest"] = None):
+        self.spec = spec
+        self.manifest = manifest
+        self.generator_config = spec.generator_config
+        self.jinjaenv = get_environment(self.generator_config)
+        self._templates: Dict[str, Template] = {}
 
     def render(self, f_out: Optional[TextIO] = None) -> None:
         """The main rendering start point, for subclasses to override."""
@@ -47,13 +106,16 @@ class FHIRRenderer:
         :param target_path: Output path
         """
 
-        try:
-            template = self.jinjaenv.get_template(template_name)
-        except TemplateNotFound:
-            logger.error(
-                f'Template "{template_name}" not found in "{self.generator_config.template.source}", cannot render'
-            )
-            return
+        template = self._templates.get(template_name)
+        if template is None:
+            try:
+                template = self.jinjaenv.get_template(template_name)
+            except TemplateNotFound:
+                logger.error(
+                    f'Template "{template_name}" not found in "{self.generator_config.template.source}", cannot render'
+                )
+                return
+            self._templates[template_name] = template
 
         if target_path:
             dirpath = os.path.dirname(target_path)
@@ -61,14 +123,31 @@ class FHIRRenderer:
             if not os.path.isdir(dirpath):
                 os.makedirs(dirpath)
 
-            f_out = open(target_path, "w")
+            with open(target_path, "w") as f_target:
+                logger.info("Writing {}".format(target_path))
+                f_target.writelines(template.generate(data))
+            return
 
         if f_out is None:
             raise ValueError("No target filepath or file object provided")
 
-        logger.info("Writing {}".format(target_path))
-        rendered = template.render(data)
-        f_out.write(rendered)
+        # Write the output as it is generated instead of joining it in a string
+        f_out.writelines(template.generate(data))
+
+    def do_render_fragment(self, item, data, template_name: str, f_out: TextIO) -> None:
+        """Render like `do_render`, but reuse the fragment rendered for the class or
+        CodeSystem `item` by the previous generation if its inputs did not change.
+        """
+        if self.manifest is None:
+            self.do_render(data, template_name, f_out=f_out)
+            return
+
+        def render() -> str:
+            buffer = io.StringIO()
+            self.do_render(data, template_name, f_out=buffer)
+            return buffer.getvalue()
+
+        f_out.write(self.manifest.fragment(item, render))
 
 
 class FHIRStructureDefinitionRenderer(FHIRRenderer):
@@ -89,12 +168,19 @@ class FHIRStructureDefinitionRenderer(FHIRRenderer):
 
     def render(self, f_out):
         self.copy_files(None, f_out)
+        self.render_classes(self.get_classes_to_render(), f_out)
 
-        classes = self.get_classes_to_render()
+    def render_classes(self, classes, f_out):
+        """Render the given classes, in order."""
         for clazz in classes:
             data = {"clazz": clazz}
             source_path = self.generator_config.template.resource_source
-            self.do_render(data, source_path, f_out=f_out)
+            self.do_render_fragment(clazz, data, source_path, f_out)
+
+    def render_resource_index(self, classes, f_out):
+        """Render the constants listing the resources among the given classes."""
+        data = {"resources": [clazz for clazz in classes if clazz.resource_type]}
+        self.do_render(data, "resource_index.py.jinja2", f_out=f_out)
 
     def get_classes_to_render(self):
         """Recursively fetch all classes to render."""
@@ -124,6 +210,53 @@ class FHIRStructureDefinitionRenderer(FHIRRenderer):
         return classes
 
 
+class FHIRPackageRenderer(FHIRStructureDefinitionRenderer):
+    """Write the headers of the modules of a package with one module per resource."""
+
+    def split_classes(self, classes):
+        """Split classes between data types and resource modules.
+
+        Return the list of data type classes and a dict of the classes defined in
+        each resource module, both keeping the order of `classes`.
+        """
+        resource_modules = {
+            clazz.module for clazz in classes if self._is_resource(clazz)
+        }
+        datatypes = []
+        resources: Dict[str, List["FHIRClass"]] = {}
+        for clazz in classes:
+            if clazz.module in resource_modules:
+                resources.setdefault(clazz.module, []).append(clazz)
+            else:
+                datatypes.append(clazz)
+        return datatypes, resources
+
+    @staticmethod
+    def _is_resource(clazz: Optional["FHIRClass"]) -> bool:
+        while clazz is not None:
+            if clazz.resource_type:
+                return True
+            clazz = clazz.superclass
+        return False
+
+    def render_module_header(
+        self, docstring: str, f_out, star_imports=(), imports=()
+    ) -> None:
+        """Render the docstring and imports of a module of the package."""
+        data = {
+            "docstring": docstring,
+            "info": self.spec.info,
+            "star_imports": star_imports,
+            "imports": imports,
+        }
+        self.do_render(data, "package_module_header.py.jinja2", f_out=f_out)
+
+    def render_init_header(self, classes, f_out) -> None:
+        """Render the head of the package `__init__`, indexing the given classes."""
+        data = {"info": self.spec.info, "classes": classes}
+        self.do_render(data, "package_init.py.jinja2", f_out=f_out)
+
+
 class FHIRValueSetRenderer(FHIRRenderer):
     """Write ValueSet and CodeSystem contained in the FHIR spec."""
 
@@ -138,7 +271,7 @@ class FHIRValueSetRenderer(FHIRRenderer):
                 "system": system,
             }
             source_path = self.generator_config.template.codesystems_source
-            self.do_render(data, source_path, f_out=f_out)
+            self.do_render_fragment(system, data, source_path, f_out)
 
 
 # There is a bug in Jinja's wordwrap (inherited from `textwrap`) in that it
@@ -159,9 +292,18 @@ def do_wordwrap(environment, s, width=79, break_long_words=True, wrapstring=None
     if not wrapstring:
         wrapstring = environment.newline_sequence
 
+    return _wordwrap(s, width, break_long_words, wrapstring)
+
+
+_LINEBREAK = re.compile(r"\r\n|\n|\r")
+
+
+# The same short definitions are wrapped for many properties
+@functools.lru_cache(maxsize=4096)
+def _wordwrap(s: str, width: int, break_long_words: bool, wrapstring: str) -> str:
     accumulator = []
     # Workaround: pre-split the string on \r, \r\n and \n
-    for component in re.split(r"\r\n|\n|\r", s):
+    for component in _LINEBREAK.split(s):
         # textwrap will eat empty strings for breakfirst. Therefore we route them around it.
         if len(component) == 0:
             accumulator.append(component)
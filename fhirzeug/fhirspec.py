@@ -4,14 +4,20 @@
 import io
 import os
 import re
+import gc
 import json
+import pickle
 import datetime
+import threading
+import contextlib
 from pathlib import Path
 import stringcase  # type: ignore
-from typing import Any, Dict, List, Optional, Union, TYPE_CHECKING
+from typing import Any, Dict, Iterator, List, Optional, Union, TYPE_CHECKING
 
 from .logger import logger
 from . import fhirclass
+from .buildmanifest import sha256_digest, sources_digest
+from .specsource import SpecSource, as_source
 
 if TYPE_CHECKING:
     from .generators.yaml_model import GeneratorConfig
@@ -22,16 +28,77 @@ skip_because_unsupported = [
     r"SimpleQuantity",
 ]
 
+# Version of the pickled specifications written by `FHIRSpec.load`
+SPEC_CACHE_VERSION = 3
+
+# Files of the specification directory read by `FHIRSpec`
+SPEC_FILES = [
+    "version.info",
+    "valuesets.json",
+    "profiles-types.json",
+    "profiles-resources.json",
+]
+
+# Settings of the generator config that do not change the parsed specification
+SPEC_CACHE_IGNORED_SETTINGS = {
+    "copy_examples",
+    "download_directory",
+    "incremental",
+    "output_directory",
+    "output_file",
+    "split_modules",
+    "template",
+}
+
+
+# Number of `gc_paused` blocks running, in all threads, and whether the garbage
+# collector was enabled before the first one
+_gc_pauses = 0
+_gc_was_enabled = False
+_gc_lock = threading.Lock()
+
+
+@contextlib.contextmanager
+def gc_paused() -> Iterator[None]:
+    """ Disable the cyclic garbage collector while loading the specification.
+
+    Parsing creates hundreds of thousands of long-lived objects and no garbage
+    cycles, so collections triggered by these allocations only walk the growing
+    object graph again and again, which takes almost half of the parsing time.
+
+    The collector is enabled again when the last of the specifications loaded
+    by concurrent threads is loaded.
+    """
+    global _gc_pauses, _gc_was_enabled
+    with _gc_lock:
+        if _gc_pauses == 0:
+            _gc_was_enabled = gc.isenabled()
+            gc.disable()
+        _gc_pauses += 1
+    try:
+        yield
+    finally:
+        with _gc_lock:
+            _gc_pauses -= 1
+            if _gc_pauses == 0 and _gc_was_enabled:
+                gc.enable()
+
 
 class FHIRSpec(object):
     """ The FHIR specification.
     """
 
-    def __init__(self, directory: Path, generator_config: "GeneratorConfig"):
-        assert directory.is_dir()
-        self.directory = directory
+    def __init__(
+        self, directory: Union[Path, SpecSource], generator_config: "GeneratorConfig"
+    ):
+        self.source = as_source(directory)
+        assert self.source.directory.is_dir()
+        self.directory = self.source.directory
         self.generator_config = generator_config
-        self.info = FHIRVersionInfo(self, directory)
+        self.info = FHIRVersionInfo(self, self.directory)
+
+        # The classes created from the profiles
+        self.classes = fhirclass.FHIRClassRegistry()
 
         # system-url: FHIRValueSet()
         self.valuesets: Dict[str, "FHIRValueSet"] = {}
@@ -43,9 +110,82 @@ class FHIRSpec(object):
         self.profiles: Dict[str, "FHIRStructureDefinition"] = {}
 
         # Load profiles
-        self.prepare()
-        self.read_profiles()
-        self.finalize()
+        with gc_paused():
+            self.prepare()
+            self.read_profiles()
+            self.finalize()
+
+    @classmethod
+    def load(
+        cls,
+        directory: Union[Path, SpecSource],
+        generator_config: "GeneratorConfig",
+        cache_dir: Optional[Path] = None,
+    ) -> "FHIRSpec":
+        """ Return the specification of the directory, parsed by a previous run
+        if possible.
+
+        The parsed specification, with its classes, is pickled to `cache_dir`,
+        by default the `fhirspec` directory of the download directory of the
+        config, keyed by the content of the specification files, the settings of
+        the generator config used to parse them and the sources of fhirzeug.
+        Later runs load it instead of parsing the specification again, even with
+        different templates or output settings. The directory of the
+        specification, which may be a package of the user, is never written to,
+        and the specification is only parsed if the cache cannot be written.
+        """
+        source = as_source(directory)
+        if cache_dir is None:
+            cache_dir = generator_config.download_directory.destination / "fhirspec"
+        # Only the last parsed version of each specification directory is kept
+        prefix = "fhirspec-" + sha256_digest(str(source.directory.resolve()))[:16]
+        cache_key = cls.cache_key(source, generator_config)
+        cache_path = cache_dir / f"{prefix}-{cache_key}.pickle"
+        if cache_path.exists():
+            try:
+                with gc_paused(), cache_path.open("rb") as handle:
+                    spec = pickle.load(handle)
+            except Exception as e:
+                logger.warning(
+                    f"Ignoring invalid specification cache {cache_path}: {e}"
+                )
+            else:
+                logger.info(f"Loaded parsed specification from {cache_path}")
+                spec.generator_config = generator_config
+                spec.source = source
+                return spec
+
+        spec = cls(source, generator_config)
+        tmp_path = cache_path.with_suffix(f".{os.getpid()}.tmp")
+        try:
+            cache_dir.mkdir(parents=True, exist_ok=True)
+            for stale_path in cache_dir.glob(f"{prefix}-*.pickle"):
+                stale_path.unlink()
+            with tmp_path.open("wb") as handle:
+                pickle.dump(spec, handle, protocol=pickle.HIGHEST_PROTOCOL)
+            tmp_path.replace(cache_path)
+        except OSError as e:
+            logger.warning(f"Not caching the parsed specification in {cache_dir}: {e}")
+            with contextlib.suppress(OSError):
+                tmp_path.unlink()
+        else:
+            logger.info(f"Saved parsed specification to {cache_path}")
+        return spec
+
+    @staticmethod
+    def cache_key(
+        directory: Union[Path, SpecSource], generator_config: "GeneratorConfig"
+    ) -> str:
+        """ Key of the specification parsed from the directory with the config.
+        """
+        source = as_source(directory)
+        config = generator_config.dict(exclude=SPEC_CACHE_IGNORED_SETTINGS)
+        return sha256_digest(
+            str(SPEC_CACHE_VERSION),
+            json.dumps(config, sort_keys=True, default=str),
+            sources_digest(),
+            *(f"{name}:{source.digest(name)}" for name in SPEC_FILES),
+        )[:16]
 
     def prepare(self):
         """ Run actions before starting to parse profiles.
@@ -57,20 +197,19 @@ class FHIRSpec(object):
         """ Return an array of the Bundle's entry's "resource" elements.
         """
         logger.info("Reading {}".format(filename))
-        filepath = os.path.join(self.directory, filename)
-        with io.open(filepath, encoding="utf-8") as handle:
+        with self.source.open(filename) as handle:
             parsed = json.load(handle)
             if "resourceType" not in parsed:
                 raise Exception(
                     'Expecting "resourceType" to be present, but is not in {}'.format(
-                        filepath
+                        filename
                     )
                 )
             if "Bundle" != parsed["resourceType"]:
                 raise Exception('Can only process "Bundle" resources')
             if "entry" not in parsed:
                 raise Exception(
-                    "There are no entries in the Bundle at {}".format(filepath)
+                    "There are no entries in the Bundle at {}".format(filename)
                 )
 
             return [e["resource"] for e in parsed["entry"]]
@@ -306,15 +445,19 @@ class FHIRVersionInfo(object):
         self.date = now.isoformat()
         self.year = now.year
 
-        infofile = os.path.join(directory, "version.info")
-        self.version = self.read_version(infofile)
+        with spec.source.open("version.info") as handle:
+            self.version = self.parse_version(io.TextIOWrapper(handle, "utf-8"))
 
     def read_version(self, filepath):
         assert os.path.isfile(filepath)
         with io.open(filepath, "r", encoding="utf-8") as handle:
-            for line in handle.readlines():
-                if line.startswith("FhirVersion"):
-                    return line.split("=", 2)[1].strip()
+            return self.parse_version(handle)
+
+    @staticmethod
+    def parse_version(handle):
+        for line in handle.readlines():
+            if line.startswith("FhirVersion"):
+                return line.split("=", 2)[1].strip()
 
 
 class FHIRValueSetEnum(object):
@@ -532,6 +675,9 @@ class FHIRStructureDefinition(object):
         self.structure = None
         self.elements = None
         self.main_element = None
+        self._elements_by_id: Dict[str, "FHIRStructureDefinitionElement"] = {}
+        self._elements_by_path: Dict[str, "FHIRStructureDefinitionElement"] = {}
+        self._elements_by_name: Dict[str, "FHIRStructureDefinitionElement"] = {}
         self._class_map = {}
         self.classes: List[fhirclass.FHIRClass] = []
         self._did_finalize = False
@@ -572,23 +718,22 @@ class FHIRStructureDefinition(object):
         """
         struct = self.structure.differential  # or self.structure.snapshot
         if struct is not None:
-            mapped = {}
             self.elements = []
             for elem_dict in struct:
                 element = FHIRStructureDefinitionElement(
                     self, elem_dict, self.main_element is None
                 )
                 self.elements.append(element)
-                mapped[element.path] = element
+                self.index_element(element)
 
                 # establish hierarchy (may move to extra loop in case elements are no longer in order)
                 if element.is_main_profile_element:
                     self.main_element = element
-                parent = mapped.get(element.parent_name)
+                parent = self._elements_by_path.get(element.parent_name)
                 if parent:
                     parent.add_child(element)
 
-            # resolve element dependencies
+            # resolve element dependencies, once all elements are indexed
             for element in self.elements:
                 element.resolve_dependencies()
 
@@ -618,26 +763,28 @@ class FHIRStructureDefinition(object):
                 self.found_class(sub)
             self.targetname = snap_class.name
 
+    def index_element(self, element):
+        """ Index an element by id and name, keeping the first element for each,
+        and by path, keeping the last one: the one later elements are children of.
+        """
+        self._elements_by_path[element.path] = element
+        if element.definition.id is not None:
+            self._elements_by_id.setdefault(element.definition.id, element)
+        if element.definition.name is not None:
+            self._elements_by_name.setdefault(element.definition.name, element)
+
     def element_with_id(self, ident):
         """ Returns a FHIRStructureDefinitionElementDefinition with the given
         id, if found. Used to retrieve elements defined via `contentReference`.
         """
-        if self.elements is not None:
-            for element in self.elements:
-                if element.definition.id == ident:
-                    return element
-        return None
+        return self._elements_by_id.get(ident)
 
     def dstu2_element_with_name(self, name):
         """ Returns a FHIRStructureDefinitionElementDefinition with the given
         name, if found. Used to retrieve elements defined via `nameReference`
         used in DSTU-2.
         """
-        if self.elements is not None:
-            for element in self.elements:
-                if element.definition.name == name:
-                    return element
-        return None
+        return self._elements_by_name.get(name)
 
     # MARK: Class Handling
 
@@ -672,7 +819,7 @@ class FHIRStructureDefinition(object):
             for prop in klass.properties:
                 prop_cls_name = prop.class_name
                 if prop.enum is not None:
-                    enum_cls, did_create = fhirclass.FHIRClass.for_element(prop.enum)
+                    enum_cls, did_create = self.spec.classes.for_element(prop.enum)
                     enum_cls.module = prop.enum.name
                     prop.module_name = enum_cls.module
                     if enum_cls.name not in needed:
@@ -683,7 +830,7 @@ class FHIRStructureDefinition(object):
                     prop_cls_name not in internal
                     and not self.spec.class_name_is_native(prop_cls_name)
                 ):
-                    prop_cls = fhirclass.FHIRClass.with_name(prop_cls_name)
+                    prop_cls = self.spec.classes.with_name(prop_cls_name)
                     if prop_cls is None:
                         raise Exception(
                             'There is no class "{}" for property "{}" on "{}" in {}'.format(
@@ -732,7 +879,7 @@ class FHIRStructureDefinition(object):
         # assign all super-classes as objects
         for cls in self.classes:
             if cls.superclass is None:
-                super_cls = fhirclass.FHIRClass.with_name(cls.superclass_name)
+                super_cls = self.spec.classes.with_name(cls.superclass_name)
                 if super_cls is None and cls.superclass_name is not None:
                     raise Exception(
                         'There is no class implementation for class named "{}" in profile "{}"'.format(
@@ -760,6 +907,12 @@ class FHIRStructureDefinitionStructure(object):
 
         self.parse_from(profile_dict)
 
+    def __getstate__(self):
+        # The snapshot is not used to create classes: leave it out of the cache
+        state = self.__dict__.copy()
+        state["snapshot"] = None
+        return state
+
     def parse_from(self, json_dict):
         name = json_dict.get("name")
         if not name:
@@ -858,7 +1011,7 @@ class FHIRStructureDefinitionElement(object):
             return None, None
 
         subs = []
-        cls, did_create = fhirclass.FHIRClass.for_element(self)
+        cls, did_create = self.profile.spec.classes.for_element(self)
         if did_create:  # manual_profiles
             if module is None:
                 if self.profile.manual_module is not None:
@@ -1,8 +1,12 @@
 import shutil
+from pathlib import Path
+from typing import Optional, TextIO
 
+from .buildmanifest import BuildManifest
 from .fhirspec import FHIRSpec
 from . import fhirrenderer
 from .generators import get_generator_path
+from .logger import logger
 
 
 def generate(spec: FHIRSpec):
@@ -20,10 +24,11 @@ def generate(spec: FHIRSpec):
     dest_directory = output_directory.joinpath(
         generator_config.copy_examples.destination
     )
-    dest_directory.mkdir(parents=True, exist_ok=True)
-    for source_path in spec.directory.glob("*-example.json"):
-        dest_path = dest_directory.joinpath(source_path.name)
-        shutil.copy2(source_path, dest_path)
+    spec.source.export(
+        spec.source.glob("*-example.json"),
+        dest_directory,
+        generator_config.copy_examples.mode,
+    )
 
     # Copy static files
     shutil.copytree(
@@ -33,27 +38,156 @@ def generate(spec: FHIRSpec):
     # Generate main file
     if generator_config.template.generate_code:
         dest_filepath = output_directory / generator_config.output_file.destination
-        with dest_filepath.open("w") as f_out:
-            header_filepath = generator_path / "templates/resource_header.py"
-            custom_validators_filepath = (
-                generator_path / "templates/resource_custom_validators.py"
-            )
-            footer_filepath = generator_path / "templates/resource_footer.py"
+        manifest = (
+            BuildManifest.for_spec(spec) if generator_config.incremental else None
+        )
+        if generator_config.split_modules:
+            write_package(spec, generator_path, dest_filepath.with_suffix(""), manifest)
+        else:
+            write_module(spec, generator_path, dest_filepath, manifest)
+        if manifest is not None:
+            manifest.save()
+
+
+def write_module(
+    spec: FHIRSpec,
+    generator_path: Path,
+    dest_filepath: Path,
+    manifest: Optional[BuildManifest] = None,
+) -> None:
+    """Write all the generated code to a single file.
+
+    Args:
+        spec: A parsed specification.
+        generator_path: Directory of the generator.
+        dest_filepath: Path of the file to write.
+        manifest: Build manifest to reuse the code rendered by the previous
+            generation, if any.
+    """
+    package_path = dest_filepath.with_suffix("")
+    if package_path.joinpath("__init__.py").exists():
+        logger.info(f"Removing package {package_path} replaced by {dest_filepath}")
+        shutil.rmtree(package_path)
+
+    renderer = fhirrenderer.FHIRStructureDefinitionRenderer(spec, manifest)
+    with dest_filepath.open("w") as f_out:
+        # Copy Header
+        _copy_template(generator_path, "resource_header.py", f_out)
+
+        # Render Enums
+        fhirrenderer.FHIRValueSetRenderer(spec, manifest).render(f_out)
+
+        # Render Resources
+        renderer.render(f_out)
+        renderer.render_resource_index(renderer.get_classes_to_render(), f_out)
+
+        # Copy custom validators
+        _copy_template(generator_path, "resource_custom_validators.py", f_out)
+
+        # Copy Footer
+        _copy_template(generator_path, "primitive_extension.py", f_out)
+        _copy_template(generator_path, "resource_footer.py", f_out)
+        _copy_template(generator_path, "resource_factories.py", f_out)
+        _copy_template(generator_path, "bundle_streaming.py", f_out)
+        _copy_template(generator_path, "bundle_index.py", f_out)
 
-            # Copy Header
-            with header_filepath.open("r") as f_in:
-                shutil.copyfileobj(f_in, f_out)
 
-            # Render Enums
-            fhirrenderer.FHIRValueSetRenderer(spec).render(f_out)
+def write_package(
+    spec: FHIRSpec,
+    generator_path: Path,
+    package_path: Path,
+    manifest: Optional[BuildManifest] = None,
+) -> None:
+    """Write the generated code as a package with one module per resource.
+
+    Shared code, enums and data types get their own modules, imported with the
+    package. Resource modules are written to the `resources` subpackage and only
+    imported when one of their classes is first accessed.
+
+    Args:
+        spec: A parsed specification.
+        generator_path: Directory of the generator.
+        package_path: Directory of the package to write.
+        manifest: Build manifest to reuse the code rendered by the previous
+            generation, if any.
+    """
+    module_filepath = package_path.with_suffix(".py")
+    if module_filepath.exists():
+        logger.info(f"Removing {module_filepath} replaced by package {package_path}")
+        module_filepath.unlink()
+    shutil.rmtree(package_path, ignore_errors=True)
+    resources_path = package_path / "resources"
+    resources_path.mkdir(parents=True)
+
+    renderer = fhirrenderer.FHIRPackageRenderer(spec, manifest)
+    classes = renderer.get_classes_to_render()
+    datatypes, resource_modules = renderer.split_classes(classes)
+    resource_classes = [
+        clazz for module in resource_modules.values() for clazz in module
+    ]
+
+    with package_path.joinpath("fhirbase.py").open("w") as f_out:
+        _copy_template(generator_path, "resource_header.py", f_out)
+        renderer.copy_files(None, f_out)
+
+    with package_path.joinpath("codesystems.py").open("w") as f_out:
+        renderer.render_module_header(
+            "Enums of the CodeSystems defined by the specification.",
+            f_out,
+            imports=[(".fhirbase", "DocEnum")],
+        )
+        fhirrenderer.FHIRValueSetRenderer(spec, manifest).render(f_out)
+
+    with package_path.joinpath("datatypes.py").open("w") as f_out:
+        renderer.render_module_header(
+            "Data types defined by the specification.",
+            f_out,
+            star_imports=[".fhirbase", ".codesystems"],
+        )
+        renderer.render_classes(datatypes, f_out)
+        _copy_template(generator_path, "primitive_extension.py", f_out)
+        _copy_template(generator_path, "package_module_footer.py", f_out)
+
+    with resources_path.joinpath("__init__.py").open("w") as f_out:
+        f_out.write('"""Resources, one module per resource."""\n')
+
+    # Fields of type `Resource` need the class in every resource module
+    resource_class = spec.classes.with_name("Resource")
+    for module, module_classes in resource_modules.items():
+        imports = [("..", "from_dict")]
+        names = {clazz.name for clazz in module_classes}
+        for superclass in [clazz.superclass for clazz in module_classes]:
+            if (
+                superclass is not None
+                and superclass.module in resource_modules
+                and superclass.name not in names
+            ):
+                imports.append((f".{superclass.module}", superclass.name))
+                names.add(superclass.name)
+        if resource_class is not None and resource_class.name not in names:
+            imports.append((f".{resource_class.module}", resource_class.name))
+
+        with resources_path.joinpath(f"{module}.py").open("w") as f_out:
+            renderer.render_module_header(
+                f"Resource {module_classes[0].name}.",
+                f_out,
+                star_imports=["..datatypes"],
+                imports=imports,
+            )
+            renderer.render_classes(module_classes, f_out)
+            _copy_template(generator_path, "package_module_footer.py", f_out)
 
-            # Render Resources
-            fhirrenderer.FHIRStructureDefinitionRenderer(spec).render(f_out)
+    with package_path.joinpath("__init__.py").open("w") as f_out:
+        renderer.render_init_header(resource_classes, f_out)
+        renderer.render_resource_index(classes, f_out)
+        _copy_template(generator_path, "resource_custom_validators.py", f_out)
+        _copy_template(generator_path, "resource_factories.py", f_out)
+        _copy_template(generator_path, "bundle_streaming.py", f_out)
+        _copy_template(generator_path, "bundle_index.py", f_out)
+        _copy_template(generator_path, "package_footer.py", f_out)
 
-            # Copy custom validators
-            with custom_validators_filepath.open("r") as f_in:
-                shutil.copyfileobj(f_in, f_out)
 
-            # Copy Footer
-            with footer_filepath.open("r") as f_in:
-                shutil.copyfileobj(f_in, f_out)
+def _copy_template(generator_path: Path, filename: str, f_out: TextIO) -> None:
+    """Copy a static template of the generator to the output file."""
+    with generator_path.joinpath("templates", filename).open("r") as f_in:
+        shutil.copyfileobj(f_in, f_out)
@@ -0,0 +1,235 @@
+"""Benchmark the generated models over a corpus of JSON resources.
+
+Run it on the official examples copied with the generated package, or directly on
+the examples archive of the specification, `examples-json.zip`:
+
+    python -m pydantic_fhir.benchmark tests/test_examples/examples --output results.json
+    python -m pydantic_fhir.benchmark examples-json.zip --output results.json
+
+Results are written as JSON so that runs of different generator versions can be
+compared with `--compare`, which exits with an error on regressions.
+"""
+import argparse
+import json
+import os
+import platform
+import subprocess
+import sys
+import time
+import tracemalloc
+import typing
+import zipfile
+from pathlib import Path
+
+import pydantic
+
+from . import r4
+
+OPERATIONS = ("from_dict", "dict", "json", "round_trip")
+
+Results = typing.Dict[str, typing.Any]
+
+
+def read_corpus(path: Path) -> typing.Iterator[typing.Tuple[str, str]]:
+    """Yield the name and raw JSON of each resource of a corpus.
+
+    The corpus is a JSON file, a directory of `*.json` files or a ZIP archive of
+    `*.json` files, like the examples archive of the specification.
+    """
+    if path.is_dir():
+        for file_path in sorted(path.glob("*.json")):
+            yield file_path.name, file_path.read_text(encoding="utf-8")
+    elif zipfile.is_zipfile(path):
+        with zipfile.ZipFile(path) as archive:
+            for name in sorted(archive.namelist()):
+                if name.endswith(".json"):
+                    yield name, archive.read(name).decode("utf-8")
+    else:
+        yield path.name, path.read_text(encoding="utf-8")
+
+
+def run_benchmarks(
+    corpus: typing.Iterable[typing.Tuple[str, str]], repeat: int = 3, fast: bool = True,
+) -> Results:
+    """Measure the generated models over the resources of a corpus.
+
+    `corpus` yields the name and raw JSON of each resource, see `read_corpus`.
+
+    Each operation is run `repeat` times over the whole corpus and the fastest
+    run is kept, per resource and in total:
+
+    - `from_dict`: load the resource from the decoded JSON document.
+    - `dict`: export the loaded resource with `.dict()`.
+    - `json`: serialize the loaded resource with `.json()`.
+    - `round_trip`: decode the raw JSON, load, serialize and decode it again.
+
+    The import time of `r4` is measured in a new interpreter, and the peak memory
+    while loading the whole corpus with `tracemalloc`. Files that cannot be loaded
+    are listed in `errors` and left out of the measures.
+    """
+    raws: typing.Dict[str, str] = {}
+    documents: typing.Dict[str, typing.Any] = {}
+    resources: typing.Dict[str, r4.FHIRAbstractBase] = {}
+    errors: typing.Dict[str, str] = {}
+    for name, raw in corpus:
+        try:
+            document = r4.json_loads(raw)
+            resources[name] = r4.from_dict(document, fast=fast)
+        except (ValueError, pydantic.ValidationError) as e:
+            errors[name] = str(e)
+        else:
+            raws[name] = raw
+            documents[name] = document
+
+    def round_trip(name: str) -> typing.Any:
+        resource = r4.from_dict(r4.json_loads(raws[name]), fast=fast)
+        return r4.json_loads(resource.json(by_alias=True, exclude_unset=True))
+
+    operations: typing.Dict[str, typing.Callable[[str], typing.Any]] = {
+        "from_dict": lambda name: r4.from_dict(documents[name], fast=fast),
+        "dict": lambda name: resources[name].dict(by_alias=True, exclude_unset=True),
+        "json": lambda name: resources[name].json(by_alias=True, exclude_unset=True),
+        "round_trip": round_trip,
+    }
+    files: typing.Dict[str, typing.Dict[str, float]] = {name: {} for name in raws}
+    totals: typing.Dict[str, typing.Dict[str, float]] = {}
+    for operation, function in operations.items():
+        for name in raws:
+            files[name][operation] = _best_time(function, name, repeat)
+        total = sum(files[name][operation] for name in raws)
+        totals[operation] = {
+            "total": total,
+            "mean": total / len(raws) if raws else 0.0,
+            "resources_per_second": len(raws) / total if total else 0.0,
+        }
+
+    return {
+        "environment": {
+            "python": platform.python_version(),
+            "pydantic": pydantic.VERSION,
+            "fast": fast,
+            "repeat": repeat,
+        },
+        "resources": len(raws),
+        "import_time": min(_import_time() for _ in range(repeat)),
+        "peak_memory": _peak_memory(documents.values(), fast),
+        "operations": totals,
+        "files": files,
+        "errors": errors,
+    }
+
+
+def compare(
+    results: Results, baseline: Results, threshold: float = 1.1
+) -> typing.List[str]:
+    """Compare results with the results of a previous run.
+
+    Return a message for each measure that is more than `threshold` times the
+    one of `baseline`, empty if there is no regression.
+    """
+    measures = [("import_time", results["import_time"], baseline["import_time"])]
+    measures.append(("peak_memory", results["peak_memory"], baseline["peak_memory"]))
+    for operation in OPERATIONS:
+        if operation in baseline["operations"]:
+            measures.append(
+                (
+                    f"{operation} total",
+                    results["operations"][operation]["total"],
+                    baseline["operations"][operation]["total"],
+                )
+            )
+    return [
+        f"{name}: {value:.6g} is {value / previous:.2f} times {previous:.6g}"
+        for name, value, previous in measures
+        if previous and value > previous * threshold
+    ]
+
+
+def _best_time(
+    function: typing.Callable[[str], typing.Any], name: str, repeat: int
+) -> float:
+    """Return the fastest time of `repeat` calls of `function(name)`."""
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        function(name)
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def _import_time() -> float:
+    """Measure the import time of `r4` in a new interpreter."""
+    code = (
+        "import time\n"
+        "start = time.perf_counter()\n"
+        f"import {r4.__name__}\n"
+        "print(time.perf_counter() - start)\n"
+    )
+    output = subprocess.run(
+        [sys.executable, "-c", code],
+        check=True,
+        stdout=subprocess.PIPE,
+        env={**os.environ, "PYTHONPATH": os.pathsep.join(sys.path)},
+    ).stdout
+    return float(output)
+
+
+def _peak_memory(documents: typing.Iterable[typing.Any], fast: bool) -> int:
+    """Return the peak memory in bytes while loading all documents at once."""
+    tracemalloc.start()
+    try:
+        resources = [r4.from_dict(document, fast=fast) for document in documents]
+        del resources
+        return tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+
+
+def main(argv: typing.Optional[typing.Sequence[str]] = None) -> int:
+    """Run the benchmarks from the command line and return the exit status."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument(
+        "corpus", type=Path, help="JSON file, directory or ZIP archive of *.json files",
+    )
+    parser.add_argument("--output", type=Path, help="write results to this file")
+    parser.add_argument(
+        "--compare", type=Path, help="results of a previous run to compare with"
+    )
+    parser.add_argument(
+        "--threshold",
+        type=float,
+        default=1.1,
+        help="ratio above which a measure is a regression (default: 1.1)",
+    )
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument(
+        "--full-validation", action="store_true", help="load without the fast path"
+    )
+    args = parser.parse_args(argv)
+
+    results = run_benchmarks(
+        read_corpus(args.corpus), repeat=args.repeat, fast=not args.full_validation
+    )
+    if args.output:
+        args.output.write_text(json.dumps(results, indent=2, sort_keys=True))
+
+    print(f"{results['resources']} resources, {len(results['errors'])} errors")
+    print(f"import_time: {results['import_time']:.3f} s")
+    print(f"peak_memory: {results['peak_memory'] / 2 ** 20:.1f} MiB")
+    for operation, measures in results["operations"].items():
+        print(
+            f"{operation}: {measures['total']:.3f} s, "
+            f"{measures['resources_per_second']:.0f} resources/s"
+        )
+
+    if args.compare:
+        baseline = json.loads(args.compare.read_text())
+        regressions = compare(results, baseline, args.threshold)
+        for regression in regressions:
+            print(f"Regression of {regression}", file=sys.stderr)
+        return 1 if regressions else 0
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,143 @@
+"""Read and write FHIR Bulk Data files.
+
+Bulk Data files are NDJSON files, optionally compressed with gzip: one resource per
+line. See https://hl7.org/fhir/uv/bulkdata/ .
+"""
+import collections
+import concurrent.futures
+import gzip
+import itertools
+import os
+import typing
+from pathlib import Path
+
+import pydantic
+
+from . import r4
+
+PathType = typing.Union[str, Path]
+
+
+class LineError(typing.NamedTuple):
+    """Report of a line that could not be loaded."""
+
+    line_number: int
+    """Number of the line in the file, starting at 1."""
+
+    errors: typing.List[typing.Dict[str, typing.Any]]
+    """Errors of the `pydantic.ValidationError` raised for this line."""
+
+
+def read_ndjson(
+    path: PathType,
+    processes: typing.Optional[int] = None,
+    chunk_size: int = 1000,
+    fast: bool = True,
+) -> typing.Iterator[typing.Union[r4.FHIRAbstractResource, LineError]]:
+    """Load the resources of an NDJSON file, in the order of the file.
+
+    A `LineError` is yielded instead of the resource for each invalid line. Empty
+    lines are skipped. Files with a `.gz` suffix are decompressed.
+
+    Lines are loaded by chunks of `chunk_size` lines by a pool of `processes`
+    processes, `os.cpu_count()` by default. If `processes` is 1, lines are loaded
+    in the current process. Only a few chunks per process are read in advance.
+    See `r4.from_dict` for `fast`.
+    """
+    return _map_chunks(path, processes, chunk_size, fast, errors_only=False)
+
+
+def validate_ndjson(
+    path: PathType,
+    processes: typing.Optional[int] = None,
+    chunk_size: int = 1000,
+    fast: bool = True,
+) -> typing.Iterator[LineError]:
+    """Validate the resources of an NDJSON file and yield errors of invalid lines.
+
+    Same as `read_ndjson` but loaded resources are not sent back from the pool of
+    processes, which is faster when only errors are needed.
+    """
+    return _map_chunks(  # type: ignore
+        path, processes, chunk_size, fast, errors_only=True
+    )
+
+
+def write_ndjson(
+    path: PathType, resources: typing.Iterable[r4.FHIRAbstractBase]
+) -> int:
+    """Write resources to an NDJSON file, one per line.
+
+    The file is compressed with gzip if its suffix is `.gz`. Return the number of
+    written resources.
+    """
+    count = 0
+    with _open(path, "wt") as f_out:
+        for resource in resources:
+            f_out.write(resource.json(by_alias=True))
+            f_out.write("\n")
+            count += 1
+    return count
+
+
+def _map_chunks(
+    path: PathType,
+    processes: typing.Optional[int],
+    chunk_size: int,
+    fast: bool,
+    errors_only: bool,
+) -> typing.Iterator[typing.Union[r4.FHIRAbstractResource, LineError]]:
+    """Load the lines of an NDJSON file by chunks, see `read_ndjson`."""
+    if processes is None:
+        processes = os.cpu_count() or 1
+
+    with _open(path, "rt") as f_in:
+        chunks = _iter_chunks(f_in, chunk_size)
+        if processes == 1:
+            for chunk in chunks:
+                yield from _read_chunk(chunk, fast, errors_only)
+            return
+
+        with concurrent.futures.ProcessPoolExecutor(processes) as executor:
+            pending: typing.Deque[concurrent.futures.Future] = collections.deque()
+            for chunk in chunks:
+                pending.append(executor.submit(_read_chunk, chunk, fast, errors_only))
+                if len(pending) >= 2 * processes:
+                    yield from pending.popleft().result()
+            while pending:
+                yield from pending.popleft().result()
+
+
+def _open(path: PathType, mode: str) -> typing.IO:
+    """Open a text file, compressed with gzip if its suffix is `.gz`."""
+    if Path(path).suffix == ".gz":
+        return gzip.open(path, mode, encoding="utf-8")
+    return open(path, mode, encoding="utf-8")
+
+
+def _iter_chunks(
+    f_in: typing.IO, chunk_size: int
+) -> typing.Iterator[typing.List[typing.Tuple[int, str]]]:
+    """Iterate over chunks of numbered non-empty lines."""
+    lines = ((number, line) for number, line in enumerate(f_in, 1) if line.strip())
+    while True:
+        chunk = list(itertools.islice(lines, chunk_size))
+        if not chunk:
+            return
+        yield chunk
+
+
+def _read_chunk(
+    chunk: typing.List[typing.Tuple[int, str]], fast: bool, errors_only: bool
+) -> typing.List[typing.Union[r4.FHIRAbstractResource, LineError]]:
+    """Load the resources of a chunk of lines."""
+    results: typing.List[typing.Union[r4.FHIRAbstractResource, LineError]] = []
+    for line_number, line in chunk:
+        try:
+            resource = r4.from_raw(line, fast=fast)
+        except pydantic.ValidationError as e:
+            results.append(LineError(line_number, e.errors()))
+        else:
+            if not errors_only:
+                results.append(resource)
+    return results
@@ -0,0 +1,52 @@
+"""Test the benchmark of the generated models."""
+import copy
+import json
+import zipfile
+from pathlib import Path
+
+from pydantic_fhir import benchmark
+
+
+def test_benchmark(tmp_path: Path) -> None:
+    """Test results are written and compared with a previous run."""
+    corpus = tmp_path / "corpus"
+    corpus.mkdir()
+    corpus.joinpath("patient.json").write_text(
+        json.dumps({"resourceType": "Patient", "name": [{"family": "Chalmers"}]})
+    )
+    corpus.joinpath("invalid.json").write_text('{"resourceType": "Unknown"}')
+    output = tmp_path / "results.json"
+
+    assert benchmark.main([str(corpus), "--output", str(output), "--repeat", "1"]) == 0
+
+    results = json.loads(output.read_text())
+    assert results["resources"] == 1
+    assert list(results["errors"]) == ["invalid.json"]
+    assert list(results["files"]) == ["patient.json"]
+    assert set(results["operations"]) == set(benchmark.OPERATIONS)
+    assert results["import_time"] > 0
+    assert results["peak_memory"] > 0
+
+    assert benchmark.compare(results, results) == []
+    baseline = copy.deepcopy(results)
+    baseline["operations"]["json"]["total"] /= 2
+    assert [
+        message.split(":")[0] for message in benchmark.compare(results, baseline)
+    ] == ["json total"]
+
+
+def test_benchmark_archive(tmp_path: Path) -> None:
+    """Test the benchmark runs on a ZIP archive of resources."""
+    archive_path = tmp_path / "examples-json.zip"
+    with zipfile.ZipFile(archive_path, "w") as archive:
+        archive.writestr("patient-example.json", '{"resourceType": "Patient"}')
+        archive.writestr("README.txt", "not a resource")
+    output = tmp_path / "results.json"
+
+    assert (
+        benchmark.main([str(archive_path), "--output", str(output), "--repeat", "1"])
+        == 0
+    )
+    results = json.loads(output.read_text())
+    assert list(results["files"]) == ["patient-example.json"]
+    assert results["errors"] == {}
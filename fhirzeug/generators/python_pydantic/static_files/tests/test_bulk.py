@@ -0,0 +1,47 @@
+"""Test reading and writing Bulk Data NDJSON files."""
+from pathlib import Path
+
+import pytest
+
+from pydantic_fhir import bulk, r4
+
+RESOURCES = [
+    r4.Patient(id=str(index), name=[{"family": f"Family {index}"}])
+    for index in range(10)
+] + [r4.Observation(status="final", code={"text": "Glucose"}, value_string="é")]
+
+
+@pytest.mark.parametrize("filename", ["export.ndjson", "export.ndjson.gz"])
+@pytest.mark.parametrize("processes", [1, 2])
+def test_write_read(tmp_path: Path, filename: str, processes: int) -> None:
+    """Test written resources are read in the same order."""
+    path = tmp_path / filename
+    assert bulk.write_ndjson(path, RESOURCES) == len(RESOURCES)
+
+    resources = list(bulk.read_ndjson(path, processes=processes, chunk_size=3))
+    assert resources == RESOURCES
+
+
+@pytest.mark.parametrize("processes", [1, 2])
+def test_read_errors(tmp_path: Path, processes: int) -> None:
+    """Test invalid lines are reported with their line number."""
+    path = tmp_path / "export.ndjson"
+    bulk.write_ndjson(path, RESOURCES[:2])
+    with path.open("a") as f_out:
+        f_out.write('{"resourceType": "Patient", "gender": "?"}\n')
+        f_out.write("\n")
+        f_out.write("not json\n")
+        f_out.write("[]\n")
+        f_out.write(RESOURCES[2].json(by_alias=True) + "\n")
+
+    results = list(bulk.read_ndjson(path, processes=processes, chunk_size=2))
+
+    assert results[:2] == RESOURCES[:2]
+    assert [result.line_number for result in results[2:5]] == [3, 5, 6]
+    assert all(isinstance(result, bulk.LineError) for result in results[2:5])
+    assert results[2].errors[0]["loc"][-1] == "gender"
+    assert results[5] == RESOURCES[2]
+    assert (
+        list(bulk.validate_ndjson(path, processes=processes, chunk_size=2))
+        == results[2:5]
+    )
@@ -0,0 +1,136 @@
+"""Test resolving the references between the resources of a Bundle."""
+import typing
+
+import pytest
+
+from pydantic_fhir import r4
+
+BUNDLE = {
+    "resourceType": "Bundle",
+    "type": "transaction",
+    "entry": [
+        {
+            "fullUrl": "http://example.com/fhir/Patient/1",
+            "resource": {
+                "resourceType": "Patient",
+                "id": "1",
+                "meta": {"versionId": "2"},
+                "generalPractitioner": [{"reference": "#gp"}],
+                "contained": [{"resourceType": "Practitioner", "id": "gp"}],
+            },
+        },
+        {
+            "fullUrl": "http://example.com/fhir/Observation/1",
+            "resource": {
+                "resourceType": "Observation",
+                "id": "1",
+                "status": "final",
+                "code": {"text": "Glucose"},
+                "subject": {"reference": "Patient/1"},
+            },
+        },
+        {
+            "fullUrl": "http://other.example.com/fhir/Patient/2",
+            "resource": {"resourceType": "Patient", "id": "2"},
+        },
+        {
+            "fullUrl": "urn:uuid:61ebe359-bfdc-4613-8bf2-c5e300945f0a",
+            "resource": {"resourceType": "Patient", "id": "3"},
+        },
+        {"fullUrl": "http://example.com/fhir/Patient/4"},
+    ],
+}
+
+
+@pytest.mark.parametrize(
+    ("reference", "container", "expected"),
+    [
+        ("http://example.com/fhir/Patient/1", None, 0),
+        ("https://example.com/fhir/Patient/1", None, 0),
+        ("http://example.com/fhir/Patient/1/_history/2", None, 0),
+        ("http://example.com/fhir/Patient/1/_history/1", None, None),
+        ("Patient/1", 1, 0),
+        ("Patient/1", None, 0),
+        ("Patient/2", None, 2),
+        ("Patient/2", 1, None),
+        ("Patient/3", None, 3),
+        ("urn:uuid:61ebe359-bfdc-4613-8bf2-c5e300945f0a", None, 3),
+        ("http://example.com/fhir/Patient/4", None, None),
+        ("Observation/2", None, None),
+        ("https://example.org/foobar", None, None),
+        ("#", 0, 0),
+    ],
+)
+def test_resolve(
+    reference: str, container: typing.Optional[int], expected: typing.Optional[int]
+) -> None:
+    """Test references are resolved to the resources of the entries."""
+    bundle = r4.from_dict(BUNDLE)
+    index = r4.BundleIndex(bundle)
+    resolved = index.resolve(
+        reference,
+        container=bundle.entry[container].resource if container is not None else None,
+    )
+    if expected is None:
+        assert resolved is None
+    else:
+        assert resolved is bundle.entry[expected].resource
+
+
+def test_resolve_references() -> None:
+    """Test resolving Reference elements, including to contained resources."""
+    bundle = r4.from_dict(BUNDLE)
+    index = r4.BundleIndex(bundle)
+    patient = bundle.entry[0].resource
+    observation = bundle.entry[1].resource
+
+    assert index.resolve(observation.subject) is patient
+    assert index.resolve(patient.general_practitioner[0], patient) is (
+        patient.contained[0]
+    )
+    assert index.resolve(patient.general_practitioner[0]) is None
+    assert index.resolve(r4.Reference(display="Peter")) is None
+
+
+def test_resolve_versions() -> None:
+    """Test versioned references to the resources of a history Bundle."""
+    bundle = r4.from_dict(
+        {
+            "resourceType": "Bundle",
+            "type": "history",
+            "entry": [
+                {
+                    "fullUrl": "http://example.com/fhir/Patient/1",
+                    "resource": {
+                        "resourceType": "Patient",
+                        "id": "1",
+                        "meta": {"versionId": str(version)},
+                    },
+                }
+                for version in (2, 1)
+            ],
+        }
+    )
+    index = r4.BundleIndex(bundle)
+    latest, first = (entry.resource for entry in bundle.entry)
+
+    assert index.resolve("Patient/1") is latest
+    assert index.resolve("Patient/1/_history/2") is latest
+    assert index.resolve("Patient/1/_history/1") is first
+    assert index.resolve("http://example.com/fhir/Patient/1/_history/1") is first
+    assert index.resolve("Patient/1/_history/3") is None
+
+
+def test_resolve_reused_container_id() -> None:
+    """Test containers are not confused with objects reusing their id."""
+    bundle = r4.from_dict(BUNDLE)
+    index = r4.BundleIndex(bundle)
+    patient = bundle.entry[0].resource
+    other = r4.Patient(id="1")
+    # As if `other` had the id of a collected container
+    index._contained[id(other)] = index._contained[id(patient)]
+    index._base_urls[id(other)] = index._base_urls[id(patient)]
+
+    assert index.resolve("#gp", other) is None
+    assert index.resolve("Patient/2", other) is bundle.entry[2].resource
+    assert index.resolve("#gp", patient) is patient.contained[0]
@@ -0,0 +1,103 @@
+"""Test reading the resources of a Bundle one entry at a time."""
+import io
+import json
+import typing
+
+import pytest
+import pydantic
+
+from pydantic_fhir import r4
+
+BUNDLE = {
+    "resourceType": "Bundle",
+    "id": "bundle-example",
+    "type": "searchset",
+    "total": 3,
+    "link": [{"relation": "self", "url": "https://example.com/Patient"}],
+    "entry": [
+        {
+            "fullUrl": "https://example.com/Patient/1",
+            "resource": {
+                "resourceType": "Patient",
+                "id": "1",
+                "name": [{"family": "Chalmers", "given": ["Peter", "James"]}],
+            },
+        },
+        {"fullUrl": "https://example.com/Patient/2", "search": {"mode": "match"}},
+        {
+            "resource": {
+                "resourceType": "Observation",
+                "status": "final",
+                "code": {"text": "Glucose é"},
+                "valueQuantity": {"value": 6.3, "unit": "mmol/l"},
+            }
+        },
+    ],
+    "signature": {"type": []},
+}
+
+
+@pytest.mark.parametrize("chunk_size", [1, 7, 2 ** 16])
+@pytest.mark.parametrize("binary", [True, False])
+def test_iter_bundle_entries(chunk_size: int, binary: bool) -> None:
+    """Test resources are the same as the ones of the loaded Bundle."""
+    raw = json.dumps(BUNDLE, indent=2)
+    fp: typing.IO = io.BytesIO(raw.encode()) if binary else io.StringIO(raw)
+
+    resources = list(r4.iter_bundle_entries(fp, chunk_size=chunk_size))
+
+    bundle = r4.from_raw(raw)
+    assert resources == [
+        entry.resource for entry in bundle.entry if entry.resource is not None
+    ]
+    assert (
+        resources[1].value_quantity.value
+        == bundle.entry[2].resource.value_quantity.value
+    )
+
+
+def test_iter_bundle_entries_is_lazy() -> None:
+    """Test entries are yielded before the rest of the Bundle is read."""
+    raw = json.dumps(BUNDLE)
+    fp = io.StringIO(raw[: raw.index('{"fullUrl": "https://example.com/Patient/2"')])
+
+    entries = r4.iter_bundle_entries(fp, chunk_size=16)
+    assert isinstance(next(entries), r4.Patient)
+    with pytest.raises(pydantic.ValidationError):
+        next(entries)
+
+
+def test_iter_bundle_entries_malformed_entry() -> None:
+    """Test a malformed entry fails without reading the rest of the Bundle."""
+    entry = json.dumps({"resource": {"resourceType": "Patient", "id": "1"}})
+    raw = (
+        '{"resourceType": "Bundle", "entry": [{"resource": {"id": tru}}, '
+        + ", ".join([entry] * 1000)
+        + "]}"
+    )
+    fp = io.StringIO(raw)
+    with pytest.raises(pydantic.ValidationError):
+        list(r4.iter_bundle_entries(fp, chunk_size=64))
+    assert fp.tell() < 1024
+
+
+@pytest.mark.parametrize(
+    "raw",
+    [
+        "",
+        "[]",
+        "{}",
+        '{"resourceType": "Patient"}',
+        '{"entry": []}',
+        '{"resourceType": "Bundle", "entry": [{"resource": {"resourceType": "Unknown"}}]}',
+        '{"resourceType": "Bundle", "entry": [{"resource": {"resourceType": "Patient", "gender": "?"}}]}',
+        '{"resourceType": "Bundle", "entry": [{"resource": {"resourceType": "Patient", "id": "1", "id": "2"}}]}',
+        '{"resourceType": "Bundle", "entry": [{}, ]}',
+        '{"resourceType": "Bundle", 1: 1}',
+        '{"resourceType": "Bundle"} {}',
+    ],
+)
+def test_iter_bundle_entries_must_fail(raw: str) -> None:
+    """Test invalid Bundles raise a ValidationError."""
+    with pytest.raises(pydantic.ValidationError):
+        list(r4.iter_bundle_entries(io.StringIO(raw)))
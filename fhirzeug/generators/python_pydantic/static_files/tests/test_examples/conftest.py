@@ -1,11 +1,16 @@
+import zipfile
 from pathlib import Path
 
 
 def pytest_generate_tests(metafunc):
     if "fhir_file" in metafunc.fixturenames:
         examples_root = Path(__file__).parent.joinpath("examples")
+        examples_archive = examples_root.with_suffix(".zip")
+        if examples_archive.exists():
+            # Examples written to one archive by `--examples archive`
+            examples = list(zipfile.Path(examples_archive).iterdir())
+        else:
+            examples = list(examples_root.iterdir())
         metafunc.parametrize(
-            "fhir_file",
-            examples_root.iterdir(),
-            ids=(path.name for path in examples_root.iterdir()),
+            "fhir_file", examples, ids=(path.name for path in examples),
         )
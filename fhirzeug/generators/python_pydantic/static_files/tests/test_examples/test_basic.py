@@ -86,3 +86,75 @@ def test_list_instead_of_dict() -> None:
     with pytest.raises(pydantic.ValidationError):
         dict_["subject"] = [subject]  # As a list -> not expected
         r4.from_dict(dict_)
+
+
+def test_trusted_construction() -> None:
+    """Test that trusted input is not validated but converted to the field types."""
+    doc = {
+        "resourceType": "Patient",
+        "gender": "male",
+        "birthDate": "1973-06",
+        "name": [{"family": ""}],
+        "contained": [{"resourceType": "Practitioner", "id": "gp"}],
+    }
+    with pytest.raises(pydantic.ValidationError):
+        r4.Patient(**doc, unknown=1)
+
+    with r4.trusted_construction():
+        patient = r4.Patient(**doc, unknown=1)
+    assert patient == r4.from_dict(doc, validate=False)
+    assert patient.gender == r4.AdministrativeGender.male
+    assert patient.birth_date.precision == "month"
+    assert patient.name[0].family == ""
+    assert isinstance(patient.contained[0], r4.Practitioner)
+    assert patient.__fields_set__ == {
+        "resource_type",
+        "gender",
+        "birth_date",
+        "name",
+        "contained",
+    }
+
+    # Elements already built are kept as they are
+    name = r4.HumanName(family="Chalmers")
+    practitioner = r4.Practitioner(id="gp")
+    with r4.trusted_construction():
+        patient = r4.Patient(
+            name=[name], contained=[practitioner], meta=r4.Meta(versionId="1")
+        )
+    assert patient.name[0] is name
+    assert patient.contained[0] is practitioner
+    assert patient.meta.version_id == "1"
+
+    # Validation is back outside of the context
+    with pytest.raises(pydantic.ValidationError):
+        r4.Patient(**doc, unknown=1)
+
+
+def test_full_validation_of_nested_resources(monkeypatch) -> None:
+    """Test that `fast=False` validates nested resources with pydantic as well."""
+    doc = {
+        "resourceType": "Bundle",
+        "type": "collection",
+        "entry": [
+            {
+                "resource": {
+                    "resourceType": "Patient",
+                    "contained": [{"resourceType": "Practitioner", "id": "gp"}],
+                }
+            }
+        ],
+    }
+    fast_parsed = []
+
+    def fast_parse(values, clean=True):
+        fast_parsed.append(values["resourceType"])
+        return r4.Practitioner(**values)
+
+    monkeypatch.setattr(r4.Practitioner, "_fast_parse", fast_parse)
+    bundle = r4.from_dict(doc, fast=False)
+    assert isinstance(bundle.entry[0].resource.contained[0], r4.Practitioner)
+    assert fast_parsed == []
+
+    assert r4.from_dict(doc) == bundle
+    assert fast_parsed == ["Practitioner"]
@@ -3,6 +3,7 @@ import re
 import io
 import json
 import typing
+import zipfile
 from pathlib import Path
 from collections import Counter
 
@@ -38,7 +39,10 @@ def preprocess_whitespace(obj: typing.Any) -> typing.Any:
     return obj
 
 
-def test_read(fhir_file: Path):
+FHIRFile = typing.Union[Path, zipfile.Path]
+
+
+def test_read(fhir_file: FHIRFile):
     """Test if model is correctly read."""
     with _open_file(fhir_file) as f_in:
         doc = json.load(f_in)
@@ -46,7 +50,7 @@ def test_read(fhir_file: Path):
     assert r4.from_dict(doc) is not None
 
 
-def test_read_write(fhir_file: Path):
+def test_read_write(fhir_file: FHIRFile):
     """Test if a written model equals to the read version."""
     with _open_file(fhir_file) as f_in:
         json_in = f_in.read()
@@ -78,7 +82,36 @@ def test_read_write(fhir_file: Path):
     assert counter_in == counter_out
 
 
-def test_primitive_extension_exists(fhir_file: Path):
+def test_fast_path(fhir_file: FHIRFile):
+    """Test if the fast path reads the same model as the full validation."""
+    with _open_file(fhir_file) as f_in:
+        doc = r4.json_loads(f_in.read())
+
+    obj = r4.from_dict(doc)
+    obj_full_validation = r4.from_dict(doc, fast=False)
+
+    assert obj == obj_full_validation
+    assert obj.json(by_alias=True, exclude_unset=True) == obj_full_validation.json(
+        by_alias=True, exclude_unset=True
+    )
+
+
+def test_trusted_construction(fhir_file: FHIRFile):
+    """Test if serialized models are read back the same without validation."""
+    with _open_file(fhir_file) as f_in:
+        obj = r4.from_dict(r4.json_loads(f_in.read()))
+    json_str = obj.json(by_alias=True, exclude_unset=True)
+
+    obj_trusted = r4.from_raw(json_str, validate=False)
+    assert obj_trusted == obj
+    assert obj_trusted.json(by_alias=True, exclude_unset=True) == json_str
+    _check_same_types(obj_trusted, obj)
+
+    with r4.trusted_construction():
+        assert type(obj).parse_raw(json_str) == obj
+
+
+def test_primitive_extension_exists(fhir_file: FHIRFile):
     """Test each primitive field has the possibility of an extension.
 
     If a field type is forgotten in the generator settings (under
@@ -93,11 +126,13 @@ def test_primitive_extension_exists(fhir_file: Path):
         _check_field_extension_existence(resource, field, value)
 
 
-def _open_file(fhir_file: Path) -> io.TextIOWrapper:
+def _open_file(fhir_file: FHIRFile) -> io.TextIOWrapper:
     """Open FHIR file unless it has to be skipped."""
     if fhir_file.name in NOT_WORKING:
         pytest.skip("test disabled")
 
+    if isinstance(fhir_file, zipfile.Path):
+        return io.TextIOWrapper(fhir_file.open(), encoding="utf-8")
     return fhir_file.open()
 
 
@@ -129,3 +164,14 @@ def _check_field_extension_existence(
                 # Means that field is a JSON primitive type
                 field_extension = f"{field}__extension"
                 assert hasattr(resource, field_extension)
+
+
+def _check_same_types(value: typing.Any, expected: typing.Any) -> None:
+    assert type(value) is type(expected)
+    if isinstance(value, list):
+        for item, expected_item in zip(value, expected):
+            _check_same_types(item, expected_item)
+    elif isinstance(value, r4.FHIRAbstractBase):
+        assert value.__fields_set__ == expected.__fields_set__
+        for (_, subvalue), (_, expected_subvalue) in zip(value, expected):
+            _check_same_types(subvalue, expected_subvalue)
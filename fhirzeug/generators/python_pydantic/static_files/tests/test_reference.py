@@ -60,3 +60,30 @@ def test_reference_validator(values: typing.Dict, is_valid: bool) -> None:
     else:
         with pytest.raises(ValueError):
             r4._reference_validator(values)
+
+
+@pytest.mark.parametrize(
+    ("reference", "expected"),
+    [
+        ("Patient/23", (None, "Patient", "23", None)),
+        (
+            "https://fhir.example.org/r4/Patient/23/_history/2",
+            ("fhir.example.org/r4/", "Patient", "23", "2"),
+        ),
+        (
+            "http://fhir.example.org/Patient/Observation/1",
+            ("fhir.example.org/Patient/", "Observation", "1", None),
+        ),
+        ("http://fhir.example.org/Patient/foobar/23", None),
+        ("Resource/23", None),
+        ("foobar/23", None),
+        ("Patient/23/_history", None),
+    ],
+)
+def test_parse_literal_reference(reference: str, expected: typing.Any) -> None:
+    """Test literal references are parsed once."""
+    parsed = r4._parse_literal_reference(reference)
+    assert parsed == expected
+    if parsed is not None:
+        assert parsed.resource_type == expected[1]
+        assert r4._parse_literal_reference(reference) is parsed
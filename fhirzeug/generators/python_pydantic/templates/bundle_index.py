@@ -0,0 +1,111 @@
+
+
+# Resolve the references between the resources of a Bundle.
+
+
+class BundleIndex:
+    """Index of the resources of a Bundle, to resolve references in constant time.
+
+    Built in one pass over the entries of the Bundle. Resources are indexed by the
+    `fullUrl` of their entry, by type and id, and their contained resources by id,
+    following https://www.hl7.org/fhir/bundle.html#references .
+    """
+
+    def __init__(self, bundle: "Bundle"):
+        self._by_full_url: typing.Dict[str, "Resource"] = {}
+        # Keyed by the base URL of their `fullUrl`, if it is the URL of a FHIR
+        # RESTful server, then by None for all the resources.
+        self._by_id: typing.Dict[
+            typing.Tuple[typing.Optional[str], str, str], "Resource"
+        ] = {}
+        # Same keys followed by `meta.versionId`, for the versions of a history
+        self._by_version: typing.Dict[
+            typing.Tuple[typing.Optional[str], str, str, str], "Resource"
+        ] = {}
+        # Keyed by `id()` of the containing resources, which are kept in the values
+        # so that their ids are not reused by other objects
+        self._base_urls: typing.Dict[int, typing.Tuple["Resource", str]] = {}
+        self._contained: typing.Dict[
+            int, typing.Tuple["Resource", typing.Dict[str, "Resource"]]
+        ] = {}
+        for entry in bundle.entry or ():
+            if entry.resource is not None:
+                self._add(entry.resource, entry.full_url)
+
+    def _add(self, resource: "Resource", full_url: typing.Optional[str]) -> None:
+        if full_url is not None:
+            self._by_full_url.setdefault(full_url, resource)
+            parsed = _parse_literal_reference(full_url)
+            if parsed is not None and parsed.base_url is not None:
+                self._base_urls[id(resource)] = (resource, parsed.base_url)
+                self._add_key(
+                    resource,
+                    (parsed.base_url, parsed.resource_type, parsed.resource_id),
+                )
+        if resource.id is not None:
+            self._add_key(resource, (None, resource.resource_type, resource.id))
+        contained = getattr(resource, "contained", None)
+        if contained:
+            self._contained[id(resource)] = (
+                resource,
+                {f"#{item.id}": item for item in contained if item.id is not None},
+            )
+
+    def _add_key(
+        self, resource: "Resource", key: typing.Tuple[typing.Optional[str], str, str]
+    ) -> None:
+        self._by_id.setdefault(key, resource)
+        if resource.meta is not None and resource.meta.version_id is not None:
+            self._by_version.setdefault((*key, resource.meta.version_id), resource)
+
+    def resolve(
+        self,
+        reference: typing.Union[str, "Reference", None],
+        container: typing.Optional["Resource"] = None,
+    ) -> typing.Optional["Resource"]:
+        """Return the resource of the Bundle a reference points to, or None.
+
+        `container` is the resource of the Bundle holding the reference: relative
+        references are resolved against the base URL of its `fullUrl` and `#id`
+        references against its contained resources. Without it, relative
+        references match any resource of the Bundle with the same type and id.
+        A reference to a version only matches a resource with the same
+        `meta.versionId`, which may be any of the versions of a history Bundle.
+        """
+        if reference is not None and not isinstance(reference, str):
+            reference = reference.reference
+        if reference is None:
+            return None
+
+        if reference.startswith("#"):
+            if container is None:
+                return None
+            if reference == "#":
+                return container
+            return _by_container(self._contained, container, {}).get(reference)
+
+        resource = self._by_full_url.get(reference)
+        if resource is not None:
+            return resource
+
+        parsed = _parse_literal_reference(reference)
+        if parsed is None:
+            return None
+        base_url = parsed.base_url
+        if base_url is None and container is not None:
+            base_url = _by_container(self._base_urls, container, None)
+        key = (base_url, parsed.resource_type, parsed.resource_id)
+        if parsed.version is not None:
+            return self._by_version.get((*key, parsed.version))
+        return self._by_id.get(key)
+
+
+def _by_container(
+    values: typing.Dict[int, typing.Tuple["Resource", typing.Any]],
+    container: "Resource",
+    default: typing.Any,
+) -> typing.Any:
+    """Return the value of a cache keyed by `id()` for a container, if it is the
+    same object and not another one with the id of a collected container."""
+    indexed, value = values.get(id(container), (None, default))
+    return value if indexed is container else default
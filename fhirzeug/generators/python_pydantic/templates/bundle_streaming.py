@@ -0,0 +1,192 @@
+
+
+# Read the resources of a Bundle one entry at a time.
+
+import codecs
+import re  # noqa: F811
+
+
+_JSON_WHITESPACE = re.compile(r"[ \t\n\r]*")
+
+# Decoding a value truncated within a literal like `-Infinity` or a `\uXXXX`
+# escape fails up to that many characters before its end.
+_MAX_TRUNCATED_TOKEN_LENGTH = 8
+
+
+def _is_truncated(exc: json.JSONDecodeError, end: int) -> bool:
+    """Whether a decoding error may be due to the end of the input, at `end`."""
+    # Unterminated strings are reported at their start
+    return end - exc.pos <= _MAX_TRUNCATED_TOKEN_LENGTH or exc.msg.startswith(
+        "Unterminated string"
+    )
+
+
+class _JSONStreamReader:
+    """Read JSON values one by one from a file object.
+
+    Only the current value and the next chunk of the file are kept in memory.
+    """
+
+    def __init__(self, fp: typing.IO, chunk_size: int):
+        self._fp = fp
+        self._chunk_size = chunk_size
+        self._buffer = ""
+        self._pos = 0
+        self._eof = False
+        self._bytes_decoder: typing.Optional[codecs.IncrementalDecoder] = None
+        self._decoder = json.JSONDecoder(
+            parse_float=decimal.Decimal, object_pairs_hook=check_for_duplicate_keys
+        )
+
+    def _read(self, size: int) -> bool:
+        """Append the next chunk of the file to the buffer.
+
+        Return False if the end of the file was already reached.
+        """
+        if self._eof:
+            return False
+        data = self._fp.read(size)
+        self._eof = not data
+        if isinstance(data, bytes):
+            if self._bytes_decoder is None:
+                self._bytes_decoder = codecs.getincrementaldecoder("utf-8-sig")()
+            data = self._bytes_decoder.decode(data, final=self._eof)
+        self._buffer = self._buffer[self._pos :] + data
+        self._pos = 0
+        return True
+
+    def peek(self) -> str:
+        """Skip whitespace and return the next character, empty at end of file."""
+        while True:
+            self._pos = _JSON_WHITESPACE.match(self._buffer, self._pos).end()
+            if self._pos < len(self._buffer):
+                return self._buffer[self._pos]
+            if not self._read(self._chunk_size):
+                return ""
+
+    def expect(self, characters: str) -> str:
+        """Consume and return the next character, which must be one of `characters`."""
+        character = self.peek()
+        if not character or character not in characters:
+            raise ValueError(
+                f"Expecting one of {characters!r}, got {character or 'end of file'!r}."
+            )
+        self._pos += 1
+        return character
+
+    def value(self) -> typing.Any:
+        """Consume and return the next JSON value."""
+        self.peek()
+        size = self._chunk_size
+        while True:
+            try:
+                value, end = self._decoder.raw_decode(self._buffer, self._pos)
+            except json.JSONDecodeError as exc:
+                # Value might be incomplete: read at least as much as the buffer
+                # holds so that large values are not decoded too many times.
+                # Errors before the end of the buffer are raised at once, without
+                # reading the rest of the file.
+                if not _is_truncated(exc, len(self._buffer)) or not self._read(size):
+                    raise
+                size = max(size, len(self._buffer))
+                continue
+            if (
+                end == len(self._buffer)
+                and self._buffer[end - 1].isdigit()
+                and self._read(size)
+            ):
+                # Number might be truncated by the end of the buffer
+                continue
+            self._pos = end
+            return value
+
+
+def _iter_bundle_entry_dicts(
+    reader: _JSONStreamReader,
+) -> typing.Iterator[typing.Dict[str, typing.Any]]:
+    """Yield the entries of a JSON Bundle. Other elements of the Bundle are skipped."""
+    resource_type = None
+    reader.expect("{")
+    if reader.peek() != "}":
+        while True:
+            if reader.peek() != '"':
+                raise ValueError("Expecting property name enclosed in double quotes.")
+            key = reader.value()
+            reader.expect(":")
+            if key == "entry":
+                reader.expect("[")
+                if reader.peek() != "]":
+                    while True:
+                        yield reader.value()
+                        if reader.expect(",]") == "]":
+                            break
+                else:
+                    reader.expect("]")
+            elif key == "resourceType":
+                resource_type = reader.value()
+                if resource_type != "Bundle":
+                    _raise_resource_type_error(
+                        f"ResourceType '{resource_type}' is not a Bundle."
+                    )
+            else:
+                reader.value()
+            if reader.expect(",}") == "}":
+                break
+    if reader.peek():
+        raise ValueError("Extra data after the Bundle.")
+    if resource_type is None:
+        _raise_resource_type_error("Key 'resourceType' must be provided.")
+
+
+def _raise_resource_type_error(message: str) -> None:
+    """Raise a ValidationError like `from_dict` does for an invalid resourceType."""
+    raise pydantic.ValidationError(
+        model=FHIRAbstractResource,
+        errors=[
+            pydantic.error_wrappers.ErrorWrapper(
+                exc=ValueError(message), loc="resourceType"
+            )
+        ],
+    )
+
+
+def iter_bundle_entries(
+    fp: typing.IO, chunk_size: int = 2 ** 16
+) -> typing.Iterator[FHIRAbstractResource]:
+    """Load the resources of a JSON Bundle one entry at a time.
+
+    The Bundle is read from `fp`, a text or binary file object, by chunks of
+    `chunk_size`. Each entry is validated and its resource is yielded before the
+    next entry is read, so that only one entry is in memory at a time. Entries
+    without a resource are skipped, as well as the other elements of the Bundle.
+
+    A `pydantic.ValidationError` is raised as soon as an invalid entry is read.
+    If `resourceType` is missing or follows the entries, it is only checked once
+    the entries have been yielded."""
+
+    reader = _JSONStreamReader(fp, chunk_size)
+    entry_class = RESOURCE_TYPE_MAP["Bundle"].__fields__["entry"].type_
+    entries = _iter_bundle_entry_dicts(reader)
+
+    while True:
+        try:
+            entry_dict = next(entries)
+        except StopIteration:
+            return
+        except pydantic.ValidationError:
+            raise
+        except ValueError as e:
+            # ValueError is converted to a pydantic ValidationError.
+            raise pydantic.ValidationError(
+                model=FHIRAbstractResource,
+                errors=[
+                    pydantic.error_wrappers.ErrorWrapper(exc=e, loc="JSON decoding")
+                ],
+            )
+
+        try:
+            entry = entry_class._fast_parse(entry_dict)
+        except _FastPathFallback:
+            entry = entry_class.parse_obj(entry_dict)
+        if entry.resource is not None:
+            yield entry.resource
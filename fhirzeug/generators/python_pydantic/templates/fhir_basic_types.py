@@ -1,31 +1,200 @@
+import datetime
+import functools  # noqa: F811
 import re
+import typing
+
 import pydantic
 
+# Number of validated values cached by each primitive type with a cache, such as
+# dates and codes, which are repeated throughout documents.
+PRIMITIVE_CACHE_SIZE = 4096
+
 
 def exact_regex(regex):
     return r"\A" + regex.lstrip(r"\A").rstrip(r"\Z") + r"\Z"
 
 
+class FHIRDateValue(str):
+    """Value of a `date` field, parsed to a `datetime.date` on demand.
+
+    The value is kept as it was given, so that it is serialized unchanged. Dates
+    with a precision of a year or a month are converted to their first day.
+    """
+
+    @property
+    def precision(self) -> str:
+        """`year`, `month`, `day` or, for a date and time, `second`."""
+        return _PRECISIONS[min(len(self), 11)]
+
+    def as_date(self) -> datetime.date:
+        """Return the date, or the date of the first day of a partial date.
+
+        Raise `ValueError` if the date does not exist, like `2021-02-30`.
+        """
+        try:
+            return self.__dict__["_date"]
+        except KeyError:
+            value = self.__dict__["_date"] = datetime.date(
+                int(self[:4]),
+                int(self[5:7]) if len(self) > 4 else 1,
+                int(self[8:10]) if len(self) > 7 else 1,
+            )
+            return value
+
+
+class FHIRDateTimeValue(FHIRDateValue):
+    """Value of a `dateTime` field, parsed to a `datetime.datetime` on demand."""
+
+    def as_datetime(self) -> datetime.datetime:
+        """Return the date and time, with their time zone.
+
+        A partial date, without time nor time zone, is converted to a naive
+        datetime at midnight of its first day. A leap second is converted to the
+        59th second.
+        """
+        try:
+            return self.__dict__["_datetime"]
+        except KeyError:
+            value = self.__dict__["_datetime"] = _parse_datetime(self, self.as_date())
+            return value
+
+
+class FHIRInstantValue(FHIRDateTimeValue):
+    """Value of an `instant` field, whose datetime always has a time zone."""
+
+
+class FHIRTimeValue(str):
+    """Value of a `time` field, parsed to a `datetime.time` on demand."""
+
+    def as_time(self) -> datetime.time:
+        """Return the time of the day. A leap second is converted to the 59th."""
+        try:
+            return self.__dict__["_time"]
+        except KeyError:
+            value = self.__dict__["_time"] = _parse_time(self)[0]
+            return value
+
+
+_PRECISIONS = {4: "year", 7: "month", 10: "day", 11: "second"}
+
+
+def _parse_time(
+    value: str, tz: bool = False
+) -> typing.Tuple[datetime.time, typing.Optional[datetime.tzinfo]]:
+    """Parse a validated `hh:mm:ss[.fff][zone]`, with a time zone if `tz`."""
+    second = int(value[6:8])
+    rest = value[8:]
+    microsecond = 0
+    if rest.startswith("."):
+        end = 1
+        while end < len(rest) and rest[end].isdigit():
+            end += 1
+        microsecond = int(rest[1:end][:6].ljust(6, "0"))
+        rest = rest[end:]
+    tzinfo: typing.Optional[datetime.tzinfo] = None
+    if tz:
+        if rest == "Z":
+            tzinfo = datetime.timezone.utc
+        else:
+            offset = datetime.timedelta(hours=int(rest[1:3]), minutes=int(rest[4:6]))
+            tzinfo = datetime.timezone(-offset if rest[0] == "-" else offset)
+    time = datetime.time(int(value[:2]), int(value[3:5]), min(second, 59), microsecond)
+    return time, tzinfo
+
+
+def _parse_datetime(value: str, date: datetime.date) -> datetime.datetime:
+    if len(value) <= 10:
+        return datetime.datetime(date.year, date.month, date.day)
+    time, tzinfo = _parse_time(value[11:], tz=True)
+    return datetime.datetime.combine(date, time, tzinfo)
+
+
+class FHIRPrimitiveStr(pydantic.ConstrainedStr):
+    """Constrained string validated by a single validator.
+
+    Same checks as the validators of `pydantic.constr`, against a pattern compiled
+    once. When `cache_size` is set, the most recent valid values are cached. Valid
+    values are converted to `value_class`.
+    """
+
+    cache_size = 0
+    value_class: typing.Type[str] = str
+
+    def __init_subclass__(cls, **kwargs):
+        super().__init_subclass__(**kwargs)
+        check = cls._check
+        if cls.cache_size:
+            check = functools.lru_cache(maxsize=cls.cache_size)(check)
+        cls._cached_check = staticmethod(check)
+
+    @classmethod
+    def __get_validators__(cls):
+        yield cls.validate
+
+    @classmethod
+    def validate(cls, value: typing.Any) -> str:
+        if type(value) is str:
+            return cls._cached_check(value)
+        if cls.strict:
+            value = pydantic.validators.strict_str_validator(value)
+        else:
+            value = pydantic.validators.str_validator(value)
+        return cls._check(value)
+
+    @classmethod
+    def _check(cls, value: str) -> str:
+        if cls.strip_whitespace:
+            value = value.strip()
+        if cls.min_length is not None and len(value) < cls.min_length:
+            raise pydantic.errors.AnyStrMinLengthError(limit_value=cls.min_length)
+        if cls.regex is not None and cls.regex.match(value) is None:
+            raise pydantic.errors.StrRegexError(pattern=cls.regex.pattern)
+        if cls.value_class is not str:
+            value = cls.value_class(value)
+        return value
+
+
+def primitive_constr(
+    *,
+    strip_whitespace: bool = False,
+    min_length: typing.Optional[int] = None,
+    regex: typing.Optional[str] = None,
+    cache_size: int = 0,
+    value_class: typing.Type[str] = str,
+) -> typing.Type[str]:
+    """Like `pydantic.constr`, with a `regex` that must match the whole value."""
+    namespace = dict(
+        strip_whitespace=strip_whitespace,
+        min_length=min_length,
+        regex=regex and re.compile(exact_regex(regex)),
+        cache_size=cache_size,
+        value_class=value_class,
+    )
+    return type("ConstrainedStrValue", (FHIRPrimitiveStr,), namespace)
+
+
 def exact_regex_constr(**kwargs):
-    if kwargs.get("regex") is not None:
-        kwargs["regex"] = exact_regex(kwargs["regex"])
-    return pydantic.constr(**kwargs)
+    return primitive_constr(cache_size=PRIMITIVE_CACHE_SIZE, **kwargs)
 
 
-FHIRString = pydantic.constr(strip_whitespace=True)
-FHIRRequiredString = pydantic.constr(min_length=1, strip_whitespace=True)
+FHIRString = primitive_constr(strip_whitespace=True)
+FHIRRequiredString = primitive_constr(min_length=1, strip_whitespace=True)
 
 FHIRDateTime = exact_regex_constr(
-    regex=r"([0-9]([0-9]([0-9][1-9]|[1-9]0)|[1-9]00)|[1-9]000)(-(0[1-9]|1[0-2])(-(0[1-9]|[1-2][0-9]|3[0-1])(T([01][0-9]|2[0-3]):[0-5][0-9]:([0-5][0-9]|60)(\.[0-9]+)?(Z|(\+|-)((0[0-9]|1[0-3]):[0-5][0-9]|14:00)))?)?)?"
+    regex=r"([0-9]([0-9]([0-9][1-9]|[1-9]0)|[1-9]00)|[1-9]000)(-(0[1-9]|1[0-2])(-(0[1-9]|[1-2][0-9]|3[0-1])(T([01][0-9]|2[0-3]):[0-5][0-9]:([0-5][0-9]|60)(\.[0-9]+)?(Z|(\+|-)((0[0-9]|1[0-3]):[0-5][0-9]|14:00)))?)?)?",
+    value_class=FHIRDateTimeValue,
 )
 FHIRDate = exact_regex_constr(
-    regex=r"([0-9]([0-9]([0-9][1-9]|[1-9]0)|[1-9]00)|[1-9]000)(-(0[1-9]|1[0-2])(-(0[1-9]|[1-2][0-9]|3[0-1]))?)?"
+    regex=r"([0-9]([0-9]([0-9][1-9]|[1-9]0)|[1-9]00)|[1-9]000)(-(0[1-9]|1[0-2])(-(0[1-9]|[1-2][0-9]|3[0-1]))?)?",
+    value_class=FHIRDateValue,
 )
 FHIRInstant = exact_regex_constr(
-    regex=r"([0-9]([0-9]([0-9][1-9]|[1-9]0)|[1-9]00)|[1-9]000)-(0[1-9]|1[0-2])-(0[1-9]|[1-2][0-9]|3[0-1])T([01][0-9]|2[0-3]):[0-5][0-9]:([0-5][0-9]|60)(\.[0-9]+)?(Z|(\+|-)((0[0-9]|1[0-3]):[0-5][0-9]|14:00))"
+    regex=r"([0-9]([0-9]([0-9][1-9]|[1-9]0)|[1-9]00)|[1-9]000)-(0[1-9]|1[0-2])-(0[1-9]|[1-2][0-9]|3[0-1])T([01][0-9]|2[0-3]):[0-5][0-9]:([0-5][0-9]|60)(\.[0-9]+)?(Z|(\+|-)((0[0-9]|1[0-3]):[0-5][0-9]|14:00))",
+    value_class=FHIRInstantValue,
 )
 FHIRTime = exact_regex_constr(
-    regex=r"([01][0-9]|2[0-3]):[0-5][0-9]:([0-5][0-9]|60)(\.[0-9]+)?"
+    regex=r"([01][0-9]|2[0-3]):[0-5][0-9]:([0-5][0-9]|60)(\.[0-9]+)?",
+    value_class=FHIRTimeValue,
 )
 FHIRCode = exact_regex_constr(regex=r"[^\s]+(\s[^\s]+)*")
 
@@ -36,14 +205,21 @@ FHIRId = exact_regex_constr(regex=r"[A-Za-z0-9\-\.]{1,64}")
 FHIRBase64Binary = exact_regex_constr(regex=r"(\s*([0-9a-zA-Z\+/=]){4}\s*)+")
 
 
+@functools.lru_cache(maxsize=None)
 def validate_factory(cls):
+    regex = re.compile(exact_regex(cls.REGEX))
+
+    @functools.lru_cache(maxsize=PRIMITIVE_CACHE_SIZE)
+    def parse_int_string(v: str) -> int:
+        if regex.match(v) is None:
+            msg = f"String does not match {cls.__name__} pattern : {cls.REGEX}"
+            raise ValueError(msg)
+        return int(v)
+
     def validate_int_string(v):
         """Validate a string given a FHIR regex."""
         if isinstance(v, str):
-            if re.match(exact_regex(cls.REGEX), v) is None:
-                msg = f"String does not match {cls.__name__} pattern : {cls.REGEX}"
-                raise ValueError(msg)
-            return int(v)
+            return parse_int_string(v)
         return v
 
     return validate_int_string
@@ -0,0 +1,41 @@
+
+
+# Resource classes are only imported on first access, see PEP 562.
+
+import importlib  # noqa: E402
+
+
+def _load_class(name: str) -> typing.Any:
+    """Import the resource module defining the class `name` and return the class."""
+    module = importlib.import_module(f"{__name__}.resources.{_LAZY_CLASSES[name]}")
+    klass = getattr(module, name)
+    globals()[name] = klass
+    return klass
+
+
+def __getattr__(name: str) -> typing.Any:
+    if name in _LAZY_CLASSES:
+        return _load_class(name)
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
+def __dir__() -> typing.List[str]:
+    return sorted(set(globals()) | set(_LAZY_CLASSES))
+
+
+class _ResourceTypeMap(typing.Mapping[str, typing.Type[FHIRAbstractResource]]):
+    """Map resource types to their class, importing their module when needed."""
+
+    def __getitem__(self, resource_type: str) -> typing.Type[FHIRAbstractResource]:
+        if resource_type not in RESOURCE_TYPES:
+            raise KeyError(resource_type)
+        return _load_class(resource_type)
+
+    def __iter__(self) -> typing.Iterator[str]:
+        return iter(sorted(RESOURCE_TYPES))
+
+    def __len__(self) -> int:
+        return len(RESOURCE_TYPES)
+
+
+RESOURCE_TYPE_MAP = _ResourceTypeMap()
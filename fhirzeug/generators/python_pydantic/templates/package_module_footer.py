@@ -0,0 +1,10 @@
+
+
+# Resolve forward references of the classes defined in this module.
+for _class in list(globals().values()):
+    if (
+        isinstance(_class, type)
+        and issubclass(_class, FHIRAbstractBase)
+        and _class.__module__ == __name__
+    ):
+        _class.update_forward_refs()
@@ -0,0 +1,7 @@
+
+
+class PrimitiveExtension(Element):
+    """Class to describe any extension of a primitive value.
+
+    Contains only `id` and `extension`.
+    """
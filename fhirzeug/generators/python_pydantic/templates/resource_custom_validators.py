@@ -1,63 +1,45 @@
 # Define custom root validators.
 # Validators are added to the already defined Resources in resource_footer.py .
 
+import functools  # noqa: F811
 import re  # noqa: F811
 import typing
 import pydantic
 
-
-def _build_fhir_api_regex() -> re.Pattern:
-
-    _all_resources_names = set()
-
-    def _add_subresources(_resource: typing.Type[Resource]) -> None:
-        _subresources = _resource.__subclasses__()
-        if len(_subresources) == 0:
-            _all_resources_names.add(_resource.__name__)
-        else:
-            for _subresource in _subresources:
-                _add_subresources(_subresource)
-
-    _add_subresources(Resource)
-    _resources_to_ignore = {"MetadataResource", "Parameters"}
-    for _resource_name in _resources_to_ignore:
-        _all_resources_names.remove(_resource_name)
-
-    resources_pattern = "|".join(sorted(_all_resources_names))
-
-    return re.compile(
-        # Taken from https://www.hl7.org/fhir/references.html#literal
-        r"\A"
-        # From https://www.hl7.org/fhir/http.html#root : "The protocols http: and https:
-        # SHALL NOT be used to refer to different underlying objects" -> we do not take it
-        # in base_url group.
-        r"((http|https):\/\/(?P<base_url>([A-Za-z0-9\-\\\.\:\%\$]*\/)+))?"
-        r"(?P<resource_type>(" + resources_pattern + r"))\/"
-        r"(?P<resource_id>[A-Za-z0-9\-\.]{1,64})"
-        r"(\/_history\/(?P<version>[A-Za-z0-9\-\.]{1,64}))?"
-        r"\Z"
-    )
-
-
-_FHIR_API_REGEX = _build_fhir_api_regex()
-
-
-class _ParsedLiteralReference(pydantic.BaseModel):
+# Number of parsed references cached: the same references, like `Patient/123`, are
+# repeated throughout Bundles.
+REFERENCE_CACHE_SIZE = 4096
+
+# Resources that can be the target of a literal reference.
+_REFERENCE_TARGET_TYPES = frozenset(
+    RESOURCE_TYPES - {"DomainResource", "MetadataResource", "Parameters", "Resource"}
+)
+
+_FHIR_API_REGEX = re.compile(
+    # Taken from https://www.hl7.org/fhir/references.html#literal
+    r"\A"
+    # From https://www.hl7.org/fhir/http.html#root : "The protocols http: and https:
+    # SHALL NOT be used to refer to different underlying objects" -> we do not take it
+    # in base_url group.
+    r"((http|https):\/\/(?P<base_url>([A-Za-z0-9\-\\\.\:\%\$]*\/)+))?"
+    # Checked against `_REFERENCE_TARGET_TYPES` once matched.
+    r"(?P<resource_type>[A-Za-z]+)\/"
+    r"(?P<resource_id>[A-Za-z0-9\-\.]{1,64})"
+    r"(\/_history\/(?P<version>[A-Za-z0-9\-\.]{1,64}))?"
+    r"\Z"
+)
+
+
+class _ParsedLiteralReference(typing.NamedTuple):
     """An object containing data parsed from a literal reference with known pattern."""
 
-    base_url: typing.Optional[str] = None
+    base_url: typing.Optional[str]
     resource_type: str
     resource_id: str
-    version: typing.Optional[str] = None
-
-    @pydantic.validator("base_url")
-    def base_url_to_none(cls, v: str) -> typing.Optional[str]:
-        """Convert base_url to None if it's an empty url."""
-        if not v:
-            return None
-        return v
+    version: typing.Optional[str]
 
 
+@functools.lru_cache(maxsize=REFERENCE_CACHE_SIZE)
 def _parse_literal_reference(
     reference: typing.Optional[str],
 ) -> typing.Optional[_ParsedLiteralReference]:
@@ -71,7 +53,13 @@ def _parse_literal_reference(
     if reference is not None:
         match = _FHIR_API_REGEX.match(reference)
         if match is not None:
-            return _ParsedLiteralReference(**match.groupdict())
+            base_url, resource_type, resource_id, version = match.group(
+                "base_url", "resource_type", "resource_id", "version"
+            )
+            if resource_type in _REFERENCE_TARGET_TYPES:
+                return _ParsedLiteralReference(
+                    base_url or None, resource_type, resource_id, version
+                )
     return None
 
 
@@ -81,6 +69,15 @@ class _AnyAbsoluteUrl(pydantic.BaseModel):
     url: pydantic.AnyUrl
 
 
+@functools.lru_cache(maxsize=REFERENCE_CACHE_SIZE)
+def _is_absolute_url(reference: str) -> bool:
+    try:
+        _AnyAbsoluteUrl(url=reference)
+    except pydantic.ValidationError:
+        return False
+    return True
+
+
 def _reference_validator(values):
     """Validate Reference resource values."""
     resource_type = values.get("type")
@@ -98,15 +95,12 @@ def _reference_validator(values):
         elif reference.startswith("#"):
             # Reference is an internal fragment reference referring to contained resources.
             pass
-        else:
-            try:
-                _AnyAbsoluteUrl(url=reference)
-            except pydantic.ValidationError:
-                # Reference is neither an absolute URL nor an URL relative to a FHIR
-                # RESTful server with pattern "TYPE/ID".
-                raise ValueError(
-                    "Reference must be an absolute URL or an URL relative to a FHIR RESTful server"
-                )
+        elif not _is_absolute_url(reference):
+            # Reference is neither an absolute URL nor an URL relative to a FHIR
+            # RESTful server with pattern "TYPE/ID".
+            raise ValueError(
+                "Reference must be an absolute URL or an URL relative to a FHIR RESTful server"
+            )
     return values
 
 
@@ -0,0 +1,70 @@
+
+
+def from_dict(dict_: dict, fast: bool = True, validate: bool = True):
+    """Factory to load resources directly.
+
+    The resources will be instanciated based on their resourceType property.
+
+    By default, valid resources are loaded by a fast path walking the input once
+    instead of running the full pydantic validation on every nested element. Set
+    `fast` to False to always use the full pydantic validation, for the resource and
+    its nested resources, like contained resources and the resources of Bundle
+    entries. Invalid resources are always validated by pydantic to get the exact
+    validation errors.
+
+    Set `validate` to False to load trusted input without validating it at all, as
+    in `trusted_construction`."""
+
+    try:
+        if not isinstance(dict_, dict):
+            raise ValueError("Resource must be a JSON object.")
+
+        if "resourceType" not in dict_:
+            raise ValueError("Key 'resourceType' must be provided.")
+
+        resource_type = dict_["resourceType"]
+        if resource_type not in RESOURCE_TYPE_MAP:
+            raise ValueError(f"ResourceType '{resource_type}' is not a valid Resource.")
+
+        resource_class = RESOURCE_TYPE_MAP[resource_type]
+        if not validate or _TRUSTED_CONSTRUCTION.get():
+            return resource_class._trusted_parse(dict_)
+        if not fast:
+            token = _FULL_VALIDATION.set(True)
+            try:
+                return resource_class(**dict_)
+            finally:
+                _FULL_VALIDATION.reset(token)
+        if not _FULL_VALIDATION.get():
+            try:
+                return resource_class._fast_parse(dict_)
+            except _FastPathFallback:
+                pass
+        return resource_class(**dict_)
+
+    except ValueError as e:
+        # Raise a ValidationError if resourceType is not valid.
+        # Works for both simple entity and nested entities.
+        raise pydantic.ValidationError(
+            model=FHIRAbstractResource,
+            errors=[pydantic.error_wrappers.ErrorWrapper(exc=e, loc="resourceType")],
+        )
+
+
+def from_raw(*args, fast: bool = True, validate: bool = True, **kwargs):
+    """Factory to load resources directly from the raw json string.
+
+    The resources will be instanciated based on their resourceType property.
+    See `from_dict` for `fast` and `validate`."""
+
+    try:
+        # Raise a ValueError if duplicated keys in raw JSON.
+        dict_ = json_loads(*args, **kwargs)
+    except ValueError as e:
+        # ValueError is converted to a pydantic ValidationError.
+        raise pydantic.ValidationError(
+            model=FHIRAbstractResource,
+            errors=[pydantic.error_wrappers.ErrorWrapper(exc=e, loc="JSON decoding")],
+        )
+
+    return from_dict(dict_, fast=fast, validate=validate)
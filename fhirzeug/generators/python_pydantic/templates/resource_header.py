@@ -1,13 +1,29 @@
+import contextlib
+import contextvars
 import enum
 import decimal
+import functools
+import itertools
 import stringcase
 import typing
 from collections.abc import Mapping
 import json
+import re
+import secrets
 
 
 import pydantic
 
+try:
+    import orjson
+except ImportError:  # pragma: no cover
+    orjson = None
+
+try:
+    import ujson
+except ImportError:  # pragma: no cover
+    ujson = None
+
 # Field of JSON-primitive types can be extended in FHIR using an underscore
 # Example: field `given` (type `str`) is extended by `_given`.
 # However, in pydantic fields beginning with an underscore are ignored by default.
@@ -16,6 +32,41 @@ import pydantic
 # See method `primitive_extension_alias_generator` below.
 _EXTENSION_SUFFIX = "__extension"
 
+# Set while a FHIR element is created from an input whose empty items have all been
+# stripped already, so that nested elements do not strip them again.
+_EMPTY_ITEMS_STRIPPED: contextvars.ContextVar[bool] = contextvars.ContextVar(
+    "_EMPTY_ITEMS_STRIPPED", default=False
+)
+
+# Set while a resource is loaded by `from_dict` with `fast=False`, so that its nested
+# resources are fully validated by pydantic as well.
+_FULL_VALIDATION: contextvars.ContextVar[bool] = contextvars.ContextVar(
+    "_FULL_VALIDATION", default=False
+)
+
+# Set while FHIR elements are created from trusted input, see `trusted_construction`.
+_TRUSTED_CONSTRUCTION: contextvars.ContextVar[bool] = contextvars.ContextVar(
+    "_TRUSTED_CONSTRUCTION", default=False
+)
+
+
+@contextlib.contextmanager
+def trusted_construction() -> typing.Iterator[None]:
+    """Create FHIR elements without validating their input within this context.
+
+    Meant for input known to be valid, like resources serialized by these models and
+    read back from one's own store. `from_dict`, `from_raw` and the constructors
+    build the whole tree of elements, with nested elements, resources, enums,
+    decimals, integers and dates of the types given by the fields, but run no
+    validator: empty items are not stripped, unknown keys are ignored and invalid
+    input gives invalid elements.
+    """
+    token = _TRUSTED_CONSTRUCTION.set(True)
+    try:
+        yield
+    finally:
+        _TRUSTED_CONSTRUCTION.reset(token)
+
 
 def choice_of_validator(choices, optional):
     def check_at_least_one(cls, values):
@@ -77,6 +128,8 @@ def get_primitive_field_root_validator(field_name: str) -> classmethod:
         values[extension_name] = validated_extension_value
         return values
 
+    # Lets the fast path of `FHIRAbstractBase` recognize this validator.
+    _validator.__func__.primitive_field_name = field_name  # type: ignore
     return _validator
 
 
@@ -227,21 +280,45 @@ class DocEnum(enum.Enum):
         return obj
 
 
+# `Decimal` values are first encoded as strings starting with this marker, so that
+# the C-accelerated encoder of the json module can be used. The marked strings are
+# then replaced by the values themselves. The marker is random so that it cannot be
+# part of the encoded data.
+_DECIMAL_MARKER = "\x00" + secrets.token_hex(8)
+_ENCODED_DECIMAL_PATTERN = re.compile(
+    '"' + re.escape(json.dumps(_DECIMAL_MARKER)[1:-1]) + '([-+.0-9A-Za-z]+)"'
+)
+
+
 class DecimalEncoder(json.JSONEncoder):
-    def encode(self, obj):
-        if isinstance(obj, Mapping):
-            return (
-                "{"
-                + ", ".join(
-                    f"{self.encode(k)}: {self.encode(v)}" for (k, v) in obj.items()
-                )
-                + "}"
-            )
-        if isinstance(obj, typing.Iterable) and (not isinstance(obj, str)):
-            return "[" + ", ".join(map(self.encode, obj)) + "]"
+    """JSON encoder writing `Decimal` values as they are, to keep their precision.
+
+    Other mappings and iterables are encoded as JSON objects and arrays.
+    """
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._default_encoder = self.default
+        self.default = self._encode_default
+
+    def _encode_default(self, obj: typing.Any) -> typing.Any:
         if isinstance(obj, decimal.Decimal):
-            return str(obj)
-        return super().encode(obj)
+            return _DECIMAL_MARKER + str(obj)
+        if isinstance(obj, Mapping):
+            return dict(obj)
+        if isinstance(obj, typing.Iterable) and not isinstance(obj, (str, bytes)):
+            return list(obj)
+        return self._default_encoder(obj)
+
+    def encode(self, obj):
+        # Encode in one shot, then replace all the marked decimals at once
+        encoded = "".join(super().iterencode(obj, _one_shot=True))
+        return _ENCODED_DECIMAL_PATTERN.sub(r"\1", encoded)
+
+    def iterencode(self, obj, _one_shot=False):
+        # Marked strings are never split between chunks
+        for chunk in super().iterencode(obj, _one_shot):
+            yield _ENCODED_DECIMAL_PATTERN.sub(r"\1", chunk)
 
 
 def check_for_duplicate_keys(
@@ -252,22 +329,147 @@ def check_for_duplicate_keys(
     Raise ValueError if a duplicate key exists in provided ordered
     list of pairs, otherwise return a dict.
 
-    Taken from https://stackoverflow.com/a/49518779/2750114 .
+    The dict is built at once and keys are only looked at one by one if some of
+    them are duplicated.
     """
-    dict_out: typing.Dict = {}
-    for key, val in ordered_pairs:
-        if key in dict_out:
-            raise ValueError(f"Duplicate key: {key}")
-        else:
-            dict_out[key] = val
+    dict_out = dict(ordered_pairs)
+    if len(dict_out) != len(ordered_pairs):
+        keys: typing.Set[typing.Hashable] = set()
+        for key, _ in ordered_pairs:
+            if key in keys:
+                raise ValueError(f"Duplicate key: {key}")
+            keys.add(key)
     return dict_out
 
 
+class JSONBackend(typing.NamedTuple):
+    """JSON library used by `json_loads` and `json_dumps`.
+
+    See `register_json_backend` and `use_json_backend`.
+    """
+
+    loads: typing.Callable[[typing.Union[str, bytes]], typing.Any]
+    """Load a JSON document. Must raise a ValueError if it is not valid."""
+
+    dumps: typing.Callable[[typing.Any, typing.Callable[[typing.Any], typing.Any]], str]
+    """Dump an object, using the second argument to convert unsupported objects."""
+
+    exact_decimals: bool
+    """Whether numbers are loaded as `Decimal` and `Decimal` values dumped as is."""
+
+    checks_duplicate_keys: bool
+    """Whether `loads` raises a ValueError for duplicate keys."""
+
+
+def _json_default(obj: typing.Any) -> typing.Any:
+    """Convert objects not supported by JSON backends, like `DecimalEncoder` does."""
+    if isinstance(obj, decimal.Decimal):
+        return float(obj)
+    if isinstance(obj, Mapping):
+        return dict(obj)
+    if isinstance(obj, typing.Iterable) and not isinstance(obj, (str, bytes)):
+        return list(obj)
+    raise TypeError(f"Object of type {type(obj).__name__} is not JSON serializable")
+
+
+def _stdlib_json_loads(data: typing.Union[str, bytes]) -> typing.Any:
+    return json.loads(
+        data, parse_float=decimal.Decimal, object_pairs_hook=check_for_duplicate_keys
+    )
+
+
+def _stdlib_json_dumps(
+    obj: typing.Any, default: typing.Callable[[typing.Any], typing.Any]
+) -> str:
+    return json.dumps(obj, default=default, cls=DecimalEncoder)
+
+
+_JSON_BACKENDS: typing.Dict[str, JSONBackend] = {
+    "json": JSONBackend(
+        loads=_stdlib_json_loads,
+        dumps=_stdlib_json_dumps,
+        exact_decimals=True,
+        checks_duplicate_keys=True,
+    ),
+}
+if orjson is not None:
+    _JSON_BACKENDS["orjson"] = JSONBackend(
+        loads=orjson.loads,
+        dumps=lambda obj, default: orjson.dumps(obj, default=default).decode(),
+        exact_decimals=False,
+        checks_duplicate_keys=False,
+    )
+if ujson is not None:
+    _JSON_BACKENDS["ujson"] = JSONBackend(
+        loads=ujson.loads,
+        dumps=lambda obj, default: ujson.dumps(obj, default=default),
+        exact_decimals=False,
+        checks_duplicate_keys=False,
+    )
+
+# Backend used by `json_loads` and `json_dumps`, see `use_json_backend`.
+_json_backend = _JSON_BACKENDS["json"]
+
+
+def register_json_backend(name: str, backend: JSONBackend) -> None:
+    """Register a JSON backend that can then be selected with `use_json_backend`.
+
+    Backends `json` (standard library) and, if installed, `orjson` and `ujson` are
+    registered by default.
+    """
+    _JSON_BACKENDS[name] = backend
+
+
+def use_json_backend(
+    name: str, exact_decimals: bool = True, check_duplicate_keys: bool = True
+) -> None:
+    """Select the JSON backend used by `json_loads` and `json_dumps`.
+
+    These functions are used to load and dump models as well as by `from_raw`.
+
+    By default, numbers are loaded as `Decimal` to keep their exact value and
+    duplicate keys are rejected, which only the `json` backend of the standard
+    library does. Other backends load numbers as `float` and keep the last value of
+    duplicate keys: they can only be selected if `exact_decimals` and
+    `check_duplicate_keys` are disabled.
+    """
+    global _json_backend
+
+    if name not in _JSON_BACKENDS:
+        raise ValueError(
+            f"Unknown JSON backend '{name}', use one of {sorted(_JSON_BACKENDS)}."
+        )
+    backend = _JSON_BACKENDS[name]
+    if exact_decimals and not backend.exact_decimals:
+        raise ValueError(f"JSON backend '{name}' cannot keep exact decimals.")
+    if check_duplicate_keys and not backend.checks_duplicate_keys:
+        raise ValueError(f"JSON backend '{name}' cannot check duplicate keys.")
+    _json_backend = backend
+
+
 def json_dumps(*args, **kwargs):
+    """Dump an object with the selected JSON backend.
+
+    The `json` backend is used if arguments other than `default` are given, for
+    instance `indent`.
+    """
+    if len(args) == 1 and kwargs.keys() <= {"default"}:
+        return _json_backend.dumps(args[0], kwargs.get("default") or _json_default)
     return json.dumps(*args, **kwargs, cls=DecimalEncoder)
 
 
+def json_dump(*args, **kwargs):
+    """Write JSON to a file object chunk by chunk, see `json_dumps`."""
+    return json.dump(*args, **kwargs, cls=DecimalEncoder)
+
+
 def json_loads(*args, **kwargs):
+    """Load a JSON document with the selected JSON backend.
+
+    The `json` backend is used if arguments other than the document are given.
+    """
+    if len(args) == 1 and not kwargs:
+        return _json_backend.loads(args[0])
     return json.loads(
         *args,
         **kwargs,
@@ -284,13 +486,41 @@ class FHIRAbstractBase(pydantic.BaseModel):
         """ Profiles this resource claims to conform to.
         List of `str` items. """
 
+    def __init__(__pydantic_self__, **data: typing.Any) -> None:
+        """Strip empty items of the whole input once, then validate it.
+
+        Nested elements are validated while the root element is created, from the
+        already stripped input. Nothing is validated in `trusted_construction`.
+        """
+        if _TRUSTED_CONSTRUCTION.get():
+            values, fields_set = __pydantic_self__._trusted_values(data)
+            object.__setattr__(__pydantic_self__, "__dict__", values)
+            object.__setattr__(__pydantic_self__, "__fields_set__", fields_set)
+            return
+
+        if _EMPTY_ITEMS_STRIPPED.get():
+            super().__init__(**data)
+            return
+
+        token = _EMPTY_ITEMS_STRIPPED.set(True)
+        try:
+            super().__init__(**(_without_empty_items(data) or {}))
+        finally:
+            _EMPTY_ITEMS_STRIPPED.reset(token)
+
     def dict(self, *args, **kwargs):
         serialized = super().dict(*args, **kwargs)
         return _without_empty_items(serialized) or {}
 
     @pydantic.root_validator(pre=True)
     def strip_empty_items(cls, values: typing.Dict) -> typing.Dict:
-        """This strips all empty elements according to the fhir spec."""
+        """This strips all empty elements according to the fhir spec.
+
+        Nothing to do if the element is created with `__init__`, which already
+        stripped them.
+        """
+        if _EMPTY_ITEMS_STRIPPED.get():
+            return values
         return _without_empty_items(values) or {}
 
     @pydantic.root_validator()
@@ -306,53 +536,87 @@ class FHIRAbstractBase(pydantic.BaseModel):
 
     @classmethod
     def _add_post_root_validator(
-        cls, validator: typing.Callable[[typing.Dict], typing.Dict]
+        cls, validator: typing.Callable[[typing.Dict], typing.Dict], priority: int = 0
     ) -> None:
         """Add a post root validator to the FHIR object.
 
-        The order of the dynamic validators has not been a priority in this
-        implementation. All dynamic validators must be considered to be independent
-        from each other.
-        TODO : add more flexibility to order validators.
+        Validators with a higher priority run first. Validators with the same
+        priority run using the __mro__ resolution order, and in the order they have
+        been added for a given class. Apart from that, all dynamic validators must be
+        considered to be independent from each other.
+
+        Internally, each FHIR class stores a list of its own dynamic validators and
+        caches the ordered validators of its __mro__, which are iterated one by one
+        by `dynamic_post_root_validator`. Adding or removing a validator resets the
+        cache of the class and its subclasses.
 
-        Internally, each FHIR class stores a list of dynamic validators. Then,
-        `dynamic_post_root_validator` iterates over validators one by one using the
-        __mro__ resolution order.
+        Since this method is more or less doing monkeypatching, it is preferred to
+        use it carefully.
+        """
+        cls._own_dynamic_validators().append((priority, validator))
+        cls._reset_dynamic_validators()
+
+    @classmethod
+    def _remove_post_root_validator(
+        cls, validator: typing.Callable[[typing.Dict], typing.Dict]
+    ) -> None:
+        """Remove a post root validator added to this class.
 
-        Warning: there is currently no way of removing a validator. Since this
-        method is more or less doing monkeypatching, it is preferred to use it
-        carefully.
+        Raise a ValueError if the validator has not been added to this class. If it
+        has been added several times, only the last one is removed.
         """
-        dynamic_validators_field = cls._get_dynamic_validators_field_name()
-        dynamic_validators = getattr(cls, dynamic_validators_field, [])
-        dynamic_validators.append(validator)
-        setattr(cls, dynamic_validators_field, dynamic_validators)
+        own_validators = cls._own_dynamic_validators()
+        for index in reversed(range(len(own_validators))):
+            if own_validators[index][1] is validator:
+                del own_validators[index]
+                break
+        else:
+            raise ValueError(
+                f"{validator} is not a post root validator of {cls.__name__}."
+            )
+        cls._reset_dynamic_validators()
 
     @classmethod
     def _dynamic_validators(
         cls,
-    ) -> typing.Generator[typing.Callable[[typing.Dict], typing.Dict], None, None]:
-        """Return a generator iterating over dynamic validators."""
-        for subclass in cls.__mro__:
-            if issubclass(subclass, FHIRAbstractBase):
-                subclass_field = subclass._get_dynamic_validators_field_name()
-                subclass_validators = getattr(subclass, subclass_field, None)
-                if subclass_validators is not None:
-                    yield from subclass_validators
-            else:
-                # If here, it means we are already in the parents' classes of FHIRAbstractBase
-                # We do not need to continue to iterate
-                return
+    ) -> typing.Tuple[typing.Callable[[typing.Dict], typing.Dict], ...]:
+        """Return dynamic validators of the class and its parents, in run order."""
+        dynamic_validators = cls.__dict__.get("_dynamic_validators_cache")
+        if dynamic_validators is None:
+            ranked_validators = []
+            for subclass in cls.__mro__:
+                if not issubclass(subclass, FHIRAbstractBase):
+                    # If here, it means we are already in the parents' classes of
+                    # FHIRAbstractBase. We do not need to continue to iterate
+                    break
+                ranked_validators.extend(
+                    subclass.__dict__.get("_added_dynamic_validators", ())
+                )
+            # Sort is stable: __mro__ and insertion orders are kept
+            ranked_validators.sort(key=lambda item: -item[0])
+            dynamic_validators = tuple(validator for _, validator in ranked_validators)
+            setattr(cls, "_dynamic_validators_cache", dynamic_validators)
+        return dynamic_validators
 
     @classmethod
-    def _get_dynamic_validators_field_name(cls) -> str:
-        """Return a field "unique" to this class to store dynamic validators.
+    def _own_dynamic_validators(
+        cls,
+    ) -> typing.List[typing.Tuple[int, typing.Callable[[typing.Dict], typing.Dict]]]:
+        """Return the (priority, validator) pairs added to this very class."""
+        own_validators = cls.__dict__.get("_added_dynamic_validators")
+        if own_validators is None:
+            own_validators = []
+            setattr(cls, "_added_dynamic_validators", own_validators)
+        return own_validators
 
-        Unicity is guaranted unless two FHIR classes has the same name and one is
-        the child of the other one.
-        TODO : ensure unicity of this field name in every cases.
-        """
-        return f"_dynamic_validators__{cls.__name__}"
+    @classmethod
+    def _reset_dynamic_validators(cls) -> None:
+        """Reset cached dynamic validators of the class and its subclasses."""
+        subclasses = [cls]
+        while subclasses:
+            subclass = subclasses.pop()
+            setattr(subclass, "_dynamic_validators_cache", None)
+            subclasses.extend(subclass.__subclasses__())
 
     @pydantic.root_validator(pre=True)
     def validate_list_not_allowed_for_singleton_fields(cls, values):
@@ -364,16 +628,249 @@ class FHIRAbstractBase(pydantic.BaseModel):
         https://github.com/samuelcolvin/pydantic/issues/1268 .
         TODO: remove this validator once pydantic is updated to V2.
         """
-        for cls_field in cls.__fields__.values():
-            if cls_field.shape == pydantic.fields.SHAPE_SINGLETON:
-                for field_name in [cls_field.alias, cls_field.name]:
-                    if field_name in values:
-                        if isinstance(values[field_name], list):
-                            raise ValueError(
-                                f"List is not suitable for a Singleton field : {field_name}."
-                            )
+        singleton_field_keys = cls.__dict__.get("_singleton_field_keys")
+        if singleton_field_keys is None:
+            singleton_field_keys = cls._build_singleton_field_keys()
+            setattr(cls, "_singleton_field_keys", singleton_field_keys)
+
+        for field_name in singleton_field_keys.intersection(values):
+            if isinstance(values[field_name], list):
+                raise ValueError(
+                    f"List is not suitable for a Singleton field : {field_name}."
+                )
         return values
 
+    @classmethod
+    def _build_singleton_field_keys(cls) -> typing.FrozenSet[str]:
+        """Return names and aliases of the singleton fields of this class.
+
+        Built at first use and cached on the class.
+        """
+        return frozenset(
+            key
+            for cls_field in cls.__fields__.values()
+            if cls_field.shape == pydantic.fields.SHAPE_SINGLETON
+            for key in (cls_field.alias, cls_field.name)
+        )
+
+    @classmethod
+    def _fast_parse(cls, values: typing.Dict, clean: bool = True) -> "FHIRAbstractBase":
+        """Build an instance without going through the full pydantic validation.
+
+        The input is walked once: empty items are stripped once for the whole tree,
+        nested FHIR elements are built recursively the same way and the instance is
+        created like `construct` does. Other fields, primitive extensions, singleton
+        fields and post root validators are validated as pydantic would do.
+
+        Raise `_FastPathFallback` as soon as the input is not valid or cannot be
+        handled, in which case the caller must use the regular constructor to get
+        the validation errors.
+        """
+        if clean:
+            values = _without_empty_items(values) or {}
+        if not isinstance(values, dict):
+            raise _FastPathFallback()
+
+        plan = cls.__dict__.get("_fast_parse_plan")
+        if plan is None:
+            plan = cls._build_fast_parse_plan()
+            setattr(cls, "_fast_parse_plan", plan)
+        if not plan:
+            # Class has custom pre root validators: only the full path is safe.
+            try:
+                return cls(**values)
+            except pydantic.ValidationError:
+                raise _FastPathFallback()
+
+        fields, primitive_fields = plan
+        try:
+            for field_keys, extension_keys in primitive_fields:
+                # Field and extension are looked up by name first, then by alias
+                field_key = field_keys[field_keys[0] not in values]
+                extension_key = extension_keys[extension_keys[0] not in values]
+                if field_key in values and extension_key in values:
+                    values = dict(values)
+                    (
+                        values[field_key],
+                        values[extension_key],
+                    ) = _validate_primitive_field(
+                        values[field_key], values[extension_key]
+                    )
+
+            validated: typing.Dict[str, typing.Any] = {}
+            fields_set: typing.Set[str] = set()
+            for name, alias, field, kind, item_cls, item_allow_none in fields:
+                if alias in values:
+                    value = values[alias]
+                elif name in values:
+                    value = values[name]
+                else:
+                    if field.required:
+                        raise _FastPathFallback()
+                    value = field.get_default()
+                    if field.validate_always:
+                        value = _fast_validate_field(cls, field, value, validated)
+                    validated[name] = value
+                    continue
+
+                fields_set.add(name)
+                if value is None and kind != _FAST_FIELD_GENERIC:
+                    if not field.allow_none:
+                        raise _FastPathFallback()
+                elif kind == _FAST_FIELD_ELEMENT:
+                    value = item_cls._fast_parse(value, clean=False)
+                elif kind == _FAST_FIELD_ELEMENT_LIST:
+                    if not isinstance(value, list):
+                        raise _FastPathFallback()
+                    value = [
+                        item_cls._fast_parse(item, clean=False)
+                        if item is not None or not item_allow_none
+                        else None
+                        for item in value
+                    ]
+                else:
+                    if field.shape == pydantic.fields.SHAPE_SINGLETON and isinstance(
+                        value, list
+                    ):
+                        raise _FastPathFallback()
+                    value = _fast_validate_field(cls, field, value, validated)
+                validated[name] = value
+
+            if len(fields_set) != len(values):
+                # Unknown keys or field given both by name and alias.
+                raise _FastPathFallback()
+
+            for _, validator in cls.__post_root_validators__:
+                validated = validator(cls, validated)
+        except (ValueError, TypeError, AssertionError):
+            raise _FastPathFallback()
+
+        # Same as `construct`, which would copy the defaults and reorder the fields
+        # while `validated` already holds all of them in the right order.
+        instance = cls.__new__(cls)
+        object.__setattr__(instance, "__dict__", validated)
+        object.__setattr__(instance, "__fields_set__", fields_set)
+        return instance
+
+    @classmethod
+    def _build_fast_parse_plan(cls) -> typing.Tuple:
+        """Precompute how `_fast_parse` handles each field of this class.
+
+        Return an empty tuple if the class has pre root validators unknown to the
+        fast path.
+        """
+        primitive_fields = []
+        for validator in cls.__pre_root_validators__:
+            field_name = getattr(validator, "primitive_field_name", None)
+            if field_name is not None:
+                extension_name = field_name + _EXTENSION_SUFFIX
+                primitive_fields.append(
+                    (
+                        (field_name, alias_generator(field_name)),
+                        (extension_name, alias_generator(extension_name)),
+                    )
+                )
+            elif validator not in _FAST_PARSE_PRE_ROOT_VALIDATORS:
+                return ()
+
+        fields = []
+        for name, field in cls.__fields__.items():
+            kind, item_cls, item_allow_none = _FAST_FIELD_GENERIC, None, False
+            if field.shape == pydantic.fields.SHAPE_SINGLETON:
+                item_field = field
+            elif field.shape == pydantic.fields.SHAPE_LIST:
+                item_field = field.sub_fields[0]
+            else:
+                item_field = None
+            if (
+                item_field is not None
+                and not field.class_validators
+                and not item_field.class_validators
+                and isinstance(item_field.type_, type)
+                and issubclass(item_field.type_, FHIRAbstractBase)
+            ):
+                item_cls, item_allow_none = item_field.type_, item_field.allow_none
+                kind = (
+                    _FAST_FIELD_ELEMENT
+                    if item_field is field
+                    else _FAST_FIELD_ELEMENT_LIST
+                )
+            fields.append((name, field.alias, field, kind, item_cls, item_allow_none))
+        return tuple(fields), tuple(primitive_fields)
+
+    @classmethod
+    def _trusted_parse(cls, values: typing.Mapping) -> "FHIRAbstractBase":
+        """Build an instance from trusted input, see `trusted_construction`."""
+        instance = cls.__new__(cls)
+        validated, fields_set = cls._trusted_values(values)
+        object.__setattr__(instance, "__dict__", validated)
+        object.__setattr__(instance, "__fields_set__", fields_set)
+        return instance
+
+    @classmethod
+    def _trusted_values(
+        cls, values: typing.Mapping
+    ) -> typing.Tuple[typing.Dict[str, typing.Any], typing.Set[str]]:
+        """Convert trusted input to the values of the fields and the fields set."""
+        plan = cls.__dict__.get("_trusted_plan")
+        if plan is None:
+            plan = cls._build_trusted_plan()
+            setattr(cls, "_trusted_plan", plan)
+        defaults, mutable_defaults, fields_by_key = plan
+
+        # Copied from the defaults to keep the values in the order of the fields
+        validated = defaults.copy()
+        for name, field in mutable_defaults:
+            validated[name] = field.get_default()
+        fields_set: typing.Set[str] = set()
+        for key, value in values.items():
+            if key not in fields_by_key:
+                continue
+            name, is_list, convert = fields_by_key[key]
+            fields_set.add(name)
+            if value is not None and convert is not None:
+                if is_list:
+                    value = [
+                        convert(item) if item is not None else None for item in value
+                    ]
+                else:
+                    value = convert(value)
+            validated[name] = value
+        return validated, fields_set
+
+    @classmethod
+    def _build_trusted_plan(cls) -> typing.Tuple:
+        """Precompute how `_trusted_values` converts the input of each field."""
+        defaults: typing.Dict[str, typing.Any] = {}
+        mutable_defaults = []
+        fields_by_key = {}
+        for name, field in cls.__fields__.items():
+            defaults[name] = field.default
+            if not isinstance(field.default, _IMMUTABLE_DEFAULT_TYPES):
+                mutable_defaults.append((name, field))
+
+            if field.shape == pydantic.fields.SHAPE_SINGLETON:
+                item_field = field
+            elif field.shape == pydantic.fields.SHAPE_LIST:
+                item_field = field.sub_fields[0]
+            else:
+                item_field = None
+            convert = None
+            resource_factory = field.class_validators.get("resource_factory")
+            if resource_factory is not None:
+                # Resources are created from their `resourceType`
+                convert = functools.partial(
+                    _trusted_resource, resource_factory.func, cls
+                )
+            elif item_field is not None:
+                convert = _trusted_converter(item_field.type_)
+            fields_by_key[name] = fields_by_key[field.alias] = (
+                name,
+                item_field is not field,
+                convert,
+            )
+        return defaults, tuple(mutable_defaults), fields_by_key
+
     class Config:
         alias_generator = alias_generator
         allow_population_by_field_name = True
@@ -382,6 +879,101 @@ class FHIRAbstractBase(pydantic.BaseModel):
         json_loads = json_loads
 
 
+class _FastPathFallback(Exception):
+    """Input must be validated by the full pydantic path."""
+
+
+# Kinds of fields handled by `FHIRAbstractBase._fast_parse`
+_FAST_FIELD_GENERIC = 0
+_FAST_FIELD_ELEMENT = 1
+_FAST_FIELD_ELEMENT_LIST = 2
+
+# Pre root validators whose work is done once by `FHIRAbstractBase._fast_parse`
+_FAST_PARSE_PRE_ROOT_VALIDATORS = tuple(FHIRAbstractBase.__pre_root_validators__)
+
+
+def _fast_validate_field(
+    cls: typing.Type[FHIRAbstractBase],
+    field: pydantic.fields.ModelField,
+    value: typing.Any,
+    values: typing.Dict[str, typing.Any],
+) -> typing.Any:
+    """Validate a field value with pydantic, or raise `_FastPathFallback`."""
+    value, errors = field.validate(value, values, loc=field.alias, cls=cls)
+    if errors:
+        raise _FastPathFallback()
+    return value
+
+
+# Defaults of fields that can be shared by all the instances created from trusted input
+_IMMUTABLE_DEFAULT_TYPES = (
+    type(None),
+    str,
+    int,
+    float,
+    decimal.Decimal,
+    enum.Enum,
+    tuple,
+    frozenset,
+)
+
+
+def _trusted_converter(
+    type_: typing.Any,
+) -> typing.Optional[typing.Callable[[typing.Any], typing.Any]]:
+    """Return how to convert trusted input to a type, None to keep it as it is."""
+    if not isinstance(type_, type):
+        return None
+    if issubclass(type_, FHIRAbstractBase):
+        return functools.partial(_trusted_element, type_)
+    if issubclass(type_, enum.Enum):
+        return type_
+    if issubclass(type_, decimal.Decimal):
+        return _trusted_decimal
+    if issubclass(type_, int) and type_ is not bool:
+        return _trusted_int
+    # Dates and times
+    value_class = getattr(type_, "value_class", str)
+    if value_class is not str:
+        return value_class
+    return None
+
+
+def _trusted_element(
+    type_: typing.Type[FHIRAbstractBase], value: typing.Any
+) -> typing.Any:
+    # Elements already built, like the ones given to the constructors, are kept
+    if isinstance(value, Mapping):
+        return type_._trusted_parse(value)
+    return value
+
+
+def _trusted_resource(
+    resource_factory: typing.Callable,
+    cls: typing.Type[FHIRAbstractBase],
+    value: typing.Any,
+) -> typing.Any:
+    if isinstance(value, dict):
+        token = _TRUSTED_CONSTRUCTION.set(True)
+        try:
+            return resource_factory(cls, value)
+        finally:
+            _TRUSTED_CONSTRUCTION.reset(token)
+    return value
+
+
+def _trusted_decimal(value: typing.Any) -> typing.Any:
+    if isinstance(value, (float, int, str)):
+        return decimal.Decimal(str(value))
+    return value
+
+
+def _trusted_int(value: typing.Any) -> typing.Any:
+    if isinstance(value, str):
+        return int(value)
+    return value
+
+
 def _without_empty_items(obj: typing.Any):
     """Clean empty items.
 
@@ -389,49 +981,36 @@ def _without_empty_items(obj: typing.Any):
 
     Extension of list of primitive values is handled differently by
     its own root validator. See: https://www.hl7.org/fhir/json.html#null
+
+    Dicts and lists that are already clean are returned as is instead of being
+    copied.
     """
     if isinstance(obj, Mapping):
-        cleaned_dict = {}
-        for key, value in obj.items():
-            primitive_key, extension_key = None, None
-            if key.startswith("_") and key[1:] in obj:
-                primitive_key = key[1:]
-                extension_key = key
-            elif ("_" + key) in obj:
-                primitive_key = key
-                extension_key = "_" + key
-            elif (
-                key.endswith(_EXTENSION_SUFFIX)
-                and key[: -len(_EXTENSION_SUFFIX)] in obj
-            ):
-                primitive_key = key[: -len(_EXTENSION_SUFFIX)]
-                extension_key = key
-            elif key + _EXTENSION_SUFFIX in obj:
-                primitive_key = key
-                extension_key = key + _EXTENSION_SUFFIX
-
-            if (primitive_key, extension_key) != (None, None):
-                primitive_value = obj[primitive_key]
-                extension_value = obj[extension_key]
-                if isinstance(primitive_value, list) and isinstance(
-                    extension_value, list
-                ):
-                    if primitive_key not in cleaned_dict:
-                        assert extension_key not in cleaned_dict
-                        # WARNING : Here lists consistency is NOT validated
-                        #           This is done later by the primitive field validator
-                        cleaned_dict[primitive_key] = [
-                            _without_empty_items(value) for value in primitive_value
-                        ]
-                        cleaned_dict[extension_key] = [
-                            _without_empty_items(value) for value in extension_value
-                        ]
+        # Lists of primitive values and their extension lists keep their `null`
+        # items so that both lists stay aligned.
+        # WARNING : Here lists consistency is NOT validated
+        #           This is done later by the primitive field validator
+        extended_lists = _extended_list_keys(obj)
+
+        cleaned_dict = None
+        for index, (key, value) in enumerate(obj.items()):
+            if extended_lists is not None and key in extended_lists:
+                cleaned_value = _without_empty_list_items(value, keep_none=True)
+            else:
+                cleaned_value = _without_empty_items(value)
+            if cleaned_dict is None:
+                if cleaned_value is value and value is not None:
                     continue
-
-            cleaned_value = _without_empty_items(value)
+                # First change: copy the items already checked
+                cleaned_dict = dict(itertools.islice(obj.items(), index))
             if cleaned_value is not None:
                 cleaned_dict[key] = cleaned_value
 
+        if cleaned_dict is None:
+            if type(obj) is not dict:
+                cleaned_dict = dict(obj)
+            else:
+                cleaned_dict = obj
         if cleaned_dict:
             return cleaned_dict
         return None
@@ -443,10 +1022,57 @@ def _without_empty_items(obj: typing.Any):
         return obj
 
     if isinstance(obj, (list, tuple)):
-        cleaned_list_with_none = [_without_empty_items(item) for item in obj]
-        cleaned_list = [item for item in cleaned_list_with_none if item is not None]
-        if cleaned_list:
-            return cleaned_list
-        return None
+        return _without_empty_list_items(obj, keep_none=False)
 
     return obj
+
+
+def _without_empty_list_items(
+    obj: typing.Sequence, keep_none: bool
+) -> typing.Optional[typing.List]:
+    """Clean empty items of a list, see `_without_empty_items`.
+
+    `null` items are kept in lists of primitive values that are extended, as well
+    as in their extension lists. These lists are returned even if empty.
+    """
+    cleaned_list = None
+    for index, item in enumerate(obj):
+        cleaned_item = _without_empty_items(item)
+        if cleaned_list is None:
+            if cleaned_item is item and (item is not None or keep_none):
+                continue
+            # First change: copy the items already checked
+            cleaned_list = list(obj[:index])
+        if cleaned_item is not None or keep_none:
+            cleaned_list.append(cleaned_item)
+
+    if cleaned_list is None:
+        if type(obj) is not list:
+            cleaned_list = list(obj)
+        else:
+            cleaned_list = obj
+    if cleaned_list or keep_none:
+        return cleaned_list
+    return None
+
+
+def _extended_list_keys(obj: Mapping) -> typing.Optional[typing.Set[str]]:
+    """Return keys of lists of primitive values extended by another list.
+
+    Both the primitive key and the extension key are returned: the extension of a
+    field `given` is either `_given` or `given__extension`.
+    Only keys that look like extensions are checked.
+    """
+    extended_lists = None
+    for key, value in obj.items():
+        if key.startswith("_"):
+            primitive_key = key[1:]
+        elif key.endswith(_EXTENSION_SUFFIX):
+            primitive_key = key[: -len(_EXTENSION_SUFFIX)]
+        else:
+            continue
+        if isinstance(value, list) and isinstance(obj.get(primitive_key), list):
+            if extended_lists is None:
+                extended_lists = set()
+            extended_lists.update((primitive_key, key))
+    return extended_lists
@@ -1,3 +1,4 @@
+from enum import Enum
 from pathlib import Path
 from typing import List, Dict
 
@@ -14,6 +15,26 @@ class Target(BaseModel):
     destination: Path
 
 
+class ExamplesMode(str, Enum):
+    """How to write the examples of the specification."""
+
+    copy = "copy"
+    symlink = "symlink"
+    hardlink = "hardlink"
+    archive = "archive"
+
+
+class ExamplesTarget(Target):
+    """A target to write the examples of the specification.
+
+    Attributes:
+        mode: Whether to copy the examples, link them to the downloaded files, or
+            write them to one ZIP archive, named after destination with a `.zip` suffix
+    """
+
+    mode: ExamplesMode = ExamplesMode.copy
+
+
 class Template(BaseModel):
     """Configuration to find templates.
 
@@ -93,6 +114,8 @@ class GeneratorConfig(BaseModel):
         copy_examples: Target of where the tests will be copied
         default_base: Default base model to use depending on the type of the class to generate
         download_directory: Target of where the specification will be downloaded
+        incremental: Whether to reuse the code rendered by the previous generation
+            for the classes and enums whose inputs did not change
         manual_profiles: Profile to generate manually
         mapping_rules: Mapping rules to generate classes
         module: Generator module location
@@ -101,12 +124,15 @@ class GeneratorConfig(BaseModel):
         output_file: Where the generated file will be pushed (within output_directory)
         output_directory: Directory where the generated module will be pushed
         specification_url: URL where to find specifications
+        split_modules: Whether to write one lazily-imported module per resource, in a
+            package named after output_file, instead of a single file
         template: Configuration to find templates
     """
 
-    copy_examples: Target
+    copy_examples: ExamplesTarget
     default_base: Dict[str, str]
     download_directory: Target
+    incremental: bool
     manual_profiles: List[ManualProfile]
     mapping_rules: MappingRules
     module: str
@@ -115,6 +141,7 @@ class GeneratorConfig(BaseModel):
     output_file: Target
     output_directory: Target
     specification_url: str
+    split_modules: bool
     template: Template
 
     def update(self, **kwargs) -> "GeneratorConfig":
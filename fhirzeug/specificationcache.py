@@ -1,10 +1,27 @@
 from pathlib import Path
+import hashlib
+import json
+import os
 import requests
 import shutil
+import tarfile
+import tempfile
+import uuid
 import zipfile
+from typing import Callable, Dict, Iterator, List, Optional, Tuple
 
 
 from .logger import logger
+from .specsource import DirectorySource, SpecSource, ZipSource
+
+CHUNK_SIZE = 1 << 20
+
+# Files of the specification download read by `FHIRSpec`, by bundle of resources
+SPEC_BUNDLES = ["valuesets.json", "profiles-types.json", "profiles-resources.json"]
+
+
+class DownloadError(Exception):
+    pass
 
 
 def safe_pathname(filename: str) -> str:
@@ -14,9 +31,181 @@ def safe_pathname(filename: str) -> str:
     ).rstrip()
 
 
+class ContentStore(object):
+    """ Store of downloaded files, addressed by the SHA-256 of their content.
+
+    Files are written once to `objects/<digest>` and shared by all the
+    specifications cached in the same download directory. A reference per URL
+    records the digest and ETag of the last download:
+
+    - a file already in the store is not downloaded again, unless `refresh` is
+      given, in which case the server is asked whether its ETag changed,
+    - downloads are streamed to a partial file of their own, resumed with a range
+      request if interrupted, and only added to the store once their size is
+      checked,
+    - the content of a file is checked against its digest before it is used.
+    """
+
+    def __init__(self, root: Path):
+        self.root = root
+        self.objects_dir = root / "objects"
+        self.refs_dir = root / "refs"
+        self.partial_dir = root / "partial"
+
+    def fetch(self, url: str, refresh: bool = False) -> Path:
+        """ Return the path in the store of the file at the given URL.
+
+        The file is downloaded if it is not in the store yet, or if `refresh` is
+        given and the server has a different version.
+        """
+        ref = self._read_ref(url)
+        if ref is not None and not self.verify(ref["sha256"]):
+            logger.warning(f"Cached copy of {url} is corrupted, downloading it again")
+            ref = None
+
+        if ref is not None and not refresh:
+            return self.path(ref["sha256"])
+
+        headers = {}
+        if ref is not None and ref.get("etag"):
+            headers["If-None-Match"] = ref["etag"]
+        digest, etag = self._download(url, headers)
+        if digest is None:
+            assert ref is not None
+            logger.info(f"{url} did not change")
+            return self.path(ref["sha256"])
+
+        self._write_ref(url, {"url": url, "etag": etag, "sha256": digest})
+        return self.path(digest)
+
+    def lookup(self, url: str) -> Optional[str]:
+        """ Return the digest of the last download of the given URL, if any. """
+        ref = self._read_ref(url)
+        return None if ref is None else ref["sha256"]
+
+    def path(self, digest: str) -> Path:
+        return self.objects_dir / digest
+
+    def verify(self, digest: str) -> bool:
+        """ Check the file of the given digest exists and is not corrupted. """
+        path = self.path(digest)
+        return path.exists() and file_sha256(path) == digest
+
+    def _download(self, url: str, headers: Dict[str, str]):
+        """ Download a file to the store.
+
+        Return its digest and ETag, or `(None, None)` if the server replied that
+        the version matching `If-None-Match` did not change.
+
+        Each download writes to its own directory of `partial/`, so that
+        concurrent downloads of the same URL do not mix their bytes. A download
+        that can be resumed is left in `partial/<key>` if it is interrupted, and
+        claimed from there by the next download of the URL.
+        """
+        key = hashlib.sha256(url.encode("utf-8")).hexdigest()
+        self.partial_dir.mkdir(parents=True, exist_ok=True)
+        parked_dir = self.partial_dir / key
+        work_dir = self.partial_dir / f"{key}.{uuid.uuid4().hex}"
+        try:
+            os.rename(parked_dir, work_dir)
+        except OSError:
+            work_dir.mkdir()
+        try:
+            return self._download_to(url, headers, work_dir)
+        finally:
+            if work_dir.joinpath("data").exists() and (
+                work_dir.joinpath("etag").exists()
+            ):
+                try:
+                    os.rename(work_dir, parked_dir)
+                except OSError:
+                    # Another interrupted download of the URL is already parked
+                    pass
+            shutil.rmtree(work_dir, ignore_errors=True)
+
+    def _download_to(self, url: str, headers: Dict[str, str], work_dir: Path):
+        data_path = work_dir / "data"
+        etag_path = work_dir / "etag"
+
+        # Resume only if the server can tell the partial file is still current
+        request_headers = dict(headers)
+        offset = 0
+        if data_path.exists() and etag_path.exists():
+            offset = data_path.stat().st_size
+            request_headers["Range"] = f"bytes={offset}-"
+            request_headers["If-Range"] = etag_path.read_text()
+            # Ranges count the bytes of the encoded content
+            request_headers["Accept-Encoding"] = "identity"
+
+        with requests.get(url, headers=request_headers, stream=True) as res:
+            if res.status_code == 304:
+                return None, None
+            if res.status_code == 416 or (
+                res.status_code == 206 and "Content-Encoding" in res.headers
+            ):
+                # The partial file does not match the remote one, start again
+                data_path.unlink()
+                etag_path.unlink()
+                return self._download_to(url, headers, work_dir)
+            res.raise_for_status()
+
+            etag = res.headers.get("ETag")
+            if res.status_code == 206:
+                logger.info(f"Resuming download of {url} at byte {offset}")
+                mode = "ab"
+            else:
+                mode = "wb"
+            # Decoded content cannot be resumed at a byte offset of the encoded one
+            if etag and "Content-Encoding" not in res.headers:
+                etag_path.write_text(etag)
+            elif etag_path.exists():
+                etag_path.unlink()
+
+            with data_path.open(mode) as handle:
+                for chunk in res.iter_content(chunk_size=CHUNK_SIZE):
+                    handle.write(chunk)
+
+            expected_size = _expected_size(res)
+
+        size = data_path.stat().st_size
+        if expected_size is not None and size != expected_size:
+            raise DownloadError(
+                f"Download of {url} is incomplete: {size} of {expected_size} bytes"
+            )
+
+        digest = file_sha256(data_path)
+        self.objects_dir.mkdir(parents=True, exist_ok=True)
+        os.replace(data_path, self.path(digest))
+        return digest, etag
+
+    def _ref_path(self, url: str) -> Path:
+        return self.refs_dir / f"{hashlib.sha256(url.encode('utf-8')).hexdigest()}.json"
+
+    def _read_ref(self, url: str) -> Optional[Dict[str, str]]:
+        try:
+            with self._ref_path(url).open("r") as handle:
+                return json.load(handle)
+        except (OSError, ValueError):
+            return None
+
+    def _write_ref(self, url: str, ref: Dict[str, str]) -> None:
+        self.refs_dir.mkdir(parents=True, exist_ok=True)
+        path = self._ref_path(url)
+        tmp_path = path.with_suffix(f".{os.getpid()}.tmp")
+        with tmp_path.open("w") as handle:
+            json.dump(ref, handle)
+        os.replace(tmp_path, path)
+
+
 class SpecificationCache(object):
     """ Class to download, cache and manage specifications.
 
+    Downloaded files are kept in a `ContentStore` in the download directory, and
+    copied or extracted to a directory per specification. A `.sha256` marker,
+    written once a file is completely copied or extracted, records the digest of
+    the download it comes from. Unless `extract` is true, the specification is
+    read directly from the archive in the store instead of being extracted.
+
     Attributes:
         needs   The pre known content of a file
     """
@@ -26,13 +215,19 @@ class SpecificationCache(object):
         "valuesets.json": "examples-json.zip",
     }
 
-    def __init__(self, base_url: str, cache_dir: Path):
+    def __init__(self, base_url: str, cache_dir: Path, extract: bool = True):
         self.base_url = base_url
+        self.extract = extract
+        self.store = ContentStore(cache_dir)
         self.cache_dir = cache_dir.joinpath(safe_pathname(base_url))
+        self.archive_path: Optional[Path] = None
 
     def sync(self, force_download: bool = False):
         """ Makes sure all the files needed have been downloaded.
 
+        With `force_download`, the files are extracted again, and downloaded again
+        if they changed on the server.
+
         :returns: The path to the directory with all our files.
         """
 
@@ -43,35 +238,275 @@ class SpecificationCache(object):
 
         # check all files and download if missing
         for local, remote in self.needs.items():
-            local_source_path = self.cache_dir.joinpath(remote)
             local_target_path = self.cache_dir.joinpath(local)
+            marker_path = self._marker_path(remote)
+
+            if remote.endswith(".zip") and not self.extract:
+                self.archive_path = self.download(remote, refresh=force_download)
+                continue
 
             logger.debug("Does {} exist?".format(local))
-            if not local_target_path.exists():
-                logger.info("Downloading {}".format(remote))
-                self.download(remote, local_source_path)
+            # Files extracted before downloads were stored have no marker
+            if local_target_path.exists() and (
+                marker_path.exists() or self.store.lookup(self.url(remote)) is None
+            ):
+                continue
+
+            logger.info("Downloading {}".format(remote))
+            source_path = self.download(remote, refresh=force_download)
+
+            if remote.endswith(".zip"):
+                logger.info("Extracting {}".format(local))
+                self.expand(source_path)
+            else:
+                _copy_atomic(source_path, self.cache_dir.joinpath(remote))
+            marker_path.write_text(source_path.name)
+
+        return self.cache_dir
 
-                # unzip
-                if str(local_source_path).endswith(".zip"):
-                    logger.info("Extracting {}".format(local))
-                    self.expand(local_source_path)
+    def source(self) -> SpecSource:
+        """ Return the source to read the synced specification from. """
+        if self.archive_path is not None:
+            return ZipSource(self.archive_path, self.cache_dir)
+        return DirectorySource(self.cache_dir)
 
-    def download(self, remote: str, local: Path) -> None:
+    def download(self, remote: str, refresh: bool = False) -> Path:
         """ Download the given file located on the server.
 
-        :returns: The local file name in our cache directory the file was
-            downloaded to
+        :returns: The path of the file in the content store
         """
-        url = self.base_url + "/" + remote
-        res = requests.get(url)
-        res.raise_for_status()
+        return self.store.fetch(self.url(remote), refresh=refresh)
 
-        with local.open("wb") as handle:
-            for chunk in res.iter_content():
-                handle.write(chunk)
+    def url(self, remote: str) -> str:
+        return self.base_url + "/" + remote
 
     def expand(self, local_path):
         """ Expand the ZIP file at the given path to the cache directory.
+
+        Files are extracted to a temporary directory first, so that a corrupted
+        archive does not leave half of its files behind.
+        """
+        with tempfile.TemporaryDirectory(dir=self.cache_dir) as tmp_dir:
+            with zipfile.ZipFile(local_path) as z:
+                z.extractall(tmp_dir)
+            for path in Path(tmp_dir).iterdir():
+                os.replace(path, self.cache_dir / path.name)
+
+    def _marker_path(self, remote: str) -> Path:
+        return self.cache_dir / f".{remote}.sha256"
+
+
+class SpecificationPackage(object):
+    """ A specification available locally, to generate without network access.
+
+    The package is either:
+
+    - a directory or a tarball with the files of the specification download:
+      `version.info`, the bundles of `SPEC_BUNDLES` and the examples,
+    - or an NPM FHIR package, like `hl7.fhir.r4.core.tgz`, with one file per
+      resource in `package/` and the version of FHIR in `package/package.json`.
+
+    A directory with the files of the download is used as it is. Other packages
+    are indexed once to a directory of the download directory, in the layout of the
+    download: the bundles are built from the resources of NPM packages. This
+    directory is reused until the content of the package changes.
+    """
+
+    def __init__(self, path: Path, cache_dir: Path):
+        self.path = path
+        if path.is_dir() and path.joinpath("version.info").exists():
+            self.cache_dir = path
+        else:
+            self.cache_dir = cache_dir.joinpath(safe_pathname(path.name))
+
+    def sync(self, force_download: bool = False):
+        """ Makes sure the package has been indexed.
+
+        With `force_download`, the package is indexed again even if it did not
+        change.
+
+        :returns: The path to the directory with all our files.
         """
-        with zipfile.ZipFile(local_path) as z:
-            z.extractall(self.cache_dir)
+        if self.cache_dir == self.path:
+            return self.cache_dir
+
+        digest = self.digest()
+        marker_path = self.cache_dir / ".package.sha256"
+        if (
+            not force_download
+            and marker_path.exists()
+            and marker_path.read_text() == digest
+        ):
+            return self.cache_dir
+
+        logger.info(f"Indexing {self.path}")
+        self.cache_dir.parent.mkdir(parents=True, exist_ok=True)
+        tmp_dir = Path(tempfile.mkdtemp(dir=self.cache_dir.parent))
+        try:
+            self.index(tmp_dir)
+            tmp_dir.joinpath(marker_path.name).write_text(digest)
+            shutil.rmtree(self.cache_dir, ignore_errors=True)
+            os.replace(tmp_dir, self.cache_dir)
+        finally:
+            shutil.rmtree(tmp_dir, ignore_errors=True)
+        return self.cache_dir
+
+    def source(self) -> SpecSource:
+        """ Return the source to read the synced specification from. """
+        return DirectorySource(self.cache_dir)
+
+    def digest(self) -> str:
+        """ Digest identifying the content of the package. """
+        if not self.path.is_dir():
+            return file_sha256(self.path)
+        # Files of a directory are only identified by their name, size and date
+        digest = hashlib.sha256()
+        for path in sorted(self.path.rglob("*")):
+            if path.is_file():
+                stat = path.stat()
+                digest.update(f"{path}:{stat.st_size}:{stat.st_mtime_ns}\n".encode())
+        return digest.hexdigest()
+
+    def index(self, target: Path) -> None:
+        """ Write the files of the specification download to the target directory.
+        """
+        files = dict(self._files())
+        if "version.info" in files:
+            for name in ["version.info"] + SPEC_BUNDLES:
+                target.joinpath(name).write_bytes(files[name]())
+        else:
+            self._index_npm_package(files, target)
+        for name, read in files.items():
+            if name.endswith("-example.json"):
+                target.joinpath(name).write_bytes(read())
+
+    def _files(self) -> Iterator[Tuple[str, Callable[[], bytes]]]:
+        """ Iterate over the names of the files of the package, without their
+        directory, and functions reading their content.
+        """
+        if self.path.is_dir():
+            root = self.path.joinpath("package")
+            if not root.is_dir():
+                root = self.path
+            for path in root.iterdir():
+                if path.is_file():
+                    yield path.name, path.read_bytes
+            return
+
+        with tarfile.open(self.path) as tar:
+            for member in tar:
+                # Files are in one directory, `package/` for NPM packages
+                name = member.name.partition("/")[2] or member.name
+                if not member.isfile() or "/" in name:
+                    continue
+                handle = tar.extractfile(member)
+                assert handle is not None
+                # Read now, as compressed tarballs are only read forward
+                yield name, _reader(handle.read())
+
+    def _index_npm_package(
+        self, files: Dict[str, Callable[[], bytes]], target: Path
+    ) -> None:
+        """ Write the bundles and version of an NPM package to the target directory.
+        """
+        if "package.json" not in files:
+            raise ValueError(
+                f"{self.path} is neither a specification nor an NPM FHIR package"
+            )
+        manifest = json.loads(files["package.json"]())
+        version = (manifest.get("fhirVersions") or [manifest["version"]])[0]
+        target.joinpath("version.info").write_text(
+            f"[FHIR]\nFhirVersion={version}\nversion={version}\n"
+        )
+
+        # The index of the package lists the type of the resource of each file
+        if ".index.json" in files:
+            index = json.loads(files[".index.json"]())
+            names = [
+                entry["filename"]
+                for entry in index["files"]
+                if entry.get("resourceType")
+                in ("StructureDefinition", "ValueSet", "CodeSystem")
+            ]
+        else:
+            names = [
+                name
+                for name in files
+                if name.endswith(".json") and name != "package.json"
+            ]
+
+        resources = (json.loads(files[name]()) for name in names)
+        bundles: Dict[str, List[Dict]] = {name: [] for name in SPEC_BUNDLES}
+        for resource in resources:
+            bundle = _bundle_name(resource)
+            if bundle is not None:
+                bundles[bundle].append(
+                    {"fullUrl": resource.get("url"), "resource": resource}
+                )
+        for name, entries in bundles.items():
+            # Constraints like SimpleQuantity reuse the class of the definition
+            # they constrain, which must be read first
+            entries.sort(
+                key=lambda entry: (
+                    entry["resource"].get("derivation") == "constraint",
+                    entry["fullUrl"] or "",
+                )
+            )
+            with target.joinpath(name).open("w", encoding="utf-8") as handle:
+                json.dump(
+                    {"resourceType": "Bundle", "type": "collection", "entry": entries},
+                    handle,
+                )
+
+
+def _bundle_name(resource: Dict) -> Optional[str]:
+    """Name of the bundle of the specification download with the resource."""
+    resource_type = resource.get("resourceType")
+    if resource_type in ("ValueSet", "CodeSystem"):
+        return "valuesets.json"
+    if resource_type != "StructureDefinition":
+        return None
+    # Profiles constraining other definitions are not in the bundles, except the
+    # ones on data types like SimpleQuantity
+    if resource.get("kind") in ("primitive-type", "complex-type"):
+        if resource.get("derivation") == "constraint" and (
+            resource.get("type") == "Extension"
+        ):
+            return None
+        return "profiles-types.json"
+    if resource.get("derivation") != "constraint":
+        return "profiles-resources.json"
+    return None
+
+
+def _reader(content: bytes) -> Callable[[], bytes]:
+    return lambda: content
+
+
+def file_sha256(path: Path) -> str:
+    """Return the SHA-256 hex digest of the content of a file."""
+    digest = hashlib.sha256()
+    with path.open("rb") as handle:
+        for chunk in iter(lambda: handle.read(CHUNK_SIZE), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def _expected_size(res: requests.Response) -> Optional[int]:
+    """Size of the whole file according to the headers of a response."""
+    if res.status_code == 206:
+        content_range = res.headers.get("Content-Range", "")
+        total = content_range.rpartition("/")[2]
+        return int(total) if total.isdigit() else None
+    # Content-Length is the size of the encoded body, unknown once decoded
+    if "Content-Encoding" in res.headers:
+        return None
+    length = res.headers.get("Content-Length")
+    return int(length) if length and length.isdigit() else None
+
+
+def _copy_atomic(source: Path, target: Path) -> None:
+    """Copy a file, replacing the target only once it is complete."""
+    tmp_path = target.with_name(f".{target.name}.{os.getpid()}.tmp")
+    shutil.copyfile(source, tmp_path)
+    os.replace(tmp_path, target)
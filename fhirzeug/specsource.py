@@ -0,0 +1,177 @@
+"""Read the files of a FHIR specification from a directory or a ZIP archive."""
+
+import abc
+import fnmatch
+import hashlib
+import mmap
+import os
+import shutil
+import zipfile
+from pathlib import Path
+from typing import BinaryIO, Iterable, List, Optional, Union
+
+from .generators.yaml_model import ExamplesMode
+from .logger import logger
+
+
+class SpecSource(abc.ABC):
+    """ Files of a specification.
+
+    Attributes:
+        directory   Directory of the specification, which is only read: the
+                    parsed specification is cached in the download directory
+    """
+
+    def __init__(self, directory: Path):
+        self.directory = directory
+
+    @abc.abstractmethod
+    def open(self, name: str) -> BinaryIO:
+        """ Open the file of the specification with the given name, in binary mode.
+        """
+
+    @abc.abstractmethod
+    def names(self) -> List[str]:
+        """ Names of the files of the specification. """
+
+    def glob(self, pattern: str) -> List[str]:
+        """ Sorted names of the files matching a shell-style pattern. """
+        return sorted(fnmatch.filter(self.names(), pattern))
+
+    def digest(self, name: str) -> str:
+        """ Digest identifying the content of a file. """
+        digest = hashlib.sha256()
+        with self.open(name) as handle:
+            for chunk in iter(lambda: handle.read(1 << 20), b""):
+                digest.update(chunk)
+        return digest.hexdigest()
+
+    def export(self, names: Iterable[str], destination: Path, mode: ExamplesMode):
+        """ Write files of the specification to the destination directory.
+
+        In `archive` mode, the files are written to one ZIP archive instead, named
+        after the destination with a `.zip` suffix. Whichever of the directory or
+        the archive is not written is removed, so that only one of them is used.
+        """
+        archive_path = destination.with_suffix(".zip")
+        if mode == ExamplesMode.archive:
+            shutil.rmtree(destination, ignore_errors=True)
+            archive_path.parent.mkdir(parents=True, exist_ok=True)
+            tmp_path = archive_path.with_suffix(".tmp")
+            with zipfile.ZipFile(
+                tmp_path, "w", zipfile.ZIP_DEFLATED, compresslevel=1
+            ) as archive:
+                for name in names:
+                    with self.open(name) as f_in, archive.open(name, "w") as f_out:
+                        shutil.copyfileobj(f_in, f_out)
+            os.replace(tmp_path, archive_path)
+            return
+
+        if archive_path.exists():
+            archive_path.unlink()
+        destination.mkdir(parents=True, exist_ok=True)
+        for name in names:
+            target = destination / name
+            if target.is_symlink() or target.exists():
+                target.unlink()
+            self._export_file(name, target, mode)
+
+    def _export_file(self, name: str, target: Path, mode: ExamplesMode):
+        with self.open(name) as f_in, target.open("wb") as f_out:
+            shutil.copyfileobj(f_in, f_out)
+
+
+class DirectorySource(SpecSource):
+    """ Specification extracted to a directory. """
+
+    def open(self, name: str) -> BinaryIO:
+        return self.directory.joinpath(name).open("rb")
+
+    def names(self) -> List[str]:
+        return [path.name for path in self.directory.iterdir() if path.is_file()]
+
+    def _export_file(self, name: str, target: Path, mode: ExamplesMode):
+        source = self.directory.joinpath(name).resolve()
+        if mode == ExamplesMode.symlink:
+            target.symlink_to(source)
+            return
+        if mode == ExamplesMode.hardlink:
+            try:
+                os.link(source, target)
+                return
+            except OSError:
+                # Not on the same file system
+                pass
+        shutil.copy2(source, target)
+
+
+class ZipSource(SpecSource):
+    """ Specification read from the members of a ZIP archive, without extracting it.
+
+    The archive is memory-mapped and opened once. Files of the directory that are
+    not in the archive, like `version.info`, are read from the directory.
+    """
+
+    def __init__(self, archive_path: Path, directory: Path):
+        super().__init__(directory)
+        self.archive_path = archive_path
+        self._archive: Optional[zipfile.ZipFile] = None
+
+    def __getstate__(self):
+        state = self.__dict__.copy()
+        state["_archive"] = None
+        return state
+
+    @property
+    def archive(self) -> zipfile.ZipFile:
+        if self._archive is None:
+            with self.archive_path.open("rb") as handle:
+                mapped = _MappedFile(handle.fileno(), 0, access=mmap.ACCESS_READ)
+            self._archive = zipfile.ZipFile(mapped)  # type: ignore
+        return self._archive
+
+    def close(self) -> None:
+        if self._archive is not None:
+            self._archive.close()
+            self._archive = None
+
+    def open(self, name: str) -> BinaryIO:
+        try:
+            return self.archive.open(name)  # type: ignore
+        except KeyError:
+            return self.directory.joinpath(name).open("rb")
+
+    def names(self) -> List[str]:
+        names = set(self.archive.namelist())
+        if self.directory.is_dir():
+            names.update(
+                path.name for path in self.directory.iterdir() if path.is_file()
+            )
+        return list(names)
+
+    def digest(self, name: str) -> str:
+        # The CRC and size of members are known without decompressing them
+        try:
+            info = self.archive.getinfo(name)
+        except KeyError:
+            return super().digest(name)
+        return f"crc32:{info.CRC:08x}:{info.file_size}"
+
+    def _export_file(self, name: str, target: Path, mode: ExamplesMode):
+        if mode in (ExamplesMode.symlink, ExamplesMode.hardlink):
+            logger.debug(f"Cannot link {name} from an archive, copying it")
+        super()._export_file(name, target, mode)
+
+
+class _MappedFile(mmap.mmap):
+    """Memory-mapped file usable as a file object by `zipfile`."""
+
+    def seekable(self) -> bool:
+        return True
+
+
+def as_source(directory: Union[Path, SpecSource]) -> SpecSource:
+    """ Return the source of a specification directory, or the given source. """
+    if isinstance(directory, SpecSource):
+        return directory
+    return DirectorySource(directory)
@@ -1,4 +1,5 @@
 import base64
+import datetime
 import decimal
 import typing
 
@@ -109,6 +110,54 @@ def test_fhirdatetime():
     model = ExampleModel(datetime="2017-01-01T00:00:00.000Z")  # noqa : F841
 
 
+def test_primitive_cache():
+    """Valid values of the date and time types are cached."""
+    ExampleModel(date="1905-08-23")
+    hits = FHIRDate._cached_check.cache_info().hits
+    assert ExampleModel(date="1905-08-23").date == "1905-08-23"
+    assert FHIRDate._cached_check.cache_info().hits == hits + 1
+
+    with pytest.raises(pydantic.ValidationError, match="string does not match regex"):
+        ExampleModel(date="1905-08-33")
+    with pytest.raises(pydantic.ValidationError):
+        ExampleModel(date="1905-08-33")
+
+    # Values that are not strings are converted as by `pydantic.constr`
+    assert ExampleModel(date=2018).date == "2018"
+    assert ExampleModel(string=b" foo ").string == "foo"
+
+
+def test_temporal_values():
+    """Dates and times are parsed on demand and serialized unchanged."""
+    model = ExampleModel(
+        date="1973-06",
+        datetime="2015-02-07T13:28:17.2391-05:00",
+        instant="2017-01-01T00:00:60Z",
+        time="17:00:00.5",
+    )
+    assert model.date.precision == "month"
+    assert model.date.as_date() == datetime.date(1973, 6, 1)
+    assert model.datetime.precision == "second"
+    assert model.datetime.as_datetime() == datetime.datetime(
+        2015, 2, 7, 13, 28, 17, 239100, datetime.timezone(-datetime.timedelta(hours=5)),
+    )
+    assert model.datetime.as_datetime() is model.datetime.as_datetime()
+    assert model.instant.as_datetime() == datetime.datetime(
+        2017, 1, 1, 0, 0, 59, tzinfo=datetime.timezone.utc
+    )
+    assert model.time.as_time() == datetime.time(17, 0, 0, 500000)
+    assert ExampleModel(datetime="2018").datetime.as_datetime() == datetime.datetime(
+        2018, 1, 1
+    )
+    assert model.json(exclude_none=True) == (
+        '{"date": "1973-06", "datetime": "2015-02-07T13:28:17.2391-05:00", '
+        '"time": "17:00:00.5", "instant": "2017-01-01T00:00:60Z"}'
+    )
+
+    with pytest.raises(ValueError):
+        ExampleModel(date="2021-02-30").date.as_date()
+
+
 def test_fhirtime():
     """Test FHIRTime
     https://www.hl7.org/fhir/datatypes.html#time"""
@@ -1,4 +1,6 @@
 """Test add dynamic validator to FHIRAbstractBase Model."""
+import typing
+
 import pydantic
 import pytest
 
@@ -78,3 +80,47 @@ def _must_be_false(values):
     """Root validator to be added to ChildModel."""
     assert not values.get("field_a")
     return values
+
+
+class OrderedModel(FHIRAbstractBase):
+    """Resource storing the order in which validators are run."""
+
+    field_a: typing.List[str] = []
+
+
+class ChildOrderedModel(OrderedModel):
+    """Child model."""
+
+
+def _append(name):
+    def _validator(values):
+        values["field_a"] = values["field_a"] + [name]
+        return values
+
+    return _validator
+
+
+def test_dynamic_validator_priority_and_removal():
+    """Test validators order, and removal of a validator after it has been run."""
+    parent_validator = _append("parent")
+    child_validator = _append("child")
+    first_validator = _append("first")
+    last_validator = _append("last")
+
+    OrderedModel._add_post_root_validator(parent_validator)
+    assert ChildOrderedModel().field_a == ["parent"]
+
+    # Cached validators of the child class must be updated
+    ChildOrderedModel._add_post_root_validator(child_validator)
+    OrderedModel._add_post_root_validator(first_validator, priority=1)
+    ChildOrderedModel._add_post_root_validator(last_validator, priority=-1)
+    assert ChildOrderedModel().field_a == ["first", "child", "parent", "last"]
+    assert OrderedModel().field_a == ["first", "parent"]
+
+    OrderedModel._remove_post_root_validator(first_validator)
+    assert ChildOrderedModel().field_a == ["child", "parent", "last"]
+    assert OrderedModel().field_a == ["parent"]
+
+    # A validator can only be removed from the class it has been added to
+    with pytest.raises(ValueError):
+        ChildOrderedModel._remove_post_root_validator(parent_validator)
@@ -0,0 +1,103 @@
+"""Test the fast path used to load resources without full pydantic validation."""
+import typing
+
+import pydantic
+import pytest
+
+from fhirzeug.generators.python_pydantic.templates.resource_header import (
+    FHIRAbstractBase,
+    _FastPathFallback,
+    get_primitive_field_root_validator,
+)
+
+OPTIONAL_LIST_T = typing.Optional[typing.List[typing.Optional[str]]]
+
+
+class ItemModel(FHIRAbstractBase):
+    """Model used as a nested element."""
+
+    code: str
+    display: typing.Optional[str]
+
+
+class ExampleModel(FHIRAbstractBase):
+    """Model for tests that simulate the behavior of a generated resource."""
+
+    item: typing.Optional[ItemModel]
+    items: typing.Optional[typing.List[ItemModel]]
+    snake_field: OPTIONAL_LIST_T
+    snake_field__extension: OPTIONAL_LIST_T
+    count: typing.Optional[int]
+
+    _validate_primitive_snake_field = get_primitive_field_root_validator("snake_field")
+
+
+class CustomModel(FHIRAbstractBase):
+    """Model with a custom pre root validator unknown to the fast path."""
+
+    field: typing.Optional[str]
+
+    @pydantic.root_validator(pre=True)
+    def upper_field(cls, values):
+        if "field" in values:
+            values["field"] = values["field"].upper()
+        return values
+
+
+class ContainerModel(FHIRAbstractBase):
+    """Container model of an element that cannot use the fast path."""
+
+    custom: typing.Optional[CustomModel]
+
+
+def _assert_same_model(model: FHIRAbstractBase, expected: FHIRAbstractBase) -> None:
+    assert type(model) is type(expected)
+    assert model == expected
+    assert model.__fields_set__ == expected.__fields_set__
+    assert model.json() == expected.json()
+
+
+@pytest.mark.parametrize(
+    "values",
+    [
+        {},
+        {"count": "3"},
+        {"item": {"code": " A ", "display": ""}},
+        {"items": [{"code": "A"}, {}, {"code": "B", "display": "b"}]},
+        {"snakeField": ["A", None], "_snakeField": [None, "ext"]},
+        {"snake_field": ["A", ""], "snake_field__extension": [None, "ext"]},
+        {"snakeField": ["A", "B"], "_snakeField": [None]},
+    ],
+)
+def test_fast_parse(values: typing.Dict) -> None:
+    """Test the fast path builds the same model as pydantic."""
+    _assert_same_model(ExampleModel._fast_parse(values), ExampleModel(**values))
+
+
+@pytest.mark.parametrize(
+    "values",
+    [
+        {"unknown": "A"},
+        {"count": "not an int"},
+        {"item": {"display": "missing code"}},
+        {"item": [{"code": "A"}]},
+        {"items": {"code": "A"}},
+        {"snakeField": ["A", "B"], "_snakeField": ["ext"]},
+        {"snakeField": ["A"], "snake_field": ["A"]},
+    ],
+)
+def test_fast_parse_fallback(values: typing.Dict) -> None:
+    """Test invalid values are left to pydantic."""
+    with pytest.raises(_FastPathFallback):
+        ExampleModel._fast_parse(values)
+
+    with pytest.raises(pydantic.ValidationError):
+        ExampleModel(**values)
+
+
+def test_fast_parse_custom_pre_root_validator() -> None:
+    """Test elements with custom pre root validators are validated by pydantic."""
+    values = {"custom": {"field": "a"}}
+    container = ContainerModel._fast_parse(values)
+    _assert_same_model(container, ContainerModel(**values))
+    assert container.custom.field == "A"
@@ -31,3 +31,17 @@ def test_list_instead_of_dict_must_fail():
 
     with pytest.raises(ValidationError):
         ContainerModel(field_c=[{"field_a": "123", "field_b": "456"}])
+
+
+@pytest.mark.parametrize("field_name", ["field_a", "fieldA"])
+def test_list_for_singleton_field_must_fail(field_name):
+    """Test a list is not allowed for a singleton field, by name or alias."""
+    with pytest.raises(ValidationError, match=f"Singleton field : {field_name}"):
+        ItemModel(**{field_name: ["123"]})
+
+    assert ItemModel._build_singleton_field_keys() == {
+        "field_a",
+        "fieldA",
+        "field_b",
+        "fieldB",
+    }
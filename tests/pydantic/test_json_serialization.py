@@ -1,12 +1,19 @@
 import decimal
+import io
 import typing
 
 import pytest
 
 from fhirzeug.generators.python_pydantic.templates.resource_header import (
     FHIRAbstractBase,
+    JSONBackend,
+    _DECIMAL_MARKER,
     _without_empty_items,
+    json_dump,
+    json_dumps,
     json_loads,
+    register_json_backend,
+    use_json_backend,
 )
 
 
@@ -38,6 +45,30 @@ def test_decimal_serialization(input, expected):
         assert str(ExampleModel.parse_raw(serialized).decimal) == str(input)
 
 
+@pytest.mark.parametrize(
+    ("input", "expected"),
+    [
+        (
+            {"a": [decimal.Decimal("1.000"), decimal.Decimal("-1E+3")], "b": "é"},
+            '{"a": [1.000, -1E+3], "b": "\\u00e9"}',
+        ),
+        ((decimal.Decimal("0.10"), {"x"}), '[0.10, ["x"]]'),
+        (decimal.Decimal("12.0"), "12.0"),
+        (
+            "\x00" + "0" * (len(_DECIMAL_MARKER) - 1) + "12",
+            '"\\u0000' + "0" * (len(_DECIMAL_MARKER) - 1) + '12"',
+        ),
+    ],
+)
+def test_json_dumps(input: typing.Any, expected: str):
+    """Test decimals are written as they are, without loss of precision."""
+    assert json_dumps(input) == expected
+
+    f_out = io.StringIO()
+    json_dump(input, f_out)
+    assert f_out.getvalue() == expected
+
+
 @pytest.mark.parametrize(
     ("input", "expected"),
     [
@@ -46,14 +77,88 @@ def test_decimal_serialization(input, expected):
         ({"empty": None}, None),
         ([{"empty": None}], None),
         ([{"empty": [], "example": "example"}], [{"example": "example"}]),
+        (
+            {"given": ["A", " "], "_given": [None, {}]},
+            {"given": ["A", None], "_given": [None, None]},
+        ),
+        (
+            {"given": ["A", None], "_given": [None, {"id": "B"}]},
+            {"given": ["A", None], "_given": [None, {"id": "B"}]},
+        ),
+        (
+            {"given": ["A", None], "given__extension": [None, {"id": "B"}]},
+            {"given": ["A", None], "given__extension": [None, {"id": "B"}]},
+        ),
+        ({"given": "A", "_given": {"id": ""}}, {"given": "A"}),
+        (("A", " B "), ["A", "B"]),
     ],
 )
 def test_without_empty_items(input: typing.Any, expected: typing.Any):
     assert _without_empty_items(input) == expected
 
 
+def test_without_empty_items_clean_input():
+    """Test already clean dicts and lists are not copied."""
+    clean = {"example": "example", "nested": {"list": ["A", {"id": "B"}]}}
+    assert _without_empty_items(clean) is clean
+
+    dirty = {"example": "example", "empty": "", "nested": clean["nested"]}
+    cleaned = _without_empty_items(dirty)
+    assert cleaned == {"example": "example", "nested": clean["nested"]}
+    assert cleaned["nested"] is clean["nested"]
+    assert dirty["empty"] == ""
+
+
 def test_duplicate_entries():
     """Test duplicate entry raise ValueError."""
     json_loads('{"x": 1}')
     with pytest.raises(ValueError):
         json_loads('{"x": 1, "x": 2}')
+
+
+@pytest.fixture
+def json_backend():
+    """Restore the default JSON backend after the test."""
+    yield
+    use_json_backend("json")
+
+
+@pytest.mark.parametrize("name", ["orjson", "ujson"])
+def test_native_json_backend(json_backend, name: str):
+    """Test native JSON backends can be used without exact decimals."""
+    pytest.importorskip(name)
+    with pytest.raises(ValueError):
+        use_json_backend(name)
+    with pytest.raises(ValueError):
+        use_json_backend(name, exact_decimals=False)
+
+    use_json_backend(name, exact_decimals=False, check_duplicate_keys=False)
+    assert json_loads('{"x": 1.5, "x": 2.5}') == {"x": 2.5}
+    model = ExampleModel.parse_raw('{"decimal": 1.5}')
+    assert model.decimal == decimal.Decimal("1.5")
+    assert json_loads(model.json()) == {"decimal": 1.5}
+    assert (
+        json_dumps({"decimal": decimal.Decimal("1.5")}, indent=None)
+        == '{"decimal": 1.5}'
+    )
+
+
+def test_register_json_backend(json_backend):
+    """Test custom JSON backends can be registered and selected."""
+    backend = JSONBackend(
+        loads=lambda data: {"loaded": data},
+        dumps=lambda obj, default: "dumped",
+        exact_decimals=True,
+        checks_duplicate_keys=True,
+    )
+    with pytest.raises(ValueError):
+        use_json_backend("custom")
+
+    register_json_backend("custom", backend)
+    use_json_backend("custom")
+    assert json_loads("{}") == {"loaded": "{}"}
+    assert json_dumps({}) == "dumped"
+
+    # Other arguments are only supported by the standard library
+    assert json_loads("{}", parse_int=int) == {}
+    assert json_dumps({}, indent=2) == "{}"
@@ -4,6 +4,7 @@ import typing
 from pydantic import ValidationError
 
 from fhirzeug.generators.python_pydantic.templates.fhir_basic_types import FHIRString
+from fhirzeug.generators.python_pydantic.templates import resource_header
 from fhirzeug.generators.python_pydantic.templates.resource_header import (
     FHIRAbstractBase,
 )
@@ -25,3 +26,20 @@ def test_skipped_resource(subject_reference):
 
     with pytest.raises(ValidationError):
         RootModel(**{"field_a": subject_reference})
+
+
+def test_stripped_once(monkeypatch):
+    """Test empty items of nested elements are stripped only once."""
+    stripped = []
+
+    def _without_empty_items(obj):
+        if isinstance(obj, dict) and "child_field_a" in obj:
+            stripped.append(obj)
+        return without_empty_items(obj)
+
+    without_empty_items = resource_header._without_empty_items
+    monkeypatch.setattr(resource_header, "_without_empty_items", _without_empty_items)
+
+    model = RootModel(field_a={"child_field_a": " A "})
+    assert model.field_a.child_field_a == "A"
+    assert len(stripped) == 1
@@ -0,0 +1,64 @@
+from pathlib import Path
+from types import SimpleNamespace
+
+import fhirzeug
+from fhirzeug import buildmanifest
+from fhirzeug.buildmanifest import BuildManifest
+from fhirzeug.fhirspec import FHIRSpec
+
+
+def _render(text: str, calls: list):
+    def render() -> str:
+        calls.append(text)
+        return text
+
+    return render
+
+
+def test_fragments_are_reused(spec: FHIRSpec, tmp_path: Path):
+    path = tmp_path / "manifest.json"
+    patient = spec.classes.with_name("Patient")
+    codesystem = SimpleNamespace(url="http://example.com", definition={"a": 1})
+    calls: list = []
+
+    manifest = BuildManifest(spec, path)
+    assert manifest.fragment(patient, _render("patient", calls)) == "patient"
+    assert manifest.fragment(codesystem, _render("codesystem", calls)) == "codesystem"
+    manifest.save()
+
+    manifest = BuildManifest(spec, path)
+    assert manifest.fragment(patient, _render("new patient", calls)) == "patient"
+    codesystem.definition = {"a": 2}
+    assert manifest.fragment(codesystem, _render("changed", calls)) == "changed"
+    assert calls == ["patient", "codesystem", "changed"]
+    assert (manifest.rendered, manifest.reused) == (1, 1)
+
+
+def test_invalid_manifest_is_ignored(spec: FHIRSpec, tmp_path: Path):
+    path = tmp_path / "manifest.json"
+    path.write_text("not json")
+    calls: list = []
+
+    manifest = BuildManifest(spec, path)
+    manifest.fragment(spec.classes.with_name("Patient"), _render("patient", calls))
+    assert calls == ["patient"]
+
+
+def test_sources_digest_covers_generators(monkeypatch):
+    root = Path(fhirzeug.__file__).parent
+    modules = {
+        path.relative_to(root).as_posix()
+        for path in buildmanifest._package_modules(root)
+    }
+    assert {"fhirclass.py", "fhirrenderer.py", "generators/yaml_model.py"} <= modules
+    assert "generators/python_pydantic/__init__.py" in modules
+    assert not any("templates" in name or "static_files" in name for name in modules)
+
+    digest = buildmanifest.sources_digest()
+    file_digest = buildmanifest.file_digest
+    monkeypatch.setattr(
+        buildmanifest,
+        "file_digest",
+        lambda path: "changed" if path.name == "yaml_model.py" else file_digest(path),
+    )
+    assert buildmanifest.sources_digest() != digest
@@ -0,0 +1,39 @@
+import copy
+import pickle
+
+from fhirzeug.fhirspec import FHIRSpec
+
+
+def test_cached_views(spec: FHIRSpec):
+    patient = spec.classes.with_name("Patient")
+    resource = spec.classes.with_name("Resource")
+    assert patient.sorted_properties_all is patient.sorted_properties_all
+    names = [prop.name for prop in patient.sorted_properties_all]
+    assert names == sorted(names)
+    assert set(resource.properties_map) < set(names)
+
+    first = patient.properties[0]
+    assert patient.property_for(first.orig_name) is first
+    assert patient.properties_map[first.name] is first
+
+    added = copy.copy(first)
+    added.name = added.orig_name = "zzz"
+    properties, by_name = resource.properties, resource._properties_by_name
+    resource.properties, resource._properties_by_name = list(properties), {**by_name}
+    try:
+        # Adding a property updates the views of the class and its subclasses
+        resource.add_property(added)
+        assert patient.sorted_properties_all[-1] is added
+        assert patient.property_for("zzz") is added
+
+        resource.add_property(copy.copy(added))
+        assert resource.properties.count(added) == 1
+        assert len(resource.properties) == len(properties) + 1
+    finally:
+        resource.properties, resource._properties_by_name = properties, by_name
+        resource._invalidate_views()
+    assert patient.property_for("zzz") is None
+
+    unpickled = pickle.loads(pickle.dumps(patient))
+    assert unpickled._views == {}
+    assert [p.name for p in unpickled.sorted_properties_all] == names
@@ -0,0 +1,59 @@
+import io
+import os
+import sys
+from pathlib import Path
+
+from fhirzeug import fhirrenderer
+from fhirzeug.fhirspec import FHIRSpec
+
+
+def test_environment_shared(spec: FHIRSpec):
+    first = fhirrenderer.FHIRValueSetRenderer(spec)
+    second = fhirrenderer.FHIRStructureDefinitionRenderer(spec)
+    assert first.jinjaenv is second.jinjaenv
+
+
+def test_environment_reloads_templates(spec: FHIRSpec, tmp_path: Path, monkeypatch):
+    package_dir = tmp_path / "edited_templates"
+    package_dir.joinpath("templates").mkdir(parents=True)
+    package_dir.joinpath("__init__.py").touch()
+    template_path = package_dir / "templates" / "test.jinja2"
+    template_path.write_text("first")
+    monkeypatch.syspath_prepend(str(tmp_path))
+
+    config = spec.generator_config.copy(deep=True)
+    config.module = "edited_templates"
+    config.template.source = "templates"
+    config.download_directory.destination = tmp_path / "downloads"
+    environment = fhirrenderer.get_environment(config)
+    assert environment.get_template("test.jinja2").render() == "first"
+    # Compiled templates are cached for later runs
+    assert any(tmp_path.joinpath("downloads", "jinja").iterdir())
+
+    template_path.write_text("second")
+    mtime = template_path.stat().st_mtime + 10
+    os.utime(template_path, (mtime, mtime))
+    assert fhirrenderer.get_environment(config) is environment
+    assert environment.get_template("test.jinja2").render() == "second"
+    sys.modules.pop("edited_templates", None)
+
+
+def test_render_streamed(spec: FHIRSpec):
+    renderer = fhirrenderer.FHIRStructureDefinitionRenderer(spec)
+    classes = [spec.classes.with_name("Patient")]
+    template = renderer.jinjaenv.get_template(
+        spec.generator_config.template.resource_source
+    )
+
+    f_out = io.StringIO()
+    renderer.render_classes(classes, f_out)
+    assert f_out.getvalue() == template.render({"clazz": classes[0]})
+
+
+def test_wordwrap(spec: FHIRSpec):
+    environment = fhirrenderer.get_environment(spec.generator_config)
+    text = "First line\n\nA second line longer than the width"
+    expected = "First line\n\nA second\nline\nlonger\nthan the\nwidth"
+    assert fhirrenderer.do_wordwrap(environment, text, width=10) == expected
+    assert fhirrenderer.do_wordwrap(environment, text, width=10) == expected
+    assert fhirrenderer.do_wordwrap(environment, "") == ""
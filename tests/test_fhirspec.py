@@ -1,9 +1,17 @@
+import concurrent.futures
+import gc
 import os
+import shutil
+from pathlib import Path
 
 
+from fhirzeug.fhirclass import FHIRClassRegistry
 from fhirzeug.fhirspec import (
+    SPEC_FILES,
     FHIRSpec,
+    FHIRStructureDefinition,
     FHIRVersionInfo,
+    gc_paused,
 )
 
 
@@ -93,3 +101,134 @@ def test_safe_enum_name(spec: FHIRSpec):
     assert (
         spec.safe_enum_name("HTTPVerb") == "HTTPVerb"  # <- is this a desired behavior
     )
+
+
+def test_gc_paused():
+    assert gc.isenabled()
+    with gc_paused():
+        assert not gc.isenabled()
+    assert gc.isenabled()
+
+    gc.disable()
+    try:
+        with gc_paused():
+            pass
+        assert not gc.isenabled()
+    finally:
+        gc.enable()
+
+
+def test_load_cached(spec: FHIRSpec, tmp_path: Path, monkeypatch):
+    spec_dir = tmp_path / "spec"
+    cache_dir = tmp_path / "cache"
+    spec_dir.mkdir()
+    for name in SPEC_FILES:
+        shutil.copy(spec.directory / name, spec_dir / name)
+    parsed = FHIRSpec.load(spec_dir, spec.generator_config, cache_dir)
+    assert len(list(cache_dir.glob("fhirspec-*.pickle"))) == 1
+    assert sorted(path.name for path in spec_dir.iterdir()) == sorted(SPEC_FILES)
+
+    monkeypatch.setattr(FHIRSpec, "read_profiles", None)
+    loaded = FHIRSpec.load(spec_dir, spec.generator_config, cache_dir)
+    assert loaded.generator_config is spec.generator_config
+    assert sorted(loaded.profiles) == sorted(parsed.profiles)
+    assert [clazz.name for clazz in loaded.classes] == [
+        clazz.name for clazz in parsed.classes
+    ]
+    patient = loaded.classes.with_name("Patient")
+    assert patient in loaded.profiles["patient"].classes
+    assert [prop.name for prop in patient.properties] == [
+        prop.name for prop in parsed.classes.with_name("Patient").properties
+    ]
+
+
+def test_classes_scoped(spec: FHIRSpec, tmp_path: Path):
+    for name in SPEC_FILES:
+        shutil.copy(spec.directory / name, tmp_path / name)
+    config = spec.generator_config
+    naming_rules = dict(config.naming_rules, camelcase_classes=True)
+    configs = [
+        config.update(naming_rules=naming_rules),
+        config.update(naming_rules=dict(naming_rules, camelcase_classes=False)),
+    ]
+    with concurrent.futures.ThreadPoolExecutor(2) as executor:
+        camelcase, other = executor.map(lambda c: FHIRSpec(tmp_path, c), configs)
+    assert gc.isenabled()
+    assert camelcase.classes.with_name("PatientContact") is not None
+    assert other.classes.with_name("PatientContact") is None
+    assert len(other.classes) == len(camelcase.classes)
+
+    patient = camelcase.classes.with_name("Patient")
+    assert other.classes.with_name("Patient") is not patient
+    assert patient.superclass is camelcase.classes.with_name("DomainResource")
+    patient_classes = camelcase.classes.with_url(
+        "http://hl7.org/fhir/StructureDefinition/Patient"
+    )
+    assert patient_classes[:2] == [
+        patient,
+        camelcase.classes.with_name("PatientContact"),
+    ]
+    assert camelcase.classes.with_url("http://example.com/unknown") == []
+
+
+def test_cache_key(spec: FHIRSpec):
+    config = spec.generator_config
+    key = FHIRSpec.cache_key(spec.directory, config)
+    assert FHIRSpec.cache_key(spec.directory, config.update(split_modules=True)) == key
+    naming_rules = dict(
+        config.naming_rules,
+        camelcase_classes=not config.naming_rules.camelcase_classes,
+    )
+    assert (
+        FHIRSpec.cache_key(spec.directory, config.update(naming_rules=naming_rules))
+        != key
+    )
+
+
+def test_element_indexes(spec: FHIRSpec, monkeypatch):
+    elements = [
+        {"id": "Test", "path": "Test"},
+        {"id": "Test.item", "path": "Test.item", "type": [{"code": "BackboneElement"}]},
+        {"id": "Test.item.code", "path": "Test.item.code", "type": [{"code": "code"}]},
+        {
+            "id": "Test.item.item",
+            "path": "Test.item.item",
+            "contentReference": "#Test.item",
+        },
+        {
+            "id": "Test.other",
+            "path": "Test.other",
+            "contentReference": "#Test.item.code",
+        },
+    ]
+    profile = {
+        "resourceType": "StructureDefinition",
+        "url": "http://example.com/StructureDefinition/Test",
+        "name": "Test",
+        "kind": "resource",
+        "type": "Test",
+        "baseDefinition": "http://hl7.org/fhir/StructureDefinition/DomainResource",
+        "differential": {"element": elements},
+    }
+    monkeypatch.setattr(spec, "classes", FHIRClassRegistry())
+    structure = FHIRStructureDefinition(spec, profile)
+    structure.process_profile()
+
+    item = structure.element_with_id("Test.item")
+    assert item is structure.elements[1]
+    assert structure.element_with_id("Test.missing") is None
+    assert [child.path for child in item.children] == [
+        "Test.item.code",
+        "Test.item.item",
+    ]
+    assert item.children[1].definition._content_referenced is item.definition
+    assert structure.elements[4].definition._content_referenced is (
+        item.children[0].definition
+    )
+
+
+def test_load_cache_not_writable(spec: FHIRSpec, tmp_path: Path):
+    cache_dir = tmp_path / "file" / "cache"
+    cache_dir.parent.write_text("not a directory")
+    loaded = FHIRSpec.load(spec.directory, spec.generator_config, cache_dir)
+    assert sorted(loaded.profiles) == sorted(spec.profiles)
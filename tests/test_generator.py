@@ -1,5 +1,6 @@
 from pathlib import Path
 
+from fhirzeug.buildmanifest import MANIFEST_FILENAME
 from fhirzeug.generator import generate
 from fhirzeug.fhirspec import FHIRSpec
 
@@ -9,3 +10,38 @@ def test_write(spec: FHIRSpec, tmp_path: Path):
     spec.generator_config.output_file.destination = Path("output.py")
     generate(spec)
     assert tmp_path.joinpath("output.py").is_file()
+
+
+def test_write_split_modules(spec: FHIRSpec, tmp_path: Path):
+    spec.generator_config.output_directory.destination = tmp_path
+    spec.generator_config.output_file.destination = Path("output.py")
+    spec.generator_config.split_modules = True
+    try:
+        generate(spec)
+    finally:
+        spec.generator_config.split_modules = False
+
+    package_path = tmp_path.joinpath("output")
+    assert not tmp_path.joinpath("output.py").exists()
+    for module in ["__init__", "fhirbase", "codesystems", "datatypes"]:
+        assert package_path.joinpath(f"{module}.py").is_file()
+    assert package_path.joinpath("resources", "patient.py").is_file()
+    assert not package_path.joinpath("resources", "humanname.py").exists()
+
+
+def test_write_incremental(spec: FHIRSpec, tmp_path: Path):
+    spec.generator_config.output_directory.destination = tmp_path
+    spec.generator_config.output_file.destination = Path("output.py")
+    generate(spec)
+    expected = tmp_path.joinpath("output.py").read_text()
+
+    spec.generator_config.incremental = True
+    try:
+        generate(spec)
+        assert tmp_path.joinpath(MANIFEST_FILENAME).is_file()
+        tmp_path.joinpath("output.py").unlink()
+        generate(spec)
+    finally:
+        spec.generator_config.incremental = False
+
+    assert tmp_path.joinpath("output.py").read_text() == expected
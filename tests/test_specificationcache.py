@@ -0,0 +1,289 @@
+import io
+import json
+import tarfile
+import zipfile
+from pathlib import Path
+from typing import Callable, Dict, List, Optional
+
+import pytest
+
+from fhirzeug import specificationcache
+from fhirzeug.specificationcache import (
+    ContentStore,
+    DownloadError,
+    SPEC_BUNDLES,
+    SpecificationCache,
+    SpecificationPackage,
+    file_sha256,
+)
+from fhirzeug.specsource import ZipSource
+
+BASE_URL = "http://example.com/fhir"
+
+
+def make_zip() -> bytes:
+    buffer = io.BytesIO()
+    with zipfile.ZipFile(buffer, "w") as z:
+        z.writestr("valuesets.json", "{}")
+        z.writestr("profiles-types.json", "{}")
+    return buffer.getvalue()
+
+
+class FakeResponse:
+    def __init__(
+        self,
+        status_code: int,
+        body: bytes,
+        headers: Dict[str, str],
+        on_stream: Optional[Callable[[], None]] = None,
+    ):
+        self.status_code = status_code
+        self.body = body
+        self.headers = headers
+        self.on_stream = on_stream
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        pass
+
+    def raise_for_status(self):
+        assert self.status_code < 400
+
+    def iter_content(self, chunk_size):
+        if self.on_stream is not None:
+            self.on_stream()
+        yield from (
+            self.body[i : i + chunk_size] for i in range(0, len(self.body), chunk_size)
+        )
+
+
+class FakeServer:
+    """Serve files with ETags and range requests, recording the requests."""
+
+    def __init__(self, files: Dict[str, bytes]):
+        self.files = files
+        self.requests: List[Dict[str, str]] = []
+        self.truncate = False
+        self.encoding: Optional[str] = None
+        # Called once while the body of the next response is streamed
+        self.on_stream: Optional[Callable[[], None]] = None
+
+    def get(self, url: str, headers: Dict[str, str], stream: bool):
+        self.requests.append(headers)
+        body = self.files[url.rpartition("/")[2]]
+        etag = f'"{len(body)}"'
+        if headers.get("If-None-Match") == etag:
+            return FakeResponse(304, b"", {})
+        if "Range" in headers and headers.get("If-Range") == etag:
+            start = int(headers["Range"][len("bytes=") : -1])
+            return FakeResponse(
+                206,
+                body[start:],
+                {"ETag": etag, "Content-Range": f"bytes {start}-/{len(body)}"},
+            )
+        headers = {"ETag": etag, "Content-Length": str(len(body))}
+        if self.encoding is not None:
+            headers["Content-Encoding"] = self.encoding
+        on_stream, self.on_stream = self.on_stream, None
+        if self.truncate:
+            return FakeResponse(200, body[: len(body) // 2], headers, on_stream)
+        return FakeResponse(200, body, headers, on_stream)
+
+
+@pytest.fixture
+def server(monkeypatch) -> FakeServer:
+    server = FakeServer(
+        {
+            "version.info": b"[FHIR]\nFhirVersion=4.0.1\n",
+            "examples-json.zip": make_zip(),
+        }
+    )
+    monkeypatch.setattr(specificationcache.requests, "get", server.get)
+    return server
+
+
+def test_sync(server: FakeServer, tmp_path: Path):
+    cache = SpecificationCache(BASE_URL, tmp_path)
+    cache.sync()
+    assert len(server.requests) == 2
+    assert cache.cache_dir.joinpath("version.info").read_bytes().startswith(b"[FHIR]")
+    assert cache.cache_dir.joinpath("profiles-types.json").read_text() == "{}"
+
+    cache.sync()
+    assert len(server.requests) == 2
+
+    # Extracted files are restored from the store
+    cache.cache_dir.joinpath("valuesets.json").unlink()
+    cache.sync()
+    assert len(server.requests) == 2
+    assert cache.cache_dir.joinpath("valuesets.json").exists()
+
+    # The server is asked whether the files changed
+    cache.sync(force_download=True)
+    assert len(server.requests) == 4
+    assert all("If-None-Match" in headers for headers in server.requests[2:])
+    assert cache.cache_dir.joinpath("valuesets.json").exists()
+
+
+def test_fetch_resumed(server: FakeServer, tmp_path: Path):
+    store = ContentStore(tmp_path)
+    server.truncate = True
+    with pytest.raises(DownloadError):
+        store.fetch(f"{BASE_URL}/examples-json.zip")
+
+    server.truncate = False
+    path = store.fetch(f"{BASE_URL}/examples-json.zip")
+    assert server.requests[-1]["Range"] == f"bytes={len(make_zip()) // 2}-"
+    assert path.read_bytes() == make_zip()
+    assert path.name == file_sha256(path)
+    assert not any(store.partial_dir.iterdir())
+
+
+def test_fetch_encoded_not_resumed(server: FakeServer, tmp_path: Path):
+    def interrupt():
+        raise ConnectionError()
+
+    store = ContentStore(tmp_path)
+    url = f"{BASE_URL}/examples-json.zip"
+    server.encoding = "gzip"
+    server.on_stream = interrupt
+    with pytest.raises(ConnectionError):
+        store.fetch(url)
+    assert not any(store.partial_dir.iterdir())
+
+    # Decoded bytes cannot be resumed from an offset in the encoded content
+    assert store.fetch(url).read_bytes() == make_zip()
+    assert "Range" not in server.requests[-1]
+
+
+def test_fetch_concurrent(server: FakeServer, tmp_path: Path):
+    store = ContentStore(tmp_path)
+    other_store = ContentStore(tmp_path)
+    url = f"{BASE_URL}/examples-json.zip"
+    # Another process downloads the same URL while this one is downloading it
+    server.on_stream = lambda: other_store.fetch(url)
+    path = store.fetch(url)
+    assert path.read_bytes() == make_zip()
+    assert other_store.fetch(url) == path
+    assert len(server.requests) == 2
+    assert not any(store.partial_dir.iterdir())
+
+
+def test_fetch_corrupted(server: FakeServer, tmp_path: Path):
+    store = ContentStore(tmp_path)
+    path = store.fetch(f"{BASE_URL}/version.info")
+    path.write_bytes(b"corrupted")
+
+    assert store.fetch(f"{BASE_URL}/version.info").read_bytes().startswith(b"[FHIR]")
+    assert len(server.requests) == 2
+    assert "If-None-Match" not in server.requests[-1]
+
+
+def test_sync_without_extract(server: FakeServer, tmp_path: Path):
+    cache = SpecificationCache(BASE_URL, tmp_path, extract=False)
+    cache.sync()
+    assert not cache.cache_dir.joinpath("valuesets.json").exists()
+
+    source = cache.source()
+    assert isinstance(source, ZipSource)
+    assert source.glob("*.json") == ["profiles-types.json", "valuesets.json"]
+    with source.open("version.info") as handle:
+        assert handle.read().startswith(b"[FHIR]")
+
+
+def make_package(path: Path, resources: List[Dict], with_index: bool) -> Path:
+    files = {f"{r['resourceType']}-{r['id']}.json": r for r in resources}
+    files["package.json"] = {"name": "test.package", "fhirVersions": ["4.0.1"]}
+    if with_index:
+        files[".index.json"] = {
+            "files": [
+                {"filename": name, "resourceType": r["resourceType"]}
+                for name, r in files.items()
+                if "resourceType" in r
+            ]
+        }
+    with tarfile.open(path, "w:gz") as tar:
+        for name, content in files.items():
+            data = json.dumps(content).encode()
+            info = tarfile.TarInfo(f"package/{name}")
+            info.size = len(data)
+            tar.addfile(info, io.BytesIO(data))
+    return path
+
+
+NPM_RESOURCES = [
+    {"resourceType": "ValueSet", "id": "a", "url": "http://x/ValueSet/a"},
+    {"resourceType": "CodeSystem", "id": "b", "url": "http://x/CodeSystem/b"},
+    {
+        "resourceType": "StructureDefinition",
+        "id": "SimpleQuantity",
+        "url": "http://x/StructureDefinition/SimpleQuantity",
+        "kind": "complex-type",
+        "derivation": "constraint",
+        "type": "Quantity",
+    },
+    {
+        "resourceType": "StructureDefinition",
+        "id": "Quantity",
+        "url": "http://x/StructureDefinition/Quantity",
+        "kind": "complex-type",
+        "derivation": "specialization",
+        "type": "Quantity",
+    },
+    {
+        "resourceType": "StructureDefinition",
+        "id": "patient-birthPlace",
+        "url": "http://x/StructureDefinition/patient-birthPlace",
+        "kind": "complex-type",
+        "derivation": "constraint",
+        "type": "Extension",
+    },
+    {
+        "resourceType": "StructureDefinition",
+        "id": "Patient",
+        "url": "http://x/StructureDefinition/Patient",
+        "kind": "resource",
+        "derivation": "specialization",
+        "type": "Patient",
+    },
+    {"resourceType": "Patient", "id": "example"},
+]
+
+
+@pytest.mark.parametrize("with_index", [True, False])
+def test_package_npm(tmp_path: Path, monkeypatch, with_index: bool):
+    package = make_package(tmp_path / "test.package.tgz", NPM_RESOURCES, with_index)
+    loader = SpecificationPackage(package, tmp_path / "downloads")
+    cache_dir = loader.sync()
+
+    def bundle_ids(name: str) -> List[str]:
+        bundle = json.loads(cache_dir.joinpath(name).read_text())
+        return [entry["resource"]["id"] for entry in bundle["entry"]]
+
+    assert bundle_ids("valuesets.json") == ["b", "a"]
+    assert bundle_ids("profiles-types.json") == ["Quantity", "SimpleQuantity"]
+    assert bundle_ids("profiles-resources.json") == ["Patient"]
+    assert "FhirVersion=4.0.1" in cache_dir.joinpath("version.info").read_text()
+    assert loader.source().glob("*-example.json") == ["Patient-example.json"]
+
+    # The package is only indexed again when it changes
+    monkeypatch.setattr(SpecificationPackage, "index", None)
+    assert loader.sync() == cache_dir
+
+
+def test_package_download_layout(tmp_path: Path):
+    spec_dir = tmp_path / "spec"
+    spec_dir.mkdir()
+    for name in ["version.info", "Patient-example.json"] + SPEC_BUNDLES:
+        spec_dir.joinpath(name).write_text(name)
+    assert SpecificationPackage(spec_dir, tmp_path).sync() == spec_dir
+
+    with tarfile.open(tmp_path / "spec.tar", "w") as tar:
+        tar.add(spec_dir, "spec")
+    cache_dir = SpecificationPackage(tmp_path / "spec.tar", tmp_path).sync()
+    assert cache_dir != spec_dir
+    assert sorted(path.name for path in cache_dir.iterdir()) == sorted(
+        [".package.sha256"] + [path.name for path in spec_dir.iterdir()]
+    )
@@ -0,0 +1,92 @@
+import pickle
+import shutil
+import zipfile
+from pathlib import Path
+
+import pytest
+
+from fhirzeug.fhirspec import FHIRSpec, SPEC_FILES
+from fhirzeug.generators.yaml_model import ExamplesMode
+from fhirzeug.specsource import DirectorySource, SpecSource, ZipSource
+
+EXAMPLE = b'{"resourceType": "Patient", "id": "example"}'
+
+
+@pytest.fixture
+def directory_source(tmp_path: Path) -> DirectorySource:
+    directory = tmp_path / "spec"
+    directory.mkdir()
+    directory.joinpath("version.info").write_text("[FHIR]\nFhirVersion=4.0.1\n")
+    directory.joinpath("patient-example.json").write_bytes(EXAMPLE)
+    return DirectorySource(directory)
+
+
+@pytest.fixture
+def zip_source(tmp_path: Path) -> ZipSource:
+    directory = tmp_path / "spec"
+    directory.mkdir()
+    directory.joinpath("version.info").write_text("[FHIR]\nFhirVersion=4.0.1\n")
+    archive_path = tmp_path / "examples-json.zip"
+    with zipfile.ZipFile(archive_path, "w", zipfile.ZIP_DEFLATED) as archive:
+        archive.writestr("patient-example.json", EXAMPLE)
+    return ZipSource(archive_path, directory)
+
+
+def test_zip_source(zip_source: ZipSource):
+    assert zip_source.glob("*") == ["patient-example.json", "version.info"]
+    with zip_source.open("patient-example.json") as handle:
+        assert handle.read() == EXAMPLE
+    with zip_source.open("version.info") as handle:
+        assert handle.read().startswith(b"[FHIR]")
+    assert zip_source.digest("patient-example.json").startswith("crc32:")
+
+    unpickled = pickle.loads(pickle.dumps(zip_source))
+    assert unpickled.glob("*-example.json") == ["patient-example.json"]
+
+
+def test_incomplete_source(tmp_path: Path):
+    class NamesOnlySource(SpecSource):
+        def names(self):
+            return []
+
+    with pytest.raises(TypeError):
+        NamesOnlySource(tmp_path)  # type: ignore
+
+
+@pytest.mark.parametrize("mode", list(ExamplesMode))
+@pytest.mark.parametrize("source_name", ["directory_source", "zip_source"])
+def test_export(source_name: str, mode: ExamplesMode, tmp_path: Path, request):
+    source: SpecSource = request.getfixturevalue(source_name)
+    destination = tmp_path / "output" / "examples"
+    destination.mkdir(parents=True)
+    destination.joinpath("stale-example.json").write_text("{}")
+
+    source.export(["patient-example.json"], destination, mode)
+
+    if mode == ExamplesMode.archive:
+        assert not destination.exists()
+        with zipfile.ZipFile(destination.with_suffix(".zip")) as archive:
+            assert archive.read("patient-example.json") == EXAMPLE
+        return
+    assert destination.joinpath("patient-example.json").read_bytes() == EXAMPLE
+    assert destination.joinpath("patient-example.json").is_symlink() == (
+        mode == ExamplesMode.symlink and source_name == "directory_source"
+    )
+
+    # Exporting again replaces the files
+    source.export(["patient-example.json"], destination, mode)
+    assert destination.joinpath("patient-example.json").read_bytes() == EXAMPLE
+
+
+def test_spec_from_zip(spec: FHIRSpec, tmp_path: Path):
+    archive_path = tmp_path / "examples-json.zip"
+    with zipfile.ZipFile(archive_path, "w") as archive:
+        for name in SPEC_FILES[1:]:
+            archive.write(spec.directory / name, name)
+    shutil.copy(spec.directory / "version.info", tmp_path / "version.info")
+
+    parsed = FHIRSpec(ZipSource(archive_path, tmp_path), spec.generator_config)
+    assert parsed.directory == tmp_path
+    assert parsed.info.version == spec.info.version
+    assert sorted(parsed.valuesets) == sorted(spec.valuesets)
+    assert sorted(parsed.profiles) == sorted(spec.profiles)